@@ -0,0 +1,84 @@
+"""
+Benchmark — bulk completeness-checklist re-scoring of open PA requests.
+Run: python benchmarks/bench_checklist_rescore.py [--pas 100000] [--budget-s 10]
+
+Builds a throwaway SQLite database of open PAs (one document each, with a random subset of extracted
+evidence fields) and a copy of the shipped checklist rules, then times three re-scores: the initial
+scoring (every row written), an unchanged re-run (nothing written), and a re-run after a payer rule
+change that only affects some PAs. Exits non-zero when any pass exceeds --budget-s.
+"""
+import sys
+import os
+import shutil
+import tempfile
+
+WORKDIR = tempfile.mkdtemp(prefix="bench-checklist-")
+os.environ["DATABASE_URL"] = f"sqlite:///{WORKDIR}/bench.db"
+os.environ["CHECKLIST_RULES_DIR"] = os.path.join(WORKDIR, "rules")
+os.environ["CHECKLIST_RELOAD_SECONDS"] = "0"
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+shutil.copytree(os.path.join(os.path.dirname(__file__), "..", "checklist_rules"), os.environ["CHECKLIST_RULES_DIR"])
+
+import argparse
+import json
+import random
+from sqlalchemy import insert
+from database import Base, engine, SessionLocal
+from models import PARequest, Patient, Document
+from services.packet_service import rescore_checklists
+
+PAYERS = ["Aetna", "UnitedHealthcare", "Cigna", "Blue Cross", "Humana"]
+PROCEDURES = ["27447", "73721", "29881", "63030", "97110"]
+EVIDENCE = ["insurance_id", "prior_therapy", "medications", "imaging_results", "lab_results"]
+
+
+def seed(n: int):
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(7)
+    db = SessionLocal()
+    db.execute(insert(Patient), [{"mrn": "BENCH-1", "first_name": "Bench", "last_name": "Patient", "date_of_birth": "1970-01-01"}])
+    db.execute(insert(PARequest), [{
+        "reference_number": f"PA-BENCH-{i:07d}", "patient_id": 1, "procedure_code": rng.choice(PROCEDURES),
+        "procedure_name": "Procedure", "diagnosis_code": "M17.11", "payer_name": rng.choice(PAYERS),
+        "clinical_rationale": "Failed conservative therapy" if rng.random() < 0.8 else "",
+        "status": rng.choice(["draft", "pending_review", "submitted"]),
+    } for i in range(n)])
+    db.execute(insert(Document), [{
+        "filename": f"f{i}.pdf", "original_filename": f"f{i}.pdf", "file_path": "/dev/null", "pa_request_id": i + 1,
+        "extracted_data": json.dumps({field: "documented" for field in EVIDENCE if rng.random() < 0.6}),
+    } for i in range(n)])
+    db.commit()
+    db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pas", type=int, default=100000)
+    parser.add_argument("--budget-s", type=float, default=10.0)
+    args = parser.parse_args()
+
+    print(f"[*] seeding {args.pas} open PAs in {WORKDIR}")
+    seed(args.pas)
+    passes = []
+    db = SessionLocal()
+    passes.append(("initial", rescore_checklists(db)))
+    passes.append(("unchanged", rescore_checklists(db)))
+    with open(os.path.join(os.environ["CHECKLIST_RULES_DIR"], "aetna.json"), "w") as f:
+        json.dump({"procedures": {"27447": {"items": [
+            {"item": "Imaging/lab results", "source": "Weight-bearing X-ray report", "requires": ["imaging_results"]},
+        ]}}}, f)
+    passes.append(("aetna 27447 rule change", rescore_checklists(db)))
+    db.close()
+
+    print(f"{'pass':<26} {'scanned':>8} {'changed':>8} {'evals':>6} {'seconds':>8}")
+    for name, r in passes:
+        print(f"{name:<26} {r['scanned']:>8} {r['changed']:>8} {r['evaluations']:>6} {r['seconds']:>8.2f}")
+    shutil.rmtree(WORKDIR, ignore_errors=True)
+    slow = [name for name, r in passes if r["seconds"] > args.budget_s]
+    if slow:
+        print(f"[!] over {args.budget_s:.0f}s budget: {', '.join(slow)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
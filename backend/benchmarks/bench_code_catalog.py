@@ -0,0 +1,120 @@
+"""
+Benchmark — code catalog build time, file size and lookup latency at full code-set scale.
+Run: python benchmarks/bench_code_catalog.py [--icd10 75000] [--cpt 10000] [--queries 2000] [--budget-us 2000]
+
+Builds a catalog of synthetic ICD-10-CM-shaped and CPT-shaped codes (about the size of the real code
+sets; descriptions drawn Zipf-style from common clinical words and a long tail) in a temp directory,
+maps it, and times exact lookups, code-prefix autocomplete, one-edit fuzzy matches and
+description-word search. Also reports resident memory growth from opening the catalog.
+Exits non-zero when any query kind averages more than --budget-us.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import random
+import resource
+import string
+import tempfile
+import time
+from services.code_catalog import CodeCatalog, build_catalog
+
+WORDS = (
+    "acute chronic left right bilateral unspecified fracture displaced nondisplaced closed open initial "
+    "subsequent encounter sequela injury pain disorder infection neoplasm malignant benign lower upper "
+    "extremity joint knee shoulder hip spine lumbar cervical thoracic heart artery vein kidney liver "
+    "lung colon skin muscle tendon ligament tear strain sprain degeneration arthritis osteoarthritis"
+).split()
+
+
+def synthetic_vocabulary(rng: random.Random, n: int = 6000) -> list:
+    """Common clinical words first, then pseudo-words; sampled with Zipf-like weights."""
+    rare = {"".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 12))) for _ in range(n)}
+    return WORDS + sorted(rare)
+
+
+def description(vocabulary: list, weights: list, rng: random.Random, k: int) -> str:
+    return " ".join(rng.choices(vocabulary, weights, k=k)).capitalize()
+
+
+def synthetic_entries(n_icd: int, n_cpt: int, rng: random.Random) -> list:
+    vocabulary = synthetic_vocabulary(rng)
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    entries, seen = [], set()
+    while len(seen) < n_icd:
+        code = rng.choice(string.ascii_uppercase) + "".join(rng.choices(string.digits, k=2)) + "".join(
+            rng.choices(string.digits + "XA", k=rng.randint(0, 4)))
+        if code not in seen:
+            seen.add(code)
+            entries.append(("ICD-10", code, description(vocabulary, weights, rng, rng.randint(3, 9))))
+    for i in rng.sample(range(10000, 99999), n_cpt):
+        entries.append(("CPT", str(i), description(vocabulary, weights, rng, rng.randint(2, 6))))
+    return entries
+
+
+def description_query(entries: list, rng: random.Random) -> str:
+    """Two words of a real description, each cut to a 3+ character prefix, as someone would type them."""
+    words = rng.choice(entries)[2].lower().split()
+    return " ".join(w[:rng.randint(3, len(w))] for w in rng.sample(words, min(2, len(words))))
+
+
+def typo(code: str, rng: random.Random) -> str:
+    i = rng.randrange(len(code))
+    return code[:i] + rng.choice(string.digits) + code[i + 1:]
+
+
+def us_per_call(fn, args: list) -> float:
+    t0 = time.perf_counter()
+    for arg in args:
+        fn(arg)
+    return (time.perf_counter() - t0) / len(args) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--icd10", type=int, default=75000)
+    parser.add_argument("--cpt", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--budget-us", type=float, default=2000.0)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    entries = synthetic_entries(args.icd10, args.cpt, rng)
+    codes = [code for _, code, _ in entries]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "code_catalog.bin")
+        t0 = time.perf_counter()
+        meta = build_catalog(entries, path)
+        build_s = time.perf_counter() - t0
+        print(f"[*] built {len(entries)} codes in {build_s:.1f}s — {os.path.getsize(path) / 2 ** 20:.1f} MiB, "
+              f"tables {meta['entries']}")
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        t0 = time.perf_counter()
+        catalog = CodeCatalog(path)
+        catalog.info()
+        print(f"[*] opened in {(time.perf_counter() - t0) * 1000:.2f} ms, "
+              f"max RSS +{(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024:.1f} MiB")
+
+        sample = rng.sample(codes, args.queries)
+        rows = [
+            ("exact lookup", catalog.lookup, sample),
+            ("prefix (3 chars)", lambda q: catalog.search(q, limit=10), [c[:3] for c in sample]),
+            ("fuzzy (1 typo)", lambda q: catalog.similar(q, limit=5), [typo(c, rng) for c in sample]),
+            ("description words", lambda q: catalog.search(q, limit=10),
+             [description_query(entries, rng) for _ in sample]),
+        ]
+        worst = 0.0
+        for label, fn, queries in rows:
+            us = us_per_call(fn, queries)
+            worst = max(worst, us)
+            print(f"{label:>20}: {us:8.1f} µs/query")
+    if worst > args.budget_us:
+        print(f"[!] slowest query kind took {worst:.0f} µs > {args.budget_us:.0f} µs budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
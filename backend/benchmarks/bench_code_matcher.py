@@ -0,0 +1,92 @@
+"""
+Benchmark — note code suggestion latency vs note size and rule count.
+Run: python benchmarks/bench_code_matcher.py [--rules 5000] [--repeat 20] [--budget-ms 50]
+
+Generates synthetic clinical notes of 1–50 KB (filler prose with keywords sprinkled in) and times:
+the previous approach (lowercase the note, `kw in text` per keyword per rule), the compiled matcher
+with the built-in rules, and the compiled matcher with --rules synthetic keyword→code rules added.
+Exits non-zero when the compiled matcher with the large rule set exceeds --budget-ms on a 50 KB note.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import random
+import string
+import time
+from services.code_matcher import CodeMatcher, DEFAULT_CODE_RULES
+
+SIZES_KB = [1, 5, 10, 25, 50]
+FILLER = (
+    "patient reports intermittent symptoms over the past several weeks with partial relief from rest "
+    "denies fever or chills vital signs stable exam otherwise unremarkable plan discussed with patient "
+).split()
+KEYWORDS = [kw for rule in DEFAULT_CODE_RULES for kw in rule["keywords"]]
+
+
+def synthetic_rules(n: int, rng: random.Random) -> list:
+    rules = []
+    for i in range(n):
+        words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 11))) for _ in range(rng.randint(1, 2))]
+        rules.append({"keywords": [" ".join(words)], "code": f"Z{i:05d}", "description": f"Synthetic rule {i}", "type": "ICD-10"})
+    return rules
+
+
+def synthetic_note(kb: int, rng: random.Random, extra_keywords: list) -> str:
+    words, size = [], 0
+    while size < kb * 1024:
+        roll = rng.random()
+        word = rng.choice(KEYWORDS) if roll < 0.02 else rng.choice(extra_keywords) if roll < 0.03 else rng.choice(FILLER)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)
+
+
+def legacy_suggest(rules: list, text: str) -> list:
+    text = text.lower()
+    return [rule["code"] for rule in rules if any(kw in text for kw in rule["keywords"])]
+
+
+def ms_per_call(fn, repeat: int) -> float:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rules", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    extra = synthetic_rules(args.rules, rng)
+    t0 = time.perf_counter()
+    small, large = CodeMatcher(DEFAULT_CODE_RULES), CodeMatcher(DEFAULT_CODE_RULES + extra)
+    print(f"[*] compiled {small.rule_count} + {large.rule_count} keywords in {(time.perf_counter() - t0) * 1000:.0f} ms")
+    extra_keywords = [rule["keywords"][0] for rule in extra[:200]]
+
+    print(f"{'note':>6} {'legacy 8':>10} {'compiled 8':>11} {'legacy ' + str(args.rules):>13} {'compiled ' + str(args.rules):>15}  (ms/note)")
+    worst = 0.0
+    for kb in SIZES_KB:
+        note = synthetic_note(kb, rng, extra_keywords)
+        sections = {"subjective": note}
+        row = [
+            ms_per_call(lambda: legacy_suggest(DEFAULT_CODE_RULES, note), args.repeat),
+            ms_per_call(lambda: small.suggest(sections), args.repeat),
+            ms_per_call(lambda: legacy_suggest(DEFAULT_CODE_RULES + extra, note), max(1, args.repeat // 10)),
+            ms_per_call(lambda: large.suggest(sections), args.repeat),
+        ]
+        worst = max(worst, row[3])
+        print(f"{kb:>4}KB {row[0]:>10.2f} {row[1]:>11.2f} {row[2]:>13.2f} {row[3]:>15.2f}")
+    if worst > args.budget_ms:
+        print(f"[!] compiled matcher with {args.rules} rules took {worst:.1f} ms > {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
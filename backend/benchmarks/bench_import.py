@@ -0,0 +1,98 @@
+"""
+Benchmark — bulk import throughput for patients and clinical notes (CSV and NDJSON).
+Run: python benchmarks/bench_import.py [--patients 20000] [--notes 100000] [--budget-rows-s 10000]
+
+Writes synthetic import files to a temp directory (a few malformed rows mixed in), then imports them
+into a throwaway SQLite database with services/import_service.py, without AI enrichment: patients
+from CSV, then notes referencing them by MRN from CSV and from NDJSON (search-indexed as they are
+inserted). Reports rows/s and peak memory growth, and exits non-zero when any import is below
+--budget-rows-s.
+"""
+import sys
+import os
+import shutil
+import tempfile
+
+WORKDIR = tempfile.mkdtemp(prefix="bench-import-")
+os.environ["DATABASE_URL"] = f"sqlite:///{WORKDIR}/bench.db"
+os.environ["UPLOAD_DIR"] = os.path.join(WORKDIR, "uploads")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import csv
+import json
+import random
+import resource
+from database import Base, engine, SessionLocal
+from models import User
+from services.import_service import import_rows
+from services.search_service import ensure_search_index
+
+SECTION = "Patient reports right knee pain with swelling after prolonged walking; denies trauma. " * 3
+NOTE_FIELDS = ["patient_mrn", "note_type", "subjective", "objective", "assessment", "plan", "status", "created_at"]
+
+
+def write_files(n_patients: int, n_notes: int, rng: random.Random) -> dict:
+    paths = {name: os.path.join(WORKDIR, name) for name in ("patients.csv", "notes.csv", "notes.ndjson")}
+    with open(paths["patients.csv"], "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["mrn", "first_name", "last_name", "date_of_birth", "insurance_id", "payer_name"])
+        for i in range(n_patients):
+            dob = "1970-13-45" if i % 1000 == 999 else f"19{rng.randint(40, 99)}-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}"
+            writer.writerow([f"MRN{i:07d}", "Pat", f"Ient{i}", dob, f"INS{i}", "Aetna"])
+
+    def note(i: int) -> dict:
+        return {
+            "patient_mrn": f"MRN{rng.randrange(n_patients):07d}" if i % 1000 != 998 else "MRN-UNKNOWN",
+            "note_type": "SOAP" if i % 1000 != 997 else "Memo",
+            "subjective": SECTION, "objective": SECTION, "assessment": SECTION, "plan": SECTION,
+            "status": "signed", "created_at": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T10:00:00",
+        }
+
+    with open(paths["notes.csv"], "w", newline="") as f:
+        writer = csv.DictWriter(f, NOTE_FIELDS)
+        writer.writeheader()
+        for i in range(n_notes):
+            writer.writerow(note(i))
+    with open(paths["notes.ndjson"], "w") as f:
+        for i in range(n_notes):
+            f.write("{not json\n" if i % 1000 == 996 else json.dumps(note(i)) + "\n")
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--patients", type=int, default=20000)
+    parser.add_argument("--notes", type=int, default=100000)
+    parser.add_argument("--budget-rows-s", type=float, default=10000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
+    db = SessionLocal()
+    db.add(User(email="admin@bench.local", hashed_password="x", full_name="Admin", role="admin"))
+    db.commit()
+    paths = write_files(args.patients, args.notes, random.Random(3))
+    print(f"[*] files in {WORKDIR}: " + ", ".join(f"{n} {os.path.getsize(p) / 2 ** 20:.1f} MiB" for n, p in paths.items()))
+
+    runs = []
+    for kind, name, fmt in [("patients", "patients.csv", "csv"), ("notes", "notes.csv", "csv"), ("notes", "notes.ndjson", "ndjson")]:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        with open(paths[name], encoding="utf-8", newline="") as stream:
+            result = import_rows(db, kind, stream, fmt, user_id=1)
+        runs.append((name, result, (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss) / 1024))
+    db.close()
+
+    print(f"{'file':<14} {'rows':>8} {'inserted':>9} {'rejected':>9} {'seconds':>8} {'rows/s':>9} {'+max RSS MiB':>13}")
+    for name, r, rss_mib in runs:
+        print(f"{name:<14} {r['received']:>8} {r['inserted']:>9} {r['rejected']:>9} {r['seconds']:>8.2f} "
+              f"{r['rows_per_second']:>9.0f} {rss_mib:>13.1f}")
+    shutil.rmtree(WORKDIR, ignore_errors=True)
+    slow = [name for name, r, _ in runs if r["rows_per_second"] < args.budget_rows_s]
+    if slow:
+        print(f"[!] below {args.budget_rows_s:.0f} rows/s: {', '.join(slow)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
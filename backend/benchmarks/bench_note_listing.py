@@ -0,0 +1,115 @@
+"""
+Benchmark — clinical note list latency for a provider with a long note history.
+Run: python benchmarks/bench_note_listing.py [--notes 200000] [--provider-notes 50000] [--budget-ms 50]
+
+Builds a throwaway SQLite database of clinical notes with realistic section and full-note sizes, one
+provider owning --provider-notes of them, and times GET /api/clinical-notes/ through the app: that
+provider's first page (full and summary views), a page 100 pages deep via cursors, a status + date
+filtered page, and a 304 revalidation of the first page. Exits non-zero when the provider's first
+full page exceeds --budget-ms.
+"""
+import sys
+import os
+import shutil
+import tempfile
+
+WORKDIR = tempfile.mkdtemp(prefix="bench-notes-")
+os.environ["DATABASE_URL"] = f"sqlite:///{WORKDIR}/bench.db"
+os.environ["UPLOAD_DIR"] = os.path.join(WORKDIR, "uploads")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from database import Base, engine, SessionLocal
+from models import ClinicalNote, Patient, User
+from services.auth_service import create_token
+import main as app_main
+
+SECTION = "Patient reports right knee pain with swelling after prolonged walking; denies trauma. " * 6
+
+
+def seed(n: int, provider_notes: int, chunk: int = 20000):
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(5)
+    db = SessionLocal()
+    db.execute(insert(User), [{
+        "email": f"provider{i}@bench.local", "hashed_password": "x", "full_name": f"Provider {i}", "role": "provider",
+    } for i in range(1, 21)])
+    db.execute(insert(Patient), [{
+        "mrn": f"BENCH-{i}", "first_name": "Bench", "last_name": f"Patient{i}", "date_of_birth": "1970-01-01",
+    } for i in range(1, 1001)])
+    start = datetime.now(timezone.utc) - timedelta(days=3 * 365)
+    for lo in range(0, n, chunk):
+        db.execute(insert(ClinicalNote), [{
+            "patient_id": rng.randint(1, 1000),
+            "provider_id": 1 if i < provider_notes else rng.randint(2, 20),
+            "note_type": rng.choice(["SOAP", "H&P"]),
+            "subjective": SECTION, "objective": SECTION, "assessment": SECTION, "plan": SECTION,
+            "full_note": SECTION * 5, "suggested_codes": "[]", "ai_suggestions": "[]",
+            "status": rng.choice(["draft", "signed", "signed", "signed"]),
+            "created_at": start + timedelta(seconds=rng.randint(0, 3 * 365 * 86400)),
+        } for i in rng.sample(range(lo, min(n, lo + chunk)), min(n, lo + chunk) - lo)])
+    db.commit()
+    db.close()
+
+
+def ms(fn, repeat: int = 20):
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - t0) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=200000)
+    parser.add_argument("--provider-notes", type=int, default=50000)
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    print(f"[*] seeding {args.notes} notes ({args.provider_notes} for provider 1) in {WORKDIR}")
+    t0 = time.perf_counter()
+    seed(args.notes, args.provider_notes)
+    print(f"[*] seeded in {time.perf_counter() - t0:.1f}s")
+
+    headers = {"Authorization": f"Bearer {create_token(1, 'provider1@bench.local', 'provider')}"}
+    with TestClient(app_main.app) as client:
+        def page(**params):
+            return client.get("/api/clinical-notes/", params=params, headers=headers)
+
+        first_ms, first = ms(lambda: page(provider_id=1))
+        assert first.status_code == 200 and len(first.json()) == 50
+        summary_ms, _ = ms(lambda: page(provider_id=1, view="summary"))
+
+        cursor = None
+        for _ in range(100):
+            cursor = page(provider_id=1, view="summary", cursor=cursor).headers["x-next-cursor"]
+        deep_ms, _ = ms(lambda: page(provider_id=1, cursor=cursor))
+
+        since = (datetime.now(timezone.utc) - timedelta(days=90)).isoformat()
+        filtered_ms, _ = ms(lambda: page(provider_id=1, status="draft", created_from=since))
+        etag = first.headers["etag"]
+        revalidate_ms, cached = ms(lambda: client.get(
+            "/api/clinical-notes/", params={"provider_id": 1}, headers={**headers, "If-None-Match": etag}))
+        assert cached.status_code == 304
+
+    print(f"{'request':<34} {'ms':>8}")
+    for name, value in [
+        ("provider first page (full)", first_ms), ("provider first page (summary)", summary_ms),
+        ("provider page 101 (full)", deep_ms), ("provider drafts, last 90 days", filtered_ms),
+        ("first page revalidation (304)", revalidate_ms),
+    ]:
+        print(f"{name:<34} {value:>8.1f}")
+    shutil.rmtree(WORKDIR, ignore_errors=True)
+    if first_ms > args.budget_ms:
+        print(f"[!] first page took {first_ms:.1f} ms > {args.budget_ms:.0f} ms budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
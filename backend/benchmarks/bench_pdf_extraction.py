@@ -0,0 +1,83 @@
+"""
+Benchmark — serial vs page-parallel PDF text extraction on synthetic PDFs.
+Run: python benchmarks/bench_pdf_extraction.py [--workers N] [--pages 10,100,500]
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+LINES_PER_PAGE = 40
+
+
+def write_synthetic_pdf(path: str, pages: int):
+    """Write a minimal text-only PDF (Helvetica, LINES_PER_PAGE clinical-looking lines per page)."""
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{4 + 2 * i} 0 R" for i in range(pages)), pages),
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i in range(pages):
+        lines = [f"Page {i + 1} line {n}: Patient reports knee pain, prior therapy PT x6 weeks." for n in range(LINES_PER_PAGE)]
+        stream = "BT /F1 9 Tf 36 760 Td 11 TL " + " ".join(f"({line}) '" for line in lines) + " ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for n, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{n} 0 obj\n{obj}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{off:010d} 00000 n \n" for off in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--pages", default="10,100,500")
+    parser.add_argument("--pages-per-task", type=int, default=25)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="pdf-bench-")
+    os.environ["UPLOAD_DIR"] = workdir  # keep the page cache out of the real uploads directory
+    from services.document_service import extract_text_from_pdf, extract_text_parallel
+
+    print(f"[*] workers={args.workers} pages_per_task={args.pages_per_task} workdir={workdir}")
+    print(f"{'pages':>6} {'serial s':>10} {'parallel s':>11} {'speedup':>8} {'serial p/s':>11} {'parallel p/s':>13} {'cached s':>9}")
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        pool.submit(int).result()  # warm up the pool so process start-up isn't measured
+        for pages in (int(p) for p in args.pages.split(",")):
+            path = os.path.join(workdir, f"synthetic-{pages}.pdf")
+            write_synthetic_pdf(path, pages)
+
+            t0 = time.perf_counter()
+            serial = extract_text_from_pdf(path)
+            serial_s = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            parallel = extract_text_parallel(path, pool, content_hash=f"bench{pages:06d}", pages_per_task=args.pages_per_task)
+            parallel_s = time.perf_counter() - t0
+
+            # Second run is served entirely from the per-page cache
+            t0 = time.perf_counter()
+            cached = extract_text_parallel(path, pool, content_hash=f"bench{pages:06d}", pages_per_task=args.pages_per_task)
+            cached_s = time.perf_counter() - t0
+
+            assert serial == parallel == cached, "parallel extraction must reproduce serial output"
+            print(f"{pages:>6} {serial_s:>10.2f} {parallel_s:>11.2f} {serial_s / parallel_s:>7.1f}x "
+                  f"{pages / serial_s:>11.1f} {pages / parallel_s:>13.1f} {cached_s:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
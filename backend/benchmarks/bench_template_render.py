@@ -0,0 +1,83 @@
+"""
+Benchmark — template rendering cost per document type, against a per-render budget.
+Run: python benchmarks/bench_template_render.py [--renders 20000] [--budget-us 50]
+
+Renders every shipped template with a realistic context (templates are compiled on first use, as in
+the app) and reports mean microseconds per render, plus the full generate_* call for comparison.
+Exits non-zero when any template's mean render time exceeds --budget-us, so it can gate CI.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import time
+from services.templates import templates
+from services.ai_service import generate_pa_packet, generate_appeal_letter, generate_clinical_note
+
+PA = {
+    "patient_name": "Jane Doe", "diagnosis_code": "M17.11", "diagnosis_name": "Unilateral primary osteoarthritis, right knee",
+    "procedure_code": "27447", "procedure_name": "Total knee arthroplasty", "payer_name": "Aetna",
+    "clinical_rationale": "Failed 12 weeks of PT and NSAIDs; KL grade 4 on weight-bearing films. " * 4,
+}
+EXTRACTED = {"insurance_id": "AET123456", "medications": "Meloxicam 15mg daily", "prior_therapy": "PT x 12 weeks"}
+NOTE = {"subjective": "Right knee pain, worse with stairs. " * 5, "objective": "Effusion, crepitus. " * 5,
+        "assessment": "Primary OA right knee.", "plan": "Refer to orthopedics."}
+
+CASES = {
+    "pa_packet": ("Aetna", {
+        **PA, "insurance_id": EXTRACTED["insurance_id"], "prior_therapy": EXTRACTED["prior_therapy"],
+        "medications": EXTRACTED["medications"], "imaging_results": "Not documented", "lab_results": "Not documented",
+    }),
+    "appeal_letter": ("Aetna", {
+        **PA, "reference_number": "PA-20260101-ABC123", "denial_reason": "Insufficient documentation",
+        "denial_details": "Missing imaging report",
+    }),
+    "soap_note": (None, {"patient_name": "Jane Doe", **NOTE}),
+    "hp_note": (None, {"patient_name": "Jane Doe", **NOTE}),
+}
+
+GENERATORS = {
+    "generate_pa_packet": lambda: generate_pa_packet(**PA, extracted_data=EXTRACTED),
+    "generate_appeal_letter": lambda: generate_appeal_letter(
+        PA["patient_name"], "PA-20260101-ABC123", "Insufficient documentation", "Missing imaging report",
+        PA["procedure_code"], PA["procedure_name"], PA["diagnosis_code"], PA["diagnosis_name"], PA["payer_name"],
+        PA["clinical_rationale"],
+    ),
+    "generate_clinical_note": lambda: generate_clinical_note("SOAP", "Jane Doe", **NOTE),
+}
+
+
+def per_call_us(fn, n: int) -> float:
+    fn()  # compile / warm caches outside the timed loop
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--renders", type=int, default=20000)
+    parser.add_argument("--budget-us", type=float, default=50.0)
+    args = parser.parse_args()
+
+    print(f"[*] {args.renders} renders each, budget {args.budget_us:.0f} µs/render")
+    print(f"{'template':<24} {'µs/render':>10} {'chars':>7}")
+    over = []
+    for doc_type, (payer, context) in CASES.items():
+        us = per_call_us(lambda: templates.render(doc_type, payer, context), args.renders)
+        chars = len(templates.render(doc_type, payer, context))
+        flag = "  OVER BUDGET" if us > args.budget_us else ""
+        print(f"{doc_type:<24} {us:>10.2f} {chars:>7}{flag}")
+        if flag:
+            over.append(doc_type)
+    for name, fn in GENERATORS.items():
+        print(f"{name:<24} {per_call_us(fn, args.renders // 4):>10.2f}")
+    if over:
+        print(f"[!] over budget: {', '.join(over)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
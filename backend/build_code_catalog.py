@@ -0,0 +1,81 @@
+"""
+Build the memory-mapped code catalog (services/code_catalog.py) from local code set files.
+Run: python build_code_catalog.py [--icd10 FILE] [--cpt FILE] [--hcpcs FILE] [--tsv FILE] [-o PATH]
+
+  --icd10   CMS ICD-10-CM code descriptions file (icd10cm-codes-YYYY.txt: "A000    Cholera due to ...")
+  --cpt     CPT codes, "code<TAB>description" or "code,description" CSV (header row optional)
+  --hcpcs   HCPCS Level II codes, same formats as --cpt
+  --tsv     Mixed "system<TAB>code<TAB>description" (e.g. data/code_catalog_sample.tsv)
+
+Each option may be repeated. With no sources the bundled sample set is used; a sample catalog serves
+autocomplete and lookups but is never used to reject PA codes. Running API workers pick
+up the new file within a few seconds; the old file stays mapped until then.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+import argparse
+import csv
+import time
+from config import settings
+from services.code_catalog import build_catalog
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "data", "code_catalog_sample.tsv")
+
+
+def _lines(path: str):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.rstrip("\r\n")
+            if line.strip() and not line.startswith("#"):
+                yield line
+
+
+def read_icd10(path: str):
+    for line in _lines(path):
+        code, _, description = line.strip().partition(" ")
+        if description.strip():
+            yield "ICD-10", code, description.strip()
+
+
+def read_delimited(path: str, system: str):
+    for row in csv.reader(_lines(path), delimiter="\t" if "\t" in next(_lines(path), "") else ","):
+        if len(row) >= 2 and row[0].strip() and any(ch.isdigit() for ch in row[0]):
+            yield system, row[0].strip(), row[1].strip()
+
+
+def read_tsv(path: str):
+    for line in _lines(path):
+        parts = line.split("\t")
+        if len(parts) >= 3:
+            yield parts[0].strip(), parts[1].strip(), parts[2].strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--icd10", action="append", default=[])
+    parser.add_argument("--cpt", action="append", default=[])
+    parser.add_argument("--hcpcs", action="append", default=[])
+    parser.add_argument("--tsv", action="append", default=[])
+    parser.add_argument("-o", "--output", default=settings.CODE_CATALOG_PATH)
+    args = parser.parse_args()
+
+    sources = []
+    sources += [read_icd10(p) for p in args.icd10]
+    sources += [read_delimited(p, "CPT") for p in args.cpt]
+    sources += [read_delimited(p, "HCPCS") for p in args.hcpcs]
+    sources += [read_tsv(p) for p in args.tsv]
+    sample = not sources
+    if sample:
+        print(f"[*] No sources given; using the sample set {SAMPLE} (codes are not validated against it)")
+        sources = [read_tsv(SAMPLE)]
+
+    t0 = time.perf_counter()
+    meta = build_catalog((entry for source in sources for entry in source), args.output, sample)
+    size = os.path.getsize(args.output)
+    print(f"[+] {args.output}: {meta['systems']} — {size / 1024 / 1024:.1f} MiB in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,10 +7,54 @@ class Settings(BaseSettings):
     # Use /tmp on Linux (App Runner) for writable SQLite; local dev uses relative path
     DATABASE_URL: str = "sqlite:////tmp/priorauth.db" if platform.system() == "Linux" else "sqlite:///./priorauth.db"
     UPLOAD_DIR: str = os.path.join(os.path.dirname(__file__), "uploads")
+    MAX_UPLOAD_MB: int = 100
+    UPLOAD_CHUNK_BYTES: int = 1024 * 1024
     JWT_SECRET: str = "priorauth-dev-secret-change-in-production"
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRE_MINUTES: int = 480
     CORS_ORIGINS: str = "http://localhost:3000,http://127.0.0.1:3000"
+    # Background document extraction (see services/extraction_queue.py)
+    EXTRACTION_WORKERS: int = 2
+    EXTRACTION_QUEUE_DEPTH: int = 16
+    EXTRACTION_POLL_SECONDS: float = 5.0
+    EXTRACTION_PAGES_PER_TASK: int = 25  # 0 extracts each document in a single task
+    EXTRACTION_LEASE_SECONDS: float = 300.0  # unrenewed claims older than this are re-enqueued
+    REEXTRACTION_BATCH_SIZE: int = 100
+    REEXTRACTION_PAUSE_SECONDS: float = 1.0  # throttle between batches
+    REEXTRACTION_LEASE_SECONDS: float = 300.0  # another process may take over a job unrenewed this long
+    BULK_MAX_FILES: int = 200
+    BULK_PROGRESS_POLL_SECONDS: float = 0.5
+    BULK_PROGRESS_TIMEOUT_SECONDS: int = 900
+    # LLM provider (see services/llm_provider.py): "mock" runs in-process, "http" calls LLM_BASE_URL
+    LLM_PROVIDER: str = "mock"
+    LLM_BASE_URL: str = "http://127.0.0.1:8100"
+    LLM_API_KEY: str = ""
+    LLM_MODEL: str = "mock-1"
+    LLM_TIMEOUT_SECONDS: float = 30.0
+    LLM_MAX_CONCURRENCY: int = 8
+    LLM_RETRIES: int = 2
+    LLM_HEDGE_AFTER_SECONDS: float = 0.0  # 0 disables hedged requests
+    # Packet / appeal / note templates (see services/templates.py)
+    TEMPLATE_DIR: str = os.path.join(os.path.dirname(__file__), "templates")
+    TEMPLATE_RELOAD_SECONDS: float = 2.0  # how often template files are re-checked for edits
+    # ICD-10/CPT/HCPCS catalog built by build_code_catalog.py (see services/code_catalog.py)
+    CODE_CATALOG_PATH: str = os.path.join(os.path.dirname(__file__), "data", "code_catalog.bin")
+    CODE_CATALOG_VALIDATE: bool = True  # reject PA codes missing from the catalog's code sets (not the sample)
+    # Extra keyword -> code rules for note code suggestions (JSON list; see services/code_matcher.py)
+    CODE_RULES_FILE: str = ""
+    # Completeness checklist rules (see services/checklist.py)
+    CHECKLIST_RULES_DIR: str = os.path.join(os.path.dirname(__file__), "checklist_rules")
+    CHECKLIST_RELOAD_SECONDS: float = 2.0
+    CHECKLIST_RESCORE_CHUNK_SIZE: int = 5000
+    # Batch packet generation (see services/packet_service.py)
+    PACKET_BATCH_WORKERS: int = 4
+    PACKET_BATCH_CHUNK_SIZE: int = 50
+    PACKET_BATCH_MAX_ITEMS: int = 1000
+    BULK_TRANSITION_MAX_ITEMS: int = 2000
+    # Bulk patient / clinical note import (see services/import_service.py)
+    IMPORT_CHUNK_SIZE: int = 2000  # rows validated and inserted per statement / commit
+    IMPORT_MAX_REJECTIONS_REPORTED: int = 1000
+    IMPORT_ENRICH_CHUNK_SIZE: int = 100  # notes assisted concurrently per batch (inline / deferred enrichment)
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,65 @@
+"""
+Bulk-import patients or clinical notes from CSV or NDJSON (services/import_service.py).
+Run: python import_records.py {patients,notes} FILE [--format csv|ndjson] [--enrich none|inline|deferred]
+                              [--user-email EMAIL] [--chunk-size N]
+
+  patients  columns: mrn, first_name, last_name, date_of_birth, insurance_id, payer_name, diagnosis_codes
+  notes     columns: patient_id or patient_mrn, note_type, subjective, objective, assessment, plan,
+            full_note, status, provider_id, created_at (ISO 8601)
+
+FILE may be "-" for stdin. Notes without provider_id are attributed to --user-email (default: the first
+admin). With --enrich deferred the notes are loaded first and AI-assisted afterwards, before exit.
+Rejected rows are printed with their line numbers; they never stop the import.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+import argparse
+import io
+from database import engine, SessionLocal, Base
+from models import User
+from services.import_service import KINDS, FORMATS, ENRICH_MODES, detect_format, import_rows
+from services.search_service import ensure_search_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("kind", choices=KINDS)
+    parser.add_argument("file")
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument("--enrich", choices=ENRICH_MODES, default="none")
+    parser.add_argument("--user-email")
+    parser.add_argument("--chunk-size", type=int)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
+    db = SessionLocal()
+    try:
+        query = db.query(User.id)
+        user = (query.filter(User.email == args.user_email) if args.user_email else query.filter(User.role == "admin")).first()
+        if user is None:
+            sys.exit(f"[!] No user {args.user_email or 'with role admin'}; run seed.py or pass --user-email")
+
+        fmt = args.format or detect_format(args.file)
+        # surrogateescape: bytes that are not UTF-8 reject only their own row (see import_service)
+        stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8-sig", errors="surrogateescape", newline="") \
+            if args.file == "-" else open(args.file, encoding="utf-8-sig", errors="surrogateescape", newline="")
+        with stream:
+            result = import_rows(db, args.kind, stream, fmt, user.id, args.enrich, args.chunk_size, background=False)
+    finally:
+        db.close()
+
+    for rejection in result["rejections"]:
+        print(f"[-] line {rejection['line']}: {rejection['error']}")
+    if result["rejected"] > len(result["rejections"]):
+        print(f"[-] ... {result['rejected'] - len(result['rejections'])} more rejected rows")
+    print(f"[+] {result['inserted']}/{result['received']} {args.kind} imported, {result['rejected']} rejected "
+          f"in {result['seconds']}s ({result['rows_per_second']:.0f} rows/s)")
+    if result["enrichment_queued"]:
+        print(f"[+] AI-assisted {result['enrichment_queued']} notes (deferred enrichment)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Local LLM stub — serves the LLM_PROVIDER=http protocol with the mock generators and simulated latency.
+Run: python llm_stub_server.py [--port 8100] [--latency-ms 800] [--jitter-ms 400] [--error-rate 0.02]
+
+Point the API at it with LLM_PROVIDER=http LLM_BASE_URL=http://127.0.0.1:8100 to load-test packet,
+appeal and note generation (concurrency limits, retries, hedging) without network access.
+POST /v1/generate/stream spreads the same latency across the document's sections and emits them as
+NDJSON as each one is "produced", for exercising the streaming endpoints.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+import argparse
+import asyncio
+import json
+import random
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from services.ai_service import generate_pa_packet, generate_appeal_letter, generate_clinical_note, assist_note_section
+from services.llm_provider import section_events
+
+TASKS = {
+    "pa_packet": generate_pa_packet,
+    "appeal_letter": generate_appeal_letter,
+    "clinical_note": generate_clinical_note,
+    "note_section": assist_note_section,
+}
+
+
+class GenerateRequest(BaseModel):
+    task: str
+    inputs: dict
+
+
+def create_app(latency_ms: float = 800, jitter_ms: float = 400, error_rate: float = 0.0) -> FastAPI:
+    app = FastAPI(title="LLM stub")
+    stats = {"requests": 0, "errors": 0}
+
+    def latency() -> float:
+        return max(0.0, latency_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000
+
+    def admit(req: GenerateRequest):
+        stats["requests"] += 1
+        if req.task not in TASKS:
+            raise HTTPException(status_code=400, detail=f"Unknown task '{req.task}'")
+        if random.random() < error_rate:
+            stats["errors"] += 1
+            raise HTTPException(status_code=503, detail="Simulated provider overload")
+
+    @app.post("/v1/generate")
+    async def generate(req: GenerateRequest):
+        await asyncio.sleep(latency())
+        admit(req)
+        return {"output": TASKS[req.task](**req.inputs)}
+
+    @app.post("/v1/generate/stream")
+    async def generate_stream(req: GenerateRequest):
+        admit(req)
+        events = section_events(req.task, TASKS[req.task](**req.inputs))
+        per_section = latency() / max(1, len(events) - 1)
+
+        async def produce():
+            for event in events:
+                if event["type"] == "section":
+                    await asyncio.sleep(per_section)
+                yield json.dumps(event) + "\n"
+
+        return StreamingResponse(produce(), media_type="application/x-ndjson")
+
+    @app.get("/stats")
+    def get_stats():
+        return stats
+
+    return app
+
+
+def main():
+    import uvicorn
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--jitter-ms", type=float, default=400)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    print(f"[*] LLM stub on http://{args.host}:{args.port} — latency {args.latency_ms:.0f}±{args.jitter_ms:.0f} ms, "
+          f"error rate {args.error_rate:.0%}")
+    uvicorn.run(create_app(args.latency_ms, args.jitter_ms, args.error_rate), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
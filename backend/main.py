@@ -1,6 +1,7 @@
 import logging
 import traceback
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse, FileResponse, HTMLResponse
@@ -8,7 +9,11 @@ from fastapi.staticfiles import StaticFiles
 from pydantic import ValidationError
 from config import settings
 from database import engine, Base
-from routers import auth, documents, pa_requests, clinical_notes, analytics
+from routers import auth, documents, pa_requests, clinical_notes, analytics, search, codes, imports
+from services.extraction_queue import extraction_queue
+from services.reextraction import reextraction_runner
+from services.llm_provider import llm, LLMError
+from services.search_service import ensure_search_index
 
 # ── Logging ──────────────────────────────────────────────
 logging.basicConfig(
@@ -19,6 +24,19 @@ logger = logging.getLogger("priorauth")
 
 # ── Database ─────────────────────────────────────────────
 Base.metadata.create_all(bind=engine)
+ensure_search_index(engine)
+
+# ── Lifespan ─────────────────────────────────────────────
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    llm.start()
+    extraction_queue.start()
+    reextraction_runner.resume()
+    yield
+    reextraction_runner.stop()
+    extraction_queue.stop()
+    llm.stop()
+
 
 # ── App ──────────────────────────────────────────────────
 app = FastAPI(
@@ -28,6 +46,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     redirect_slashes=False,
+    lifespan=lifespan,
 )
 
 # ── CORS ─────────────────────────────────────────────────
@@ -37,6 +56,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
@@ -61,6 +81,12 @@ async def value_error_handler(request: Request, exc: ValueError):
     return JSONResponse(status_code=400, content={"detail": str(exc)})
 
 
+@app.exception_handler(LLMError)
+async def llm_error_handler(request: Request, exc: LLMError):
+    logger.error(f"LLM provider error on {request.method} {request.url.path}: {exc}")
+    return JSONResponse(status_code=503, content={"detail": "AI provider unavailable. Please try again shortly."})
+
+
 @app.exception_handler(Exception)
 async def generic_exception_handler(request: Request, exc: Exception):
     """Catch-all for unhandled exceptions — returns safe 500 response."""
@@ -86,6 +112,9 @@ app.include_router(documents.router)
 app.include_router(pa_requests.router)
 app.include_router(clinical_notes.router)
 app.include_router(analytics.router)
+app.include_router(search.router)
+app.include_router(codes.router)
+app.include_router(imports.router)
 
 
 # ── Health / Root ────────────────────────────────────────
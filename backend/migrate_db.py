@@ -0,0 +1,158 @@
+"""
+Upgrade an existing database in place to the current models (one-off; safe to re-run).
+Run: python migrate_db.py [--dry-run]
+
+The API creates missing tables with create_all but never alters existing ones, so a database created
+by an older release lacks the columns and indexes added since. This script:
+
+  1. adds every column the models define but the table lacks (scalar defaults become column defaults);
+  2. creates missing indexes;
+  3. moves legacy documents.extracted_text into the compressed text store (document_texts), keyed by
+     content hash or "doc:<id>" for documents uploaded before content hashing, and fills
+     text_length / text_preview. Legacy "[PDF extraction error: ...]" texts are not stored: those
+     documents are marked failed with the message in extraction_error. Documents whose
+     extraction_status column was just added are marked completed when they had text, skipped when
+     they are not PDFs, and pending (re-extracted by the queue) otherwise; an empty legacy text
+     counts as no text.
+
+The old extracted_text column is left in place but unused; drop it once the backfill is verified.
+Stop the API (or run this before starting it) so no worker writes to the tables meanwhile.
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+import argparse
+from sqlalchemy import inspect, text
+from database import engine, SessionLocal, Base
+from models import Document, ExtractionStatus
+from services.document_service import is_pdf
+from services.text_store import store_text, text_key
+
+BACKFILL_BATCH = 500
+LEGACY_ERROR_PREFIX = "[PDF extraction error:"
+
+
+def _literal(value) -> str:
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def add_missing_columns(dry_run: bool) -> dict:
+    """{table: [added column names]} for tables that already exist."""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    added = {}
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        present = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in present:
+                continue
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(dialect=engine.dialect)}"
+            default = column.default.arg if column.default is not None and column.default.is_scalar else None
+            if default is not None:
+                default = getattr(default, "value", default)  # enum members
+                ddl += f" DEFAULT {_literal(default)}"
+                if not column.nullable:
+                    ddl += " NOT NULL"
+            print(f"[+] {ddl}")
+            if not dry_run:
+                with engine.begin() as conn:
+                    conn.execute(text(ddl))
+            added.setdefault(table.name, []).append(column.name)
+    return added
+
+
+def create_missing_indexes(dry_run: bool) -> int:
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    created = 0
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        present = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in present:
+                print(f"[+] CREATE INDEX {index.name} ON {table.name}")
+                if not dry_run:
+                    index.create(bind=engine)
+                created += 1
+    return created
+
+
+def backfill_document_text(status_added: bool, dry_run: bool) -> tuple:
+    """Move legacy extracted_text into document_texts; returns (documents moved, documents marked failed)."""
+    if "extracted_text" not in {c["name"] for c in inspect(engine).get_columns("documents")}:
+        return 0, 0
+    if dry_run:  # the text_length column may not exist yet; just count what would change
+        with engine.connect() as conn:
+            failed = conn.execute(text("SELECT count(*) FROM documents WHERE extracted_text LIKE :p"),
+                                  {"p": LEGACY_ERROR_PREFIX + "%"}).scalar()
+            total = conn.execute(text("SELECT count(*) FROM documents WHERE extracted_text != ''")).scalar()
+            return total - failed, failed
+    db = SessionLocal()
+    moved, failed, last_id = 0, 0, 0
+    try:
+        while True:
+            rows = db.execute(text(
+                "SELECT id, content_hash, extracted_text FROM documents "
+                "WHERE id > :last AND extracted_text != '' AND text_length IS NULL AND extraction_status != :failed "
+                "ORDER BY id LIMIT :n"
+            ), {"last": last_id, "n": BACKFILL_BATCH, "failed": ExtractionStatus.FAILED.value}).all()
+            if not rows:
+                break
+            for doc_id, content_hash, extracted in rows:
+                if extracted.startswith(LEGACY_ERROR_PREFIX):
+                    # The baseline stored failures as text; they belong in extraction_status/error
+                    values = {
+                        "extraction_status": ExtractionStatus.FAILED.value,
+                        "extraction_error": extracted[len(LEGACY_ERROR_PREFIX):].strip().removesuffix("]")[:1000],
+                    }
+                    failed += 1
+                else:
+                    values = store_text(db, text_key(content_hash, doc_id), extracted)
+                    if status_added:
+                        values["extraction_status"] = ExtractionStatus.COMPLETED.value
+                    moved += 1
+                db.query(Document).filter(Document.id == doc_id).update(values, synchronize_session=False)
+                db.flush()
+            last_id = rows[-1][0]
+            db.commit()
+        if status_added:
+            # Documents that never had text: non-PDFs need no extraction, PDFs go back through the queue
+            for doc in db.query(Document.id, Document.original_filename, Document.content_type).filter(
+                Document.text_length.is_(None), Document.extraction_status == ExtractionStatus.PENDING.value,
+            ).all():
+                if not is_pdf(doc.original_filename, doc.content_type):
+                    db.query(Document).filter(Document.id == doc.id).update(
+                        {"extraction_status": ExtractionStatus.SKIPPED.value, "text_length": 0},
+                        synchronize_session=False,
+                    )
+            db.commit()
+    finally:
+        db.close()
+    return moved, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Print the changes without committing them")
+    args = parser.parse_args()
+
+    if not args.dry_run:
+        Base.metadata.create_all(bind=engine)  # new tables (document_texts, ...) with their indexes
+    added = add_missing_columns(args.dry_run)
+    indexes = create_missing_indexes(args.dry_run)
+    moved, failed = backfill_document_text("extraction_status" in added.get("documents", []), args.dry_run)
+    columns = sum(len(names) for names in added.values())
+    print(f"[{'dry-run' if args.dry_run else 'OK'}] {columns} column(s) added, {indexes} index(es) created, "
+          f"{moved} document text(s) moved to document_texts, {failed} legacy extraction error(s) marked failed")
+
+
+if __name__ == "__main__":
+    main()
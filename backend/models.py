@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, ForeignKey, LargeBinary, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import enum
@@ -46,6 +46,14 @@ class User(Base):
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
 
+class ExtractionStatus(str, enum.Enum):
+    PENDING = "pending"
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    SKIPPED = "skipped"  # non-PDF uploads
+
+
 class Patient(Base):
     __tablename__ = "patients"
     id = Column(Integer, primary_key=True, index=True)
@@ -68,14 +76,55 @@ class Document(Base):
     file_path = Column(String(1000), nullable=False)
     file_size = Column(Integer, nullable=True)
     content_type = Column(String(100), nullable=True)
-    extracted_text = Column(Text, nullable=True)
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of the stored file
+    text_length = Column(Integer, nullable=True)  # full text lives in document_texts
+    text_preview = Column(String(300), nullable=True)
     extracted_data = Column(Text, nullable=True)  # JSON string of structured extraction
-    pa_request_id = Column(Integer, ForeignKey("pa_requests.id"), nullable=True)
+    extraction_status = Column(String(20), nullable=False, default=ExtractionStatus.PENDING.value, index=True)
+    extraction_error = Column(Text, nullable=True)
+    claimed_by = Column(String(100), nullable=True)  # extraction queue instance processing the row
+    claimed_at = Column(DateTime, nullable=True)  # its last heartbeat; stale claims are re-enqueued
+    extracted_at = Column(DateTime, nullable=True)
+    text_extractor_version = Column(String(50), nullable=True)  # produced the stored text
+    data_extractor_version = Column(String(50), nullable=True)  # produced extracted_data
+    pa_request_id = Column(Integer, ForeignKey("pa_requests.id"), nullable=True, index=True)
     uploaded_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     pa_request = relationship("PARequest", back_populates="documents")
 
 
+class DocumentText(Base):
+    """Compressed extracted text, shared by every Document with the same content hash ("doc:<id>" without one)."""
+    __tablename__ = "document_texts"
+    content_hash = Column(String(64), primary_key=True)
+    codec = Column(String(10), nullable=False, default="zlib")
+    compressed_text = Column(LargeBinary, nullable=False)
+    text_length = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class ReextractionJob(Base):
+    """Progress of a background re-extraction run; last_document_id makes it resumable."""
+    __tablename__ = "reextraction_jobs"
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String(20), nullable=False, default="running")  # running, completed, cancelled, failed
+    text_extractor_version = Column(String(50), nullable=False)
+    data_extractor_version = Column(String(50), nullable=False)
+    last_document_id = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    restructured = Column(Integer, nullable=False, default=0)  # structured step re-run from stored text
+    requeued = Column(Integer, nullable=False, default=0)  # sent back to the extraction queue
+    error = Column(Text, nullable=True)
+    claimed_by = Column(String(100), nullable=True)  # process running the job
+    claimed_at = Column(DateTime, nullable=True)  # its last heartbeat; a stale claim can be taken over
+    started_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    finished_at = Column(DateTime, nullable=True)
+
+
 class PARequest(Base):
     __tablename__ = "pa_requests"
     id = Column(Integer, primary_key=True, index=True)
@@ -90,9 +139,11 @@ class PARequest(Base):
     priority = Column(String(20), nullable=True, default="standard")
     clinical_rationale = Column(Text, nullable=True)
     generated_packet = Column(Text, nullable=True)  # AI-generated PA packet
+    packet_fingerprint = Column(String(64), nullable=True)  # hash of the inputs generated_packet was built from
     completeness_checklist = Column(Text, nullable=True)  # JSON checklist
     missing_evidence = Column(Text, nullable=True)  # JSON list of missing items
     appeal_letter = Column(Text, nullable=True)
+    appeal_fingerprint = Column(String(64), nullable=True)
     denial_reason = Column(String(100), nullable=True)
     denial_details = Column(Text, nullable=True)
     submitted_by = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -104,6 +155,15 @@ class PARequest(Base):
     turnaround_days = Column(Float, nullable=True)
     patient = relationship("Patient", back_populates="pa_requests")
     documents = relationship("Document", back_populates="pa_request")
+    # Keyset pagination on (created_at, id), alone and behind each list filter
+    __table_args__ = (
+        Index("ix_pa_requests_created", "created_at", "id"),
+        Index("ix_pa_requests_status_created", "status", "created_at", "id"),
+        Index("ix_pa_requests_payer_created", "payer_name", "created_at", "id"),
+        Index("ix_pa_requests_priority_created", "priority", "created_at", "id"),
+        Index("ix_pa_requests_patient_created", "patient_id", "created_at", "id"),
+        Index("ix_pa_requests_submitter_created", "submitted_by", "created_at", "id"),
+    )
 
 
 class ClinicalNote(Base):
@@ -119,9 +179,18 @@ class ClinicalNote(Base):
     full_note = Column(Text, nullable=True)
     suggested_codes = Column(Text, nullable=True)  # JSON list of suggested codes
     ai_suggestions = Column(Text, nullable=True)  # JSON AI improvement suggestions
+    section_cache = Column(Text, nullable=True)  # JSON {section: {"hash", "suggestions", "codes"}} per-section AI assist results
     status = Column(String(50), nullable=False, default="draft")
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+    # Keyset pagination on (created_at, id), alone and behind each list filter
+    __table_args__ = (
+        Index("ix_clinical_notes_created", "created_at", "id"),
+        Index("ix_clinical_notes_patient_created", "patient_id", "created_at", "id"),
+        Index("ix_clinical_notes_provider_created", "provider_id", "created_at", "id"),
+        Index("ix_clinical_notes_status_created", "status", "created_at", "id"),
+        Index("ix_clinical_notes_type_created", "note_type", "created_at", "id"),
+    )
 
 
 class DenialRecord(Base):
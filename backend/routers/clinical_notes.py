@@ -1,30 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func
+from sqlalchemy.orm import Session, load_only
+from typing import Optional, Union
 from database import get_db
 from models import ClinicalNote, Patient, User
-from schemas import ClinicalNoteCreate, ClinicalNoteUpdate, ClinicalNoteOut
+from schemas import (
+    ClinicalNoteCreate, ClinicalNoteUpdate, ClinicalNoteOut, ClinicalNoteSummaryOut, StatusCountsOut, LIST_VIEW_PATTERN,
+)
 from services.auth_service import get_current_user
-from services.ai_service import generate_clinical_note
+from services.http_cache import version_etag, not_modified
+from services.pagination import keyset_page, NEXT_CURSOR_HEADER, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from services.note_service import assist_note
+from services.search_service import index_note
 
 router = APIRouter(prefix="/api/clinical-notes", tags=["Clinical Notes"])
 
 
+# The AI-assist handlers are async so they await the LLM without holding a worker thread; their
+# (synchronous) Session work runs in the threadpool through these helpers, never on the event loop.
+def _patient_name(db: Session, patient_id: int) -> Optional[str]:
+    patient = db.query(Patient).filter(Patient.id == patient_id).first()
+    return f"{patient.first_name} {patient.last_name}" if patient else None
+
+
+def _load_note(db: Session, note_id: int, changes: Optional[dict] = None) -> tuple:
+    """(note with `changes` applied, patient name or None); 404 if the note doesn't exist."""
+    note = db.query(ClinicalNote).filter(ClinicalNote.id == note_id).first()
+    if not note:
+        raise HTTPException(status_code=404, detail="Note not found")
+    for key, val in (changes or {}).items():
+        setattr(note, key, val)
+    return note, _patient_name(db, note.patient_id)
+
+
+def _save_note(db: Session, note: ClinicalNote, patient_name: str) -> ClinicalNoteOut:
+    if note.id is None:
+        db.add(note)
+        db.flush()
+    index_note(db, note, patient_name)
+    db.commit()
+    db.refresh(note)
+    return ClinicalNoteOut.model_validate(note)
+
+
 @router.post("/", response_model=ClinicalNoteOut)
-def create_note(data: ClinicalNoteCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    patient = db.query(Patient).filter(Patient.id == data.patient_id).first()
-    if not patient:
+async def create_note(data: ClinicalNoteCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    patient_name = await run_in_threadpool(_patient_name, db, data.patient_id)
+    if patient_name is None:
         raise HTTPException(status_code=404, detail="Patient not found")
 
-    patient_name = f"{patient.first_name} {patient.last_name}"
-    ai_result = generate_clinical_note(
-        note_type=data.note_type,
-        patient_name=patient_name,
-        subjective=data.subjective or "",
-        objective=data.objective or "",
-        assessment=data.assessment or "",
-        plan=data.plan or "",
-    )
-
     note = ClinicalNote(
         patient_id=data.patient_id,
         provider_id=current_user.id,
@@ -33,62 +59,139 @@ def create_note(data: ClinicalNoteCreate, db: Session = Depends(get_db), current
         objective=data.objective,
         assessment=data.assessment,
         plan=data.plan,
-        full_note=ai_result["full_note"],
-        suggested_codes=ai_result["suggested_codes"],
-        ai_suggestions=ai_result["ai_suggestions"],
     )
-    db.add(note)
-    db.commit()
-    db.refresh(note)
-    return ClinicalNoteOut.model_validate(note)
+    await assist_note(note, patient_name)
+    return await run_in_threadpool(_save_note, db, note, patient_name)
+
 
+def _filter_notes(query, patient_id=None, provider_id=None, status=None, note_type=None,
+                  created_from=None, created_to=None):
+    if patient_id:
+        query = query.filter(ClinicalNote.patient_id == patient_id)
+    if provider_id:
+        query = query.filter(ClinicalNote.provider_id == provider_id)
+    if status:
+        query = query.filter(ClinicalNote.status == status)
+    if note_type:
+        query = query.filter(ClinicalNote.note_type == note_type)
+    if created_from:
+        query = query.filter(ClinicalNote.created_at >= created_from)
+    if created_to:
+        query = query.filter(ClinicalNote.created_at < created_to)
+    return query
 
-@router.get("/", response_model=list[ClinicalNoteOut])
-def list_notes(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    notes = db.query(ClinicalNote).order_by(ClinicalNote.created_at.desc()).all()
-    return [ClinicalNoteOut.model_validate(n) for n in notes]
+
+@router.get("/", response_model=Union[list[ClinicalNoteSummaryOut], list[ClinicalNoteOut]])
+def list_notes(
+    request: Request,
+    response: Response,
+    patient_id: Optional[int] = None,
+    provider_id: Optional[int] = None,
+    status: Optional[str] = None,
+    note_type: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    view: str = Query("full", pattern=LIST_VIEW_PATTERN),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    One page of clinical notes, newest first by default. Pass the X-Next-Cursor response header
+    back as `cursor` for the next page; the header is absent on the last page.
+    view=summary selects only the list columns and skips note sections and AI output.
+    """
+    query = _filter_notes(db.query(ClinicalNote), patient_id, provider_id, status, note_type, created_from, created_to)
+
+    # Resolve the page on version columns only; the ETag is known before any full row is loaded.
+    versions, next_cursor = keyset_page(
+        query.with_entities(ClinicalNote.id, ClinicalNote.created_at, ClinicalNote.updated_at),
+        ClinicalNote, cursor, limit, descending=order == "desc",
+    )
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    cached = not_modified(request, response, version_etag("note-list", view, [(row.id, row.updated_at) for row in versions], next_cursor))
+    if cached:
+        return cached
+
+    ids = [row.id for row in versions]
+    query = db.query(ClinicalNote)
+    if view == "summary":
+        query = query.options(load_only(
+            ClinicalNote.id, ClinicalNote.patient_id, ClinicalNote.provider_id, ClinicalNote.note_type,
+            ClinicalNote.status, ClinicalNote.created_at, ClinicalNote.updated_at,
+        ))
+    by_id = {note.id: note for note in query.filter(ClinicalNote.id.in_(ids))} if ids else {}
+    schema = ClinicalNoteSummaryOut if view == "summary" else ClinicalNoteOut
+    return [schema.model_validate(by_id[note_id]) for note_id in ids if note_id in by_id]
+
+
+@router.get("/counts", response_model=StatusCountsOut)
+def count_notes(
+    patient_id: Optional[int] = None,
+    provider_id: Optional[int] = None,
+    note_type: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Clinical note counts per status under the list filters (for KPIs; the list itself is paginated)."""
+    query = _filter_notes(db.query(ClinicalNote.status, func.count(ClinicalNote.id)), patient_id, provider_id, None,
+                          note_type, created_from, created_to)
+    by_status = dict(query.group_by(ClinicalNote.status).all())
+    return StatusCountsOut(total=sum(by_status.values()), by_status=by_status)
 
 
 @router.get("/{note_id}", response_model=ClinicalNoteOut)
-def get_note(note_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_note(
+    note_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    version = db.query(ClinicalNote.updated_at).filter(ClinicalNote.id == note_id).first()
+    if not version:
+        raise HTTPException(status_code=404, detail="Note not found")
+    cached = not_modified(request, response, version_etag("note", note_id, version.updated_at))
+    if cached:
+        return cached
     note = db.query(ClinicalNote).filter(ClinicalNote.id == note_id).first()
     if not note:
         raise HTTPException(status_code=404, detail="Note not found")
     return ClinicalNoteOut.model_validate(note)
 
 
+def _assist_header(response: Response, outcome: dict):
+    response.headers["X-Assist-Generated"] = ",".join(outcome["generated"])
+
+
 @router.patch("/{note_id}", response_model=ClinicalNoteOut)
-def update_note(note_id: int, data: ClinicalNoteUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    note = db.query(ClinicalNote).filter(ClinicalNote.id == note_id).first()
-    if not note:
-        raise HTTPException(status_code=404, detail="Note not found")
-    update_data = data.model_dump(exclude_unset=True)
-    for key, val in update_data.items():
-        setattr(note, key, val)
-    db.commit()
-    db.refresh(note)
-    return ClinicalNoteOut.model_validate(note)
+async def update_note(
+    note_id: int,
+    data: ClinicalNoteUpdate,
+    response: Response,
+    assist: bool = Query(False, description="Re-run AI assist for the changed sections in the same request"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    note, patient_name = await run_in_threadpool(_load_note, db, note_id, data.model_dump(exclude_unset=True))
+    if assist:
+        _assist_header(response, await assist_note(note, patient_name or "Unknown"))
+    return await run_in_threadpool(_save_note, db, note, patient_name or "")
 
 
 @router.post("/{note_id}/ai-assist", response_model=ClinicalNoteOut)
-def ai_assist_note(note_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    note = db.query(ClinicalNote).filter(ClinicalNote.id == note_id).first()
-    if not note:
-        raise HTTPException(status_code=404, detail="Note not found")
-    patient = db.query(Patient).filter(Patient.id == note.patient_id).first()
-    patient_name = f"{patient.first_name} {patient.last_name}" if patient else "Unknown"
-
-    ai_result = generate_clinical_note(
-        note_type=note.note_type,
-        patient_name=patient_name,
-        subjective=note.subjective or "",
-        objective=note.objective or "",
-        assessment=note.assessment or "",
-        plan=note.plan or "",
-    )
-    note.full_note = ai_result["full_note"]
-    note.suggested_codes = ai_result["suggested_codes"]
-    note.ai_suggestions = ai_result["ai_suggestions"]
-    db.commit()
-    db.refresh(note)
-    return ClinicalNoteOut.model_validate(note)
+async def ai_assist_note(
+    note_id: int,
+    response: Response,
+    force: bool = Query(False, description="Regenerate every section instead of reusing unchanged ones"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    note, patient_name = await run_in_threadpool(_load_note, db, note_id)
+    _assist_header(response, await assist_note(note, patient_name or "Unknown", force))
+    return await run_in_threadpool(_save_note, db, note, patient_name or "")
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from models import User
+from schemas import CodeEntry, CodeLookup
+from services.auth_service import get_current_user
+from services.code_catalog import code_catalog, CatalogUnavailable, DIAGNOSIS_SYSTEMS, PROCEDURE_SYSTEMS
+
+router = APIRouter(prefix="/api/codes", tags=["Codes"])
+
+_SYSTEM_GROUPS = {"diagnosis": DIAGNOSIS_SYSTEMS, "procedure": PROCEDURE_SYSTEMS}
+
+
+def _systems(system: Optional[str]) -> Optional[tuple]:
+    if system is None:
+        return None
+    return _SYSTEM_GROUPS.get(system, (system,))
+
+
+@router.get("")
+@router.get("/", include_in_schema=False)
+def catalog_info(current_user: User = Depends(get_current_user)):
+    """Whether the code catalog is built, and how many codes each code set holds."""
+    return code_catalog.info()
+
+
+@router.get("/search", response_model=list[CodeEntry])
+def search_codes(
+    q: str = Query(..., min_length=1, max_length=100),
+    system: Optional[str] = Query(None, description="ICD-10, CPT, HCPCS, or diagnosis / procedure"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+):
+    """Autocomplete by code prefix, codes one typo away, or description words (e.g. "knee arthro")."""
+    try:
+        return code_catalog.search(q, _systems(system), limit)
+    except CatalogUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get("/{code}", response_model=CodeLookup)
+def lookup_code(
+    code: str,
+    system: Optional[str] = Query(None, description="ICD-10, CPT, HCPCS, or diagnosis / procedure"),
+    current_user: User = Depends(get_current_user),
+):
+    """Validate one code; unknown codes come back with the closest catalog codes."""
+    try:
+        entry = code_catalog.lookup(code, _systems(system))
+        return CodeLookup(
+            valid=entry is not None, entry=entry,
+            suggestions=[] if entry else code_catalog.similar(code, _systems(system)),
+        )
+    except CatalogUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
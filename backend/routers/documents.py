@@ -1,69 +1,362 @@
+import os
 import json
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from typing import Optional
-from database import get_db
-from models import Document, User
-from schemas import DocumentOut
-from services.auth_service import get_current_user
-from services.document_service import save_file, extract_text_from_pdf, extract_structured_data
+import time
+import asyncio
+import zipfile
+from urllib.parse import quote
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse, PlainTextResponse, FileResponse
+from sqlalchemy.orm import Session, load_only
+from typing import Optional, List, Union
+from config import settings
+from database import get_db, SessionLocal
+from models import Document, ExtractionStatus, PARequest, ReextractionJob, User
+from schemas import DocumentOut, DocumentSummaryOut, DocumentStatusOut, ReextractionJobOut, LIST_VIEW_PATTERN
+from services.auth_service import get_current_user, require_role
+from services.document_service import save_upload, is_pdf, iter_batch_files, UploadTooLargeError, ZIP_MEMBER_ERRORS
+from services.extraction_queue import extraction_queue, reuse_extractions
+from services.reextraction import reextraction_runner
+from services.text_store import load_text, text_key
+from services.search_service import index_documents
+from services.http_cache import (
+    http_date, is_not_modified, range_applies, parse_byte_range, RangeNotSatisfiable, version_etag, not_modified,
+)
 
 router = APIRouter(prefix="/api/documents", tags=["Documents"])
 
+TERMINAL_STATUSES = {ExtractionStatus.COMPLETED.value, ExtractionStatus.FAILED.value, ExtractionStatus.SKIPPED.value}
 
-@router.post("/upload", response_model=DocumentOut)
-async def upload_document(
-    file: UploadFile = File(...),
-    pa_request_id: Optional[int] = Form(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    contents = await file.read()
-    file_info = save_file(contents, file.filename or "upload.pdf", file.content_type or "application/pdf")
-
-    # Extract text from PDF
-    extracted_text = ""
-    extracted_data = {}
-    if file.content_type == "application/pdf" or (file.filename and file.filename.lower().endswith(".pdf")):
-        extracted_text = extract_text_from_pdf(file_info["file_path"])
-        extracted_data = extract_structured_data(extracted_text)
 
-    doc = Document(
+def _new_document(file_info: dict, pa_request_id: Optional[int], user_id: int) -> Document:
+    """Document row for a stored file; PDFs start pending and are extracted by the background queue."""
+    pdf = is_pdf(file_info["original_filename"], file_info["content_type"])
+    return Document(
         filename=file_info["filename"],
         original_filename=file_info["original_filename"],
         file_path=file_info["file_path"],
         file_size=file_info["file_size"],
         content_type=file_info["content_type"],
-        extracted_text=extracted_text,
-        extracted_data=json.dumps(extracted_data) if extracted_data else None,
+        content_hash=file_info["content_hash"],
+        text_length=None if pdf else 0,
+        extraction_status=ExtractionStatus.PENDING.value if pdf else ExtractionStatus.SKIPPED.value,
         pa_request_id=pa_request_id,
-        uploaded_by=current_user.id,
+        uploaded_by=user_id,
     )
-    db.add(doc)
+
+
+# Upload handlers are async to stream request bodies; their Session work runs in the threadpool
+# through these helpers, never on the event loop.
+def _pa_exists(db: Session, pa_request_id: int) -> bool:
+    return db.query(PARequest.id).filter(PARequest.id == pa_request_id).first() is not None
+
+
+def _insert_documents(db: Session, docs: list) -> list:
+    """
+    Insert and index new Document rows in one transaction; returns their [(id, extraction_status)].
+    Identical content already extracted for another upload is reused instead of re-running pdfplumber.
+    """
+    reuse_extractions(db, docs)
+    db.add_all(docs)
+    db.flush()
+    index_documents(db, docs)
+    inserted = [(doc.id, doc.extraction_status) for doc in docs]
     db.commit()
-    db.refresh(doc)
+    if any(status == ExtractionStatus.PENDING.value for _, status in inserted):
+        extraction_queue.notify()
+    return inserted
+
+
+def _finished_extractions(ids: set) -> list:
+    poll_db = SessionLocal()
+    try:
+        return poll_db.query(Document.id, Document.extraction_status, Document.extraction_error).filter(
+            Document.id.in_(ids), Document.extraction_status.in_(TERMINAL_STATUSES)
+        ).all()
+    finally:
+        poll_db.close()
+
+
+@router.post("/upload", response_model=DocumentOut)
+async def upload_document(
+    file: UploadFile = File(...),
+    pa_request_id: Optional[int] = Form(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    try:
+        file_info = await run_in_threadpool(
+            save_upload, file.file, file.filename or "upload.pdf", file.content_type or "application/pdf"
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    # PDF extraction runs in the background queue; poll /{doc_id}/status for completion.
+    doc = _new_document(file_info, pa_request_id, current_user.id)
+    await run_in_threadpool(_insert_documents, db, [doc])
+    await run_in_threadpool(db.refresh, doc)
     return DocumentOut.model_validate(doc)
 
 
-@router.get("/", response_model=list[DocumentOut])
+def _save_batch(files: List[UploadFile]) -> list:
+    """
+    Stream every uploaded file (and every ZIP member) to storage; per-file errors don't stop the batch.
+    Files past BULK_MAX_FILES are not stored but still reported, each as rejected.
+    """
+    results = []
+    accepted = 0
+    for upload in files:
+        try:
+            for name, content_type, open_stream in iter_batch_files(
+                upload.filename or "upload.pdf", upload.content_type or "application/pdf", upload.file
+            ):
+                if accepted >= settings.BULK_MAX_FILES:
+                    results.append({"filename": name, "error": f"Batch exceeds {settings.BULK_MAX_FILES} files"})
+                    continue
+                accepted += 1
+                try:
+                    with open_stream() as stream:
+                        results.append({"filename": name, "file_info": save_upload(stream, name, content_type)})
+                except UploadTooLargeError as e:
+                    results.append({"filename": name, "error": str(e)})
+                except ZIP_MEMBER_ERRORS as e:
+                    reason = "password-protected" if isinstance(e, RuntimeError) else str(e)
+                    results.append({"filename": name, "error": f"Unreadable archive member: {reason}"})
+        except zipfile.BadZipFile:
+            results.append({"filename": upload.filename, "error": "Invalid ZIP archive"})
+    return results
+
+
+def _ndjson(event: dict) -> str:
+    return json.dumps(event, default=str) + "\n"
+
+
+@router.post("/bulk")
+async def bulk_upload_documents(
+    files: List[UploadFile] = File(...),
+    pa_request_id: Optional[int] = Form(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Attach a batch of files (PDFs and/or ZIP archives of PDFs) in one request. All Document rows
+    are inserted in one transaction; the response is an NDJSON stream with one "stored"/"rejected"
+    event per file, then "extracted"/"failed" events as background extraction finishes, then "done".
+    """
+    if pa_request_id and not await run_in_threadpool(_pa_exists, db, pa_request_id):
+        raise HTTPException(status_code=404, detail="PA Request not found")
+
+    results = await run_in_threadpool(_save_batch, files)
+    stored = [r for r in results if "file_info" in r]
+    docs = [_new_document(r["file_info"], pa_request_id, current_user.id) for r in stored]
+    inserted = await run_in_threadpool(_insert_documents, db, docs)
+    for r, (doc_id, extraction_status) in zip(stored, inserted):
+        r["document_id"] = doc_id
+        r["extraction_status"] = extraction_status
+
+    async def progress():
+        for index, r in enumerate(results):
+            if "error" in r:
+                yield _ndjson({"event": "rejected", "index": index, "filename": r["filename"], "error": r["error"]})
+            else:
+                yield _ndjson({
+                    "event": "stored", "index": index, "filename": r["filename"], "document_id": r["document_id"],
+                    "deduplicated": r["file_info"]["deduplicated"], "extraction_status": r["extraction_status"],
+                })
+
+        waiting = {r["document_id"] for r in stored if r["extraction_status"] not in TERMINAL_STATUSES}
+        deadline = time.monotonic() + settings.BULK_PROGRESS_TIMEOUT_SECONDS
+        while waiting and time.monotonic() < deadline:
+            await asyncio.sleep(settings.BULK_PROGRESS_POLL_SECONDS)
+            rows = await run_in_threadpool(_finished_extractions, set(waiting))
+            for row in rows:
+                waiting.discard(row.id)
+                if row.extraction_status == ExtractionStatus.COMPLETED.value:
+                    yield _ndjson({"event": "extracted", "document_id": row.id})
+                else:
+                    yield _ndjson({"event": "failed", "document_id": row.id, "error": row.extraction_error})
+
+        yield _ndjson({
+            "event": "done",
+            "stored": len(stored),
+            "rejected": len(results) - len(stored),
+            "still_pending": sorted(waiting),
+        })
+
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
+
+
+@router.get("/", response_model=Union[list[DocumentSummaryOut], list[DocumentOut]])
 def list_documents(
+    request: Request,
+    response: Response,
     pa_request_id: Optional[int] = None,
+    view: str = Query("full", pattern=LIST_VIEW_PATTERN),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    versions = db.query(Document.id, Document.updated_at)
+    if pa_request_id:
+        versions = versions.filter(Document.pa_request_id == pa_request_id)
+    etag = version_etag("document-list", view, pa_request_id, [tuple(row) for row in versions.order_by(Document.created_at.desc())])
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+
     query = db.query(Document)
+    if view == "summary":
+        query = query.options(load_only(
+            Document.id, Document.original_filename, Document.file_size, Document.content_type,
+            Document.extraction_status, Document.pa_request_id, Document.created_at,
+        ))
     if pa_request_id:
         query = query.filter(Document.pa_request_id == pa_request_id)
     docs = query.order_by(Document.created_at.desc()).all()
-    return [DocumentOut.model_validate(d) for d in docs]
+    schema = DocumentSummaryOut if view == "summary" else DocumentOut
+    return [schema.model_validate(d) for d in docs]
+
+
+# ── Re-extraction ────────────────────────────────────────
+@router.post("/reextract", response_model=ReextractionJobOut, status_code=202)
+def start_reextraction(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role("admin", "manager")),
+):
+    """Reprocess documents extracted by an older extractor version; returns the running job if one exists."""
+    job_id = reextraction_runner.start_job(current_user.id)
+    return ReextractionJobOut.model_validate(db.get(ReextractionJob, job_id))
+
+
+@router.get("/reextract/{job_id}", response_model=ReextractionJobOut)
+def get_reextraction(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    job = db.get(ReextractionJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Re-extraction job not found")
+    return ReextractionJobOut.model_validate(job)
+
+
+@router.post("/reextract/{job_id}/cancel", response_model=ReextractionJobOut)
+def cancel_reextraction(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role("admin", "manager")),
+):
+    if not reextraction_runner.cancel(job_id):
+        raise HTTPException(status_code=409, detail="Job is not running")
+    return ReextractionJobOut.model_validate(db.get(ReextractionJob, job_id))
+
+
+@router.get("/{doc_id}/status", response_model=DocumentStatusOut)
+def get_document_status(
+    doc_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    doc = db.query(
+        Document.id, Document.extraction_status, Document.extraction_error, Document.extracted_at,
+        Document.text_extractor_version, Document.data_extractor_version,
+    ).filter(Document.id == doc_id).first()
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return DocumentStatusOut.model_validate(doc)
+
+
+@router.get("/{doc_id}/text", response_class=PlainTextResponse)
+def get_document_text(
+    doc_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Full extracted text, decompressed from the side store. List/detail responses only carry a preview."""
+    doc = db.query(Document.content_hash, Document.text_length).filter(Document.id == doc_id).first()
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+    text = load_text(db, text_key(doc.content_hash, doc_id))
+    if text is None:
+        if doc.text_length is None:
+            raise HTTPException(status_code=409, detail="Text extraction has not finished")
+        text = ""
+    return PlainTextResponse(text)
+
+
+def _iter_file_range(path: str, start: int, length: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(settings.UPLOAD_CHUNK_BYTES, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+@router.get("/{doc_id}/download")
+def download_document(
+    doc_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Stream the original file. Full downloads go through FileResponse (zero-copy where the server
+    supports it); a single "Range: bytes=..." request is answered with 206 so PDF viewers can fetch
+    incrementally. ETag (content hash) and Last-Modified let browsers revalidate with a 304.
+    """
+    doc = db.query(
+        Document.file_path, Document.original_filename, Document.content_type, Document.content_hash
+    ).filter(Document.id == doc_id).first()
+    if not doc:
+        raise HTTPException(status_code=404, detail="Document not found")
+    try:
+        stat = os.stat(doc.file_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Stored file is missing")
+
+    etag = f'"{doc.content_hash}"' if doc.content_hash else f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(stat.st_mtime),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f"inline; filename*=UTF-8''{quote(doc.original_filename)}",
+    }
+    if is_not_modified(request, etag, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    media_type = doc.content_type or "application/octet-stream"
+    try:
+        byte_range = parse_byte_range(request.headers.get("range"), stat.st_size) if range_applies(request, etag) else None
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{stat.st_size}"})
+    if byte_range is None:
+        return FileResponse(doc.file_path, media_type=media_type, headers=headers, stat_result=stat)
+
+    start, end = byte_range
+    length = end - start + 1
+    headers.update({"Content-Range": f"bytes {start}-{end}/{stat.st_size}", "Content-Length": str(length)})
+    return StreamingResponse(
+        _iter_file_range(doc.file_path, start, length), status_code=206, media_type=media_type, headers=headers
+    )
 
 
 @router.get("/{doc_id}", response_model=DocumentOut)
 def get_document(
     doc_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    version = db.query(Document.updated_at).filter(Document.id == doc_id).first()
+    if not version:
+        raise HTTPException(status_code=404, detail="Document not found")
+    cached = not_modified(request, response, version_etag("document", doc_id, version.updated_at))
+    if cached:
+        return cached
     doc = db.query(Document).filter(Document.id == doc_id).first()
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
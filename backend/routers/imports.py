@@ -0,0 +1,35 @@
+import io
+from fastapi import APIRouter, Depends, File, Path, Query, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from typing import Optional
+from database import get_db
+from models import User
+from schemas import ImportResultOut
+from services.auth_service import require_role
+from services.import_service import detect_format, import_rows
+
+router = APIRouter(prefix="/api/imports", tags=["Imports"])
+
+
+@router.post("/{kind}", response_model=ImportResultOut)
+async def import_records(
+    kind: str = Path(..., pattern="^(patients|notes)$"),
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Defaults from the file name"),
+    enrich: str = Query("none", pattern="^(none|inline|deferred)$", description="AI assist for imported notes"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role("admin", "manager")),
+):
+    """
+    Bulk-load patients or clinical notes from a CSV (header row) or NDJSON file. The upload is read
+    row by row and inserted in chunks; invalid rows are reported by line number and skipped.
+    Note rows name their patient by patient_id or patient_mrn; provider_id defaults to the importer.
+    """
+    # surrogateescape: bytes that are not UTF-8 reject only their own row (see import_service)
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", errors="surrogateescape", newline="")
+    fmt = format or detect_format(file.filename, file.content_type)
+    try:
+        return await run_in_threadpool(import_rows, db, kind, stream, fmt, current_user.id, enrich)
+    finally:
+        stream.detach()
@@ -1,15 +1,33 @@
 import json
 import uuid
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy.orm import Session, joinedload
-from typing import Optional
-from database import get_db
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload, selectinload, load_only
+from typing import Optional, List, Union
+from config import settings
+from database import get_db, SessionLocal
 from models import PARequest, Patient, Document, DenialRecord, User
-from schemas import PARequestCreate, PARequestUpdate, PARequestOut, PatientCreate, PatientOut
-from services.auth_service import get_current_user
-from services.ai_service import generate_pa_packet, generate_appeal_letter
+from schemas import (
+    PARequestCreate, PARequestUpdate, PARequestOut, PARequestSummaryOut, PatientCreate, PatientOut, LIST_VIEW_PATTERN,
+    StatusCountsOut,
+    BulkTransitionRequest, BulkTransitionResults, TransitionResult, ChecklistRescoreOut,
+)
+from services.auth_service import get_current_user, require_role
+from services.checklist import checklist_rules
+from services.code_catalog import code_catalog
+from services.llm_provider import llm, split_sections, LLMError
+from services.search_service import index_pa_request
+from services.packet_service import (
+    merge_extracted_data, packet_inputs, appeal_inputs, packet_updates, input_fingerprint,
+    generate_packets_batch, generation_cache, rescore_checklists,
+)
+from services.status_service import transition_values, denial_record, apply_bulk_transitions
+from services.http_cache import version_etag, not_modified
+from services.pagination import keyset_page, NEXT_CURSOR_HEADER, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/api/pa-requests", tags=["PA Requests"])
 
@@ -79,32 +97,177 @@ def create_pa_request(data: PARequestCreate, db: Session = Depends(get_db), curr
     patient = db.query(Patient).filter(Patient.id == data.patient_id).first()
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
+    if settings.CODE_CATALOG_VALIDATE:
+        problems = code_catalog.validate(data.diagnosis_code, data.procedure_code)
+        if problems:
+            raise HTTPException(status_code=400, detail="; ".join(problems))
     pa = PARequest(
         reference_number=_gen_ref(),
         submitted_by=current_user.id,
         **data.model_dump(),
     )
     db.add(pa)
+    db.flush()
+    index_pa_request(db, pa, f"{patient.first_name} {patient.last_name}")
     db.commit()
     db.refresh(pa)
     return PARequestOut.model_validate(pa)
 
 
-@router.get("/", response_model=list[PARequestOut])
+_SUMMARY_COLUMNS = (
+    PARequest.id, PARequest.reference_number, PARequest.patient_id, PARequest.procedure_code,
+    PARequest.procedure_name, PARequest.diagnosis_code, PARequest.payer_name, PARequest.status,
+    PARequest.priority, PARequest.denial_reason, PARequest.created_at, PARequest.updated_at,
+    PARequest.submitted_at, PARequest.resolved_at,
+)
+
+
+def _document_versions(db: Session, pa_ids: list) -> dict:
+    """{pa_id: (document count, latest document updated_at)} — attached documents are part of PARequestOut."""
+    if not pa_ids:
+        return {}
+    return {
+        row.pa_request_id: (row.n, row.latest) for row in db.query(
+            Document.pa_request_id, func.count(Document.id).label("n"), func.max(Document.updated_at).label("latest"),
+        ).filter(Document.pa_request_id.in_(pa_ids)).group_by(Document.pa_request_id)
+    }
+
+
+def _filter_pas(query, status=None, payer=None, priority=None, patient_id=None, submitted_by=None,
+                created_from=None, created_to=None):
+    if status:
+        query = query.filter(PARequest.status == status)
+    if payer:
+        query = query.filter(PARequest.payer_name == payer)
+    if priority:
+        query = query.filter(PARequest.priority == priority)
+    if patient_id:
+        query = query.filter(PARequest.patient_id == patient_id)
+    if submitted_by:
+        query = query.filter(PARequest.submitted_by == submitted_by)
+    if created_from:
+        query = query.filter(PARequest.created_at >= created_from)
+    if created_to:
+        query = query.filter(PARequest.created_at < created_to)
+    return query
+
+
+@router.get("/", response_model=Union[list[PARequestSummaryOut], list[PARequestOut]])
 def list_pa_requests(
+    request: Request,
+    response: Response,
     status: Optional[str] = None,
+    payer: Optional[str] = None,
+    priority: Optional[str] = None,
+    patient_id: Optional[int] = None,
+    submitted_by: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    view: str = Query("full", pattern=LIST_VIEW_PATTERN),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    query = db.query(PARequest).options(joinedload(PARequest.patient), joinedload(PARequest.documents))
-    if status:
-        query = query.filter(PARequest.status == status)
-    pas = query.order_by(PARequest.created_at.desc()).all()
-    return [PARequestOut.model_validate(pa) for pa in pas]
+    """
+    One page of PA requests, newest first by default. Pass the X-Next-Cursor response header
+    back as `cursor` for the next page; the header is absent on the last page.
+    view=summary selects only the list columns and skips packets, appeals and documents.
+    The ETag covers the page's (id, updated_at) and, for the full view, its documents' versions.
+    """
+    query = _filter_pas(db.query(PARequest), status, payer, priority, patient_id, submitted_by, created_from, created_to)
+
+    # Resolve the page on version columns only; the ETag is known before any full row is loaded.
+    versions, next_cursor = keyset_page(
+        query.with_entities(PARequest.id, PARequest.created_at, PARequest.updated_at),
+        PARequest, cursor, limit, descending=order == "desc",
+    )
+    ids = [row.id for row in versions]
+    doc_versions = _document_versions(db, ids) if view == "full" else {}
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    etag = version_etag("pa-list", view, [(row.id, row.updated_at, doc_versions.get(row.id)) for row in versions], next_cursor)
+    cached = not_modified(request, response, etag)
+    if cached:
+        return cached
+
+    if view == "summary":
+        query = db.query(PARequest).options(
+            load_only(*_SUMMARY_COLUMNS),
+            joinedload(PARequest.patient).load_only(Patient.id, Patient.mrn, Patient.first_name, Patient.last_name),
+        )
+    else:
+        query = db.query(PARequest).options(joinedload(PARequest.patient), selectinload(PARequest.documents))
+    by_id = {pa.id: pa for pa in query.filter(PARequest.id.in_(ids))} if ids else {}
+    pas = [by_id[pa_id] for pa_id in ids if pa_id in by_id]
+    schema = PARequestSummaryOut if view == "summary" else PARequestOut
+    return [schema.model_validate(pa) for pa in pas]
+
+
+@router.get("/counts", response_model=StatusCountsOut)
+def count_pa_requests(
+    payer: Optional[str] = None,
+    priority: Optional[str] = None,
+    patient_id: Optional[int] = None,
+    submitted_by: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """PA request counts per status under the list filters (for KPIs; the list itself is paginated)."""
+    query = _filter_pas(db.query(PARequest.status, func.count(PARequest.id)), None, payer, priority, patient_id,
+                        submitted_by, created_from, created_to)
+    by_status = dict(query.group_by(PARequest.status).all())
+    return StatusCountsOut(total=sum(by_status.values()), by_status=by_status)
+
+
+@router.get("/generation-cache")
+def generation_cache_stats(current_user: User = Depends(get_current_user)):
+    """Hit/miss counters for memoized packet, appeal and note-section generation since this process started."""
+    return generation_cache.stats()
+
+
+@router.get("/checklist-rules")
+def get_checklist_rules(
+    payer: Optional[str] = None,
+    procedure_code: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+):
+    """The resolved completeness checklist rules for a payer/procedure (default rules when omitted)."""
+    ruleset = checklist_rules.ruleset(payer, procedure_code)
+    return {"payer": payer, "procedure_code": procedure_code, "version": ruleset.version, "items": ruleset.rules}
+
+
+@router.post("/checklist-rules/rescore", response_model=ChecklistRescoreOut)
+def rescore_open_checklists(
+    dry_run: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_role("admin", "manager")),
+):
+    """
+    Re-score the completeness checklist of every open PA that has one (from a generated packet) against
+    the current rules without regenerating packets; only PAs whose checklist or missing evidence changed are written (none with dry_run).
+    """
+    return rescore_checklists(db, dry_run=dry_run)
 
 
 @router.get("/{pa_id}", response_model=PARequestOut)
-def get_pa_request(pa_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def get_pa_request(
+    pa_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """ETag from the PA's updated_at and its documents' versions; If-None-Match gets a 304 without loading the PA."""
+    version = db.query(PARequest.updated_at).filter(PARequest.id == pa_id).first()
+    if not version:
+        raise HTTPException(status_code=404, detail="PA Request not found")
+    cached = not_modified(request, response, version_etag("pa", pa_id, version.updated_at, _document_versions(db, [pa_id]).get(pa_id)))
+    if cached:
+        return cached
     pa = db.query(PARequest).options(
         joinedload(PARequest.patient), joinedload(PARequest.documents)
     ).filter(PARequest.id == pa_id).first()
@@ -128,93 +291,258 @@ def update_pa_request(
     # Handle status transitions
     if "status" in update_data:
         new_status = update_data["status"]
-        if new_status == "submitted":
-            update_data["submitted_at"] = datetime.now(timezone.utc)
-        if new_status in ("approved", "denied", "appeal_approved", "appeal_denied"):
-            update_data["resolved_at"] = datetime.now(timezone.utc)
-            if pa.submitted_at:
-                delta = datetime.now(timezone.utc) - pa.submitted_at
-                update_data["turnaround_days"] = round(delta.total_seconds() / 86400, 1)
+        update_data.update(transition_values(new_status, pa.submitted_at, datetime.now(timezone.utc)))
         if new_status == "denied" and update_data.get("denial_reason"):
-            denial = DenialRecord(
-                pa_request_id=pa.id,
-                denial_reason=update_data.get("denial_reason", ""),
-                denial_category=update_data.get("denial_reason", ""),
-                payer_name=pa.payer_name,
-                procedure_code=pa.procedure_code,
-                turnaround_days=update_data.get("turnaround_days"),
-                month=datetime.now().strftime("%Y-%m"),
-            )
-            db.add(denial)
+            db.add(DenialRecord(**denial_record(pa, update_data["denial_reason"], update_data.get("turnaround_days"))))
 
     for key, val in update_data.items():
         setattr(pa, key, val)
+    if "clinical_rationale" in update_data:
+        patient = db.query(Patient).filter(Patient.id == pa.patient_id).first()
+        index_pa_request(db, pa, f"{patient.first_name} {patient.last_name}" if patient else "")
     db.commit()
     db.refresh(pa)
     return PARequestOut.model_validate(pa)
 
 
-@router.post("/{pa_id}/generate-packet", response_model=PARequestOut)
-def generate_packet(pa_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+@router.post("/transitions", response_model=BulkTransitionResults)
+def bulk_transition(
+    data: BulkTransitionRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Apply a batch of payer decisions ({pa_id, status, denial_reason, denial_details}) in one
+    transaction. Unknown or repeated ids are reported per item and don't block the rest.
+    """
+    if not data.items:
+        raise HTTPException(status_code=400, detail="No transitions provided")
+    if len(data.items) > settings.BULK_TRANSITION_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch exceeds {settings.BULK_TRANSITION_MAX_ITEMS} transitions")
+    results = apply_bulk_transitions(db, [item.model_dump() for item in data.items])
+    applied = sum(1 for r in results if r["ok"])
+    return BulkTransitionResults(
+        applied=applied, failed=len(results) - applied, results=[TransitionResult(**r) for r in results],
+    )
+
+
+class PacketBatchRequest(BaseModel):
+    pa_ids: Optional[List[int]] = None
+    status: Optional[str] = None
+    payer: Optional[str] = None
+    priority: Optional[str] = None
+    force: bool = False
+
+
+@router.post("/generate-packets")
+def generate_packets(
+    data: PacketBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Regenerate packets for a list of PA ids or every PA matching a filter. The response is an
+    NDJSON stream: "started", then "generated"/"cached"/"failed" per PA and "progress" after each
+    committed chunk, then "done" with totals. Unchanged PAs are skipped unless force is set.
+    """
+    if data.pa_ids:
+        pa_ids = list(dict.fromkeys(data.pa_ids))
+    elif data.status or data.payer or data.priority:
+        query = db.query(PARequest.id)
+        if data.status:
+            query = query.filter(PARequest.status == data.status)
+        if data.payer:
+            query = query.filter(PARequest.payer_name == data.payer)
+        if data.priority:
+            query = query.filter(PARequest.priority == data.priority)
+        pa_ids = [row.id for row in query.order_by(PARequest.id).limit(settings.PACKET_BATCH_MAX_ITEMS + 1)]
+    else:
+        raise HTTPException(status_code=400, detail="Provide pa_ids or at least one filter (status, payer, priority)")
+    if len(pa_ids) > settings.PACKET_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch exceeds {settings.PACKET_BATCH_MAX_ITEMS} PA requests")
+
+    def progress():
+        batch_db = SessionLocal()
+        try:
+            for event in generate_packets_batch(batch_db, pa_ids, force=data.force):
+                yield json.dumps(event, default=str) + "\n"
+        finally:
+            batch_db.close()
+
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
+
+
+def _packet_context(db: Session, pa_id: int):
     pa = db.query(PARequest).options(
-        joinedload(PARequest.patient), joinedload(PARequest.documents)
+        joinedload(PARequest.patient), selectinload(PARequest.documents)
     ).filter(PARequest.id == pa_id).first()
     if not pa:
         raise HTTPException(status_code=404, detail="PA Request not found")
-
-    # Gather extracted data from documents
-    extracted = {}
-    for doc in pa.documents:
-        if doc.extracted_data:
-            try:
-                extracted.update(json.loads(doc.extracted_data))
-            except json.JSONDecodeError:
-                pass
-
+    extracted = merge_extracted_data(doc.extracted_data for doc in sorted(pa.documents, key=lambda d: d.id))
     patient_name = f"{pa.patient.first_name} {pa.patient.last_name}" if pa.patient else "Unknown"
-    result = generate_pa_packet(
-        patient_name=patient_name,
-        diagnosis_code=pa.diagnosis_code,
-        diagnosis_name=pa.diagnosis_name or "",
-        procedure_code=pa.procedure_code,
-        procedure_name=pa.procedure_name,
-        payer_name=pa.payer_name,
-        clinical_rationale=pa.clinical_rationale or "",
-        extracted_data=extracted,
-    )
-    pa.generated_packet = result["packet"]
-    pa.completeness_checklist = result["checklist"]
-    pa.missing_evidence = result["missing_evidence"]
-    if pa.status == "draft":
-        pa.status = "pending_review"
-    db.commit()
-    db.refresh(pa)
-    return PARequestOut.model_validate(pa)
+    inputs = packet_inputs(pa, patient_name, extracted)
+    return pa, patient_name, inputs, input_fingerprint("packet", inputs)
 
 
-@router.post("/{pa_id}/generate-appeal", response_model=PARequestOut)
-def generate_appeal(pa_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+def _appeal_context(db: Session, pa_id: int):
     pa = db.query(PARequest).options(joinedload(PARequest.patient)).filter(PARequest.id == pa_id).first()
     if not pa:
         raise HTTPException(status_code=404, detail="PA Request not found")
     if pa.status not in ("denied", "appeal_denied"):
         raise HTTPException(status_code=400, detail="Can only appeal denied requests")
-
     patient_name = f"{pa.patient.first_name} {pa.patient.last_name}" if pa.patient else "Unknown"
-    appeal = generate_appeal_letter(
-        patient_name=patient_name,
-        reference_number=pa.reference_number,
-        denial_reason=pa.denial_reason or "Not specified",
-        denial_details=pa.denial_details or "",
-        procedure_code=pa.procedure_code,
-        procedure_name=pa.procedure_name,
-        diagnosis_code=pa.diagnosis_code,
-        diagnosis_name=pa.diagnosis_name or "",
-        payer_name=pa.payer_name,
-        clinical_rationale=pa.clinical_rationale or "",
-    )
-    pa.appeal_letter = appeal
+    inputs = appeal_inputs(pa, patient_name)
+    return pa, patient_name, inputs, input_fingerprint("appeal", inputs)
+
+
+# Generation handlers are async so they await the LLM without holding a worker thread; their
+# (synchronous) Session work runs in the threadpool, never on the event loop.
+def _apply_packet(db: Session, pa: PARequest, patient_name: str, result, fingerprint: str):
+    """Store a generated packet; result None (stored packet reused) only moves a draft to review."""
+    if result is None:
+        if pa.status == "draft":
+            pa.status = "pending_review"
+        return
+    for key, val in packet_updates(pa.status, result, fingerprint).items():
+        setattr(pa, key, val)
+    index_pa_request(db, pa, patient_name if pa.patient else "")
+
+
+def _apply_appeal(db: Session, pa: PARequest, patient_name: str, letter, fingerprint: str):
+    """Store a drafted appeal letter (None: stored letter reused) and move the PA to appeal_draft."""
+    if letter is not None:
+        pa.appeal_letter = letter
+        pa.appeal_fingerprint = fingerprint
+        index_pa_request(db, pa, patient_name if pa.patient else "")
     pa.status = "appeal_draft"
+
+
+def _save_generation(db: Session, pa: PARequest, apply, *args) -> PARequestOut:
+    apply(db, pa, *args)
     db.commit()
     db.refresh(pa)
     return PARequestOut.model_validate(pa)
+
+
+@router.post("/{pa_id}/generate-packet", response_model=PARequestOut)
+async def generate_packet(
+    pa_id: int,
+    force: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Generate the PA packet; returns the stored one when its inputs are unchanged unless force=true."""
+    pa, patient_name, inputs, fingerprint = await run_in_threadpool(_packet_context, db, pa_id)
+    cached = not force and pa.generated_packet and pa.packet_fingerprint == fingerprint
+    generation_cache.record("packet", "hits" if cached else "forced" if force else "misses")
+    result = None if cached else await llm.generate("pa_packet", **inputs)
+    return await run_in_threadpool(_save_generation, db, pa, _apply_packet, patient_name, result, fingerprint)
+
+
+@router.post("/{pa_id}/generate-appeal", response_model=PARequestOut)
+async def generate_appeal(
+    pa_id: int,
+    force: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Draft the appeal letter; returns the stored one when its inputs are unchanged unless force=true."""
+    pa, patient_name, inputs, fingerprint = await run_in_threadpool(_appeal_context, db, pa_id)
+    cached = not force and pa.appeal_letter and pa.appeal_fingerprint == fingerprint
+    generation_cache.record("appeal", "hits" if cached else "forced" if force else "misses")
+    letter = None if cached else await llm.generate("appeal_letter", **inputs)
+    return await run_in_threadpool(_save_generation, db, pa, _apply_appeal, patient_name, letter, fingerprint)
+
+
+# ── Streaming generation (SSE) ───────────────────────────
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _stream_response(events) -> StreamingResponse:
+    return StreamingResponse(
+        events, media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _stream_generation(kind: str, task: str, pa_id: int, inputs: dict, stored: Optional[str], persist):
+    """
+    SSE body shared by packet and appeal streaming: "started", one "section" event per document section
+    as the provider produces it, then "done" with the saved PA — or "error" if generation fails.
+    A stored document whose fingerprint still matches is replayed immediately. persist(db, pa, output)
+    runs in its own session (in the threadpool) once the full output is in; nothing is written if the
+    client disconnects.
+    """
+    yield _sse("started", {"pa_id": pa_id, "kind": kind, "cached": stored is not None})
+    if stored is not None:
+        for name, text in split_sections(stored):
+            yield _sse("section", {"name": name, "text": text, "cached": True})
+    output = None
+    if stored is None:
+        try:
+            async for event in llm.stream(task, **inputs):
+                if event["type"] == "section":
+                    yield _sse("section", {"name": event["name"], "text": event["text"]})
+                elif event["type"] == "result":
+                    output = event["output"]
+        except LLMError as e:
+            yield _sse("error", {"detail": str(e)})
+            return
+
+    saved = await run_in_threadpool(_persist_generation, pa_id, persist, output)
+    if saved is None:
+        yield _sse("error", {"detail": "PA Request not found"})
+        return
+    yield _sse("done", {"pa": saved.model_dump(mode="json")})
+
+
+def _persist_generation(pa_id: int, persist, output) -> Optional[PARequestOut]:
+    stream_db = SessionLocal()
+    try:
+        pa = stream_db.query(PARequest).options(
+            joinedload(PARequest.patient), selectinload(PARequest.documents)
+        ).filter(PARequest.id == pa_id).first()
+        if pa is None:
+            return None
+        return _save_generation(stream_db, pa, persist, output)
+    finally:
+        stream_db.close()
+
+
+@router.post("/{pa_id}/generate-packet/stream")
+async def stream_packet(
+    pa_id: int,
+    force: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """generate-packet as server-sent events: each packet section is sent as soon as it is produced."""
+    pa, patient_name, inputs, fingerprint = await run_in_threadpool(_packet_context, db, pa_id)
+    cached = not force and pa.generated_packet and pa.packet_fingerprint == fingerprint
+    generation_cache.record("packet", "hits" if cached else "forced" if force else "misses")
+
+    def persist(stream_db: Session, pa: PARequest, result):
+        _apply_packet(stream_db, pa, patient_name, result, fingerprint)
+
+    stored = pa.generated_packet if cached else None
+    return _stream_response(_stream_generation("packet", "pa_packet", pa_id, inputs, stored, persist))
+
+
+@router.post("/{pa_id}/generate-appeal/stream")
+async def stream_appeal(
+    pa_id: int,
+    force: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """generate-appeal as server-sent events: each letter section is sent as soon as it is produced."""
+    pa, patient_name, inputs, fingerprint = await run_in_threadpool(_appeal_context, db, pa_id)
+    cached = not force and pa.appeal_letter and pa.appeal_fingerprint == fingerprint
+    generation_cache.record("appeal", "hits" if cached else "forced" if force else "misses")
+
+    def persist(stream_db: Session, pa: PARequest, letter):
+        _apply_appeal(stream_db, pa, patient_name, letter, fingerprint)
+
+    stored = pa.appeal_letter if cached else None
+    return _stream_response(_stream_generation("appeal", "appeal_letter", pa_id, inputs, stored, persist))
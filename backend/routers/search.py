@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, Query, BackgroundTasks
+from sqlalchemy.orm import Session
+from typing import Optional
+from database import get_db, SessionLocal
+from models import User
+from schemas import SearchResults, SearchHit
+from services.auth_service import get_current_user, require_role
+from services.search_service import search, rebuild_search_index
+
+router = APIRouter(prefix="/api/search", tags=["Search"])
+
+
+@router.get("", response_model=SearchResults)
+@router.get("/", response_model=SearchResults, include_in_schema=False)
+def search_all(
+    q: str = Query(..., min_length=1, max_length=200),
+    kind: Optional[str] = Query(None, description="document, note or pa_request"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=10000),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Ranked full-text search over document text, clinical notes and PA packets/appeals."""
+    hits, has_more = search(db, q, kind=kind, limit=limit, offset=offset)
+    return SearchResults(
+        query=q,
+        results=[SearchHit(**h) for h in hits],
+        offset=offset,
+        next_offset=offset + limit if has_more else None,
+    )
+
+
+def _rebuild():
+    db = SessionLocal()
+    try:
+        rebuild_search_index(db)
+    finally:
+        db.close()
+
+
+@router.post("/reindex", status_code=202)
+def reindex(background_tasks: BackgroundTasks, current_user: User = Depends(require_role("admin", "manager"))):
+    """Rebuild the whole index in the background (e.g. after restoring a database)."""
+    background_tasks.add_task(_rebuild)
+    return {"status": "scheduled"}
@@ -5,6 +5,7 @@ from datetime import datetime
 
 
 # ── Validators ───────────────────────────────────────────
+LIST_VIEW_PATTERN = "^(full|summary)$"  # ?view= on list endpoints
 EMAIL_RE = re.compile(r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$")
 VALID_ROLES = {"nurse_coordinator", "provider", "manager", "admin"}
 VALID_STATUSES = {"draft", "pending_review", "submitted", "approved", "denied",
@@ -146,14 +147,58 @@ class DocumentOut(BaseModel):
     original_filename: str
     file_size: Optional[int] = None
     content_type: Optional[str] = None
-    extracted_text: Optional[str] = None
+    text_length: Optional[int] = None
+    text_preview: Optional[str] = None
     extracted_data: Optional[str] = None
+    extraction_status: Optional[str] = None
     pa_request_id: Optional[int] = None
     created_at: Optional[datetime] = None
     class Config:
         from_attributes = True
 
 
+class DocumentSummaryOut(BaseModel):
+    """List projection (view=summary): no extracted text or structured data."""
+    id: int
+    original_filename: str
+    file_size: Optional[int] = None
+    content_type: Optional[str] = None
+    extraction_status: Optional[str] = None
+    pa_request_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    class Config:
+        from_attributes = True
+
+
+class DocumentStatusOut(BaseModel):
+    id: int
+    extraction_status: str
+    extraction_error: Optional[str] = None
+    extracted_at: Optional[datetime] = None
+    text_extractor_version: Optional[str] = None
+    data_extractor_version: Optional[str] = None
+    class Config:
+        from_attributes = True
+
+
+class ReextractionJobOut(BaseModel):
+    id: int
+    status: str
+    text_extractor_version: str
+    data_extractor_version: str
+    total: int
+    processed: int
+    restructured: int
+    requeued: int
+    last_document_id: int
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    class Config:
+        from_attributes = True
+
+
 # ── PA Request ───────────────────────────────────────────
 class PARequestCreate(BaseModel):
     patient_id: int
@@ -227,6 +272,48 @@ class PARequestUpdate(BaseModel):
         return v
 
 
+class PAStatusTransition(BaseModel):
+    pa_id: int
+    status: str
+    denial_reason: Optional[str] = None
+    denial_details: Optional[str] = None
+
+    @field_validator("status")
+    @classmethod
+    def validate_status(cls, v: str) -> str:
+        if v not in VALID_STATUSES:
+            raise ValueError(f"Status must be one of: {', '.join(VALID_STATUSES)}")
+        return v
+
+
+class BulkTransitionRequest(BaseModel):
+    items: List[PAStatusTransition]
+
+
+class TransitionResult(BaseModel):
+    pa_id: int
+    ok: bool
+    previous_status: Optional[str] = None
+    status: Optional[str] = None
+    turnaround_days: Optional[float] = None
+    error: Optional[str] = None
+
+
+class BulkTransitionResults(BaseModel):
+    applied: int
+    failed: int
+    results: List[TransitionResult]
+
+
+class ChecklistRescoreOut(BaseModel):
+    scanned: int
+    changed: int
+    dry_run: bool
+    evaluations: int
+    changed_ids: List[int]
+    seconds: float
+
+
 class PARequestOut(BaseModel):
     id: int
     reference_number: str
@@ -256,6 +343,42 @@ class PARequestOut(BaseModel):
         from_attributes = True
 
 
+class PatientSummaryOut(BaseModel):
+    id: int
+    mrn: str
+    first_name: str
+    last_name: str
+    class Config:
+        from_attributes = True
+
+
+class PARequestSummaryOut(BaseModel):
+    """List projection (view=summary): no packet, appeal, checklist or documents."""
+    id: int
+    reference_number: str
+    patient_id: int
+    procedure_code: str
+    procedure_name: str
+    diagnosis_code: str
+    payer_name: str
+    status: str
+    priority: Optional[str] = None
+    denial_reason: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    submitted_at: Optional[datetime] = None
+    resolved_at: Optional[datetime] = None
+    patient: Optional[PatientSummaryOut] = None
+    class Config:
+        from_attributes = True
+
+
+class StatusCountsOut(BaseModel):
+    """Row counts behind a list's filters — list pages are bounded, so totals come from here."""
+    total: int
+    by_status: dict[str, int]
+
+
 # ── Clinical Note ────────────────────────────────────────
 class ClinicalNoteCreate(BaseModel):
     patient_id: int
@@ -283,6 +406,29 @@ class ClinicalNoteUpdate(BaseModel):
     status: Optional[str] = None
 
 
+class ClinicalNoteImport(ClinicalNoteCreate):
+    """One bulk-imported note: the patient by id or MRN, plus optional provider, status and original timestamp."""
+    patient_id: Optional[int] = None
+    patient_mrn: Optional[str] = None
+    provider_id: Optional[int] = None
+    status: str = "draft"
+    created_at: Optional[datetime] = None
+
+    @field_validator("status")
+    @classmethod
+    def validate_status(cls, v: str) -> str:
+        v = v.strip()
+        if not v or len(v) > 50:
+            raise ValueError("Status must be 1-50 characters")
+        return v
+
+    @model_validator(mode="after")
+    def require_patient(self):
+        if self.patient_id is None and not (self.patient_mrn or "").strip():
+            raise ValueError("patient_id or patient_mrn is required")
+        return self
+
+
 class ClinicalNoteOut(BaseModel):
     id: int
     patient_id: int
@@ -302,6 +448,68 @@ class ClinicalNoteOut(BaseModel):
         from_attributes = True
 
 
+class ClinicalNoteSummaryOut(BaseModel):
+    """List projection (view=summary): no note sections or AI output."""
+    id: int
+    patient_id: int
+    provider_id: int
+    note_type: str
+    status: str
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    class Config:
+        from_attributes = True
+
+
+# ── Search ───────────────────────────────────────────────
+class SearchHit(BaseModel):
+    kind: str
+    id: int
+    title: Optional[str] = None
+    snippet: Optional[str] = None
+    score: float
+
+
+class SearchResults(BaseModel):
+    query: str
+    results: List[SearchHit]
+    offset: int = 0
+    next_offset: Optional[int] = None
+
+
+# ── Codes ────────────────────────────────────────────────
+class CodeEntry(BaseModel):
+    code: str
+    system: str
+    description: str
+    match: str  # exact, prefix, fuzzy or description
+
+
+class CodeLookup(BaseModel):
+    valid: bool
+    entry: Optional[CodeEntry] = None
+    suggestions: List[CodeEntry] = []
+
+
+# ── Imports ──────────────────────────────────────────────
+class ImportRejection(BaseModel):
+    line: int
+    error: str
+
+
+class ImportResultOut(BaseModel):
+    kind: str
+    format: str
+    received: int
+    inserted: int
+    rejected: int
+    rejections: List[ImportRejection]  # first IMPORT_MAX_REJECTIONS_REPORTED only
+    enrichment: str
+    enrichment_queued: int = 0
+    seconds: float
+    rows_per_second: float
+
+
 # ── Analytics ────────────────────────────────────────────
 class DenialStat(BaseModel):
     reason: str
@@ -9,12 +9,14 @@ sys.path.insert(0, os.path.dirname(__file__))
 from database import engine, SessionLocal, Base
 from models import User, Patient, PARequest, DenialRecord, ClinicalNote
 from services.auth_service import hash_password
+from services.search_service import ensure_search_index, rebuild_search_index
 from datetime import datetime, timezone, timedelta
 import random
 import json
 
 # Create tables
 Base.metadata.create_all(bind=engine)
+ensure_search_index(engine)
 db = SessionLocal()
 
 print("[*] Seeding database...")
@@ -181,6 +183,7 @@ for month in months:
         db.add(dr)
 
 db.commit()
+rebuild_search_index(db)
 print("[OK] Seeded successfully!")
 print(f"   Users: {len(users_data)}")
 print(f"   Patients: {len(patients_data)}")
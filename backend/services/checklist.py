@@ -0,0 +1,179 @@
+"""
+Checklist — declarative completeness-checklist rules, compiled to bitmask evaluators.
+
+Rules live in checklist_rules/default.json plus optional checklist_rules/<payer>.json (payer slug as
+for templates). Each file holds "items" and per-CPT "procedures" overrides:
+
+    {"items": [{"item": "Insurance information", "source": "Insurance card", "requires": ["insurance_id"]},
+               {"item": "Imaging/lab results", "source": "Diagnostic reports", "requires": ["imaging_results|lab_results"]},
+               {"item": "Provider attestation", "source": "Requires signature", "always": false}],
+     "procedures": {"27447": {"items": [...], "remove": ["Medication history"]}}}
+
+"requires" is all-of; "a|b" inside it is any-of; a field counts as present when its value is truthy.
+Layers apply in order (default, default's procedure override, payer file, payer's procedure override);
+an item replaces the earlier item of the same name, "remove" drops items.
+
+Every field a rule mentions gets one bit, so a PA's evidence collapses to an integer mask and an item
+is complete when each of its any-of masks intersects it. Results are memoized per (rule set, mask):
+PAs with the same evidence pattern share one evaluation, which is what makes bulk re-scoring cheap.
+Files are re-checked by mtime at most every CHECKLIST_RELOAD_SECONDS.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional
+from config import settings
+from services.templates import payer_slug, DEFAULT_TEMPLATE
+
+logger = logging.getLogger("priorauth.checklist")
+
+_MAX_MEMO = 4096
+
+
+class ChecklistRuleError(Exception):
+    pass
+
+
+class RuleSet:
+    """One resolved (payer, procedure) checklist, compiled against the registry's field bits."""
+
+    def __init__(self, items: list, bits: dict, version: str):
+        self.version = version
+        self.rules = items
+        self._items = []
+        self._relevant = 0
+        for rule in items:
+            if "always" in rule:
+                clauses, constant = (), bool(rule["always"])
+            else:
+                clauses, constant = tuple(self._clause_mask(c, bits) for c in rule.get("requires", [])), None
+            self._items.append((rule["item"], rule.get("source", ""), clauses, constant))
+            for clause in clauses:
+                self._relevant |= clause
+        self._memo: dict = {}
+
+    @staticmethod
+    def _clause_mask(clause: str, bits: dict) -> int:
+        mask = 0
+        for field in clause.split("|"):
+            mask |= 1 << bits[field.strip()]
+        return mask
+
+    def evaluate(self, mask: int) -> tuple:
+        """(completeness_checklist JSON, missing_evidence JSON) for an evidence mask."""
+        mask &= self._relevant
+        result = self._memo.get(mask)
+        if result is None:
+            checklist = []
+            for item, source, clauses, constant in self._items:
+                complete = constant if constant is not None else all(mask & c for c in clauses)
+                checklist.append({"item": item, "complete": complete, "source": source})
+            missing = [c["item"] for c in checklist if not c["complete"]]
+            result = (json.dumps(checklist), json.dumps(missing))
+            if len(self._memo) >= _MAX_MEMO:
+                self._memo.clear()
+            self._memo[mask] = result
+        return result
+
+
+class ChecklistRegistry:
+    def __init__(self, root: str, reload_seconds: float = 2.0):
+        self.root = root
+        self.reload_seconds = reload_seconds
+        self._files: dict = {}  # name -> (mtime, version, parsed, checked_at)
+        self._rulesets: dict = {}
+        self._bits: dict = {}
+        self._lock = threading.Lock()
+
+    def _file(self, name: str) -> Optional[tuple]:
+        """(version, parsed) for checklist_rules/<name>.json, or None when absent."""
+        cached = self._files.get(name)
+        now = time.monotonic()
+        if cached is not None and now - cached[3] < self.reload_seconds:
+            return cached[1:3] if cached[2] is not None else None
+        path = os.path.join(self.root, f"{name}.json")
+        if not os.path.isfile(path):
+            self._files[name] = (None, None, None, now)
+            return None
+        mtime = os.path.getmtime(path)
+        if cached is None or cached[0] != mtime:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    source = f.read()
+                parsed = json.loads(source)
+                if not isinstance(parsed.get("items", []), list):
+                    raise ChecklistRuleError(f"{path}: 'items' must be a list")
+            except (OSError, ValueError, AttributeError, ChecklistRuleError) as e:
+                if cached is None or cached[2] is None:
+                    raise ChecklistRuleError(f"Invalid checklist rules {path}: {e}") from None
+                logger.error(f"Keeping previous checklist rules for {name}: {e}")
+                self._files[name] = (mtime, cached[1], cached[2], now)
+                return cached[1:3]
+            cached = (mtime, hashlib.sha256(source.encode("utf-8")).hexdigest()[:12], parsed, now)
+            if name in self._files:
+                logger.info(f"Reloaded checklist rules {path}")
+        else:
+            cached = (*cached[:3], now)
+        self._files[name] = cached
+        return cached[1:3]
+
+    @staticmethod
+    def _apply(items: list, layer: dict) -> list:
+        removed = set(layer.get("remove", []))
+        out = [item for item in items if item["item"] not in removed]
+        for rule in layer.get("items", []):
+            if "item" not in rule:
+                raise ChecklistRuleError(f"Checklist rule without an 'item' name: {rule}")
+            for i, existing in enumerate(out):
+                if existing["item"] == rule["item"]:
+                    out[i] = rule
+                    break
+            else:
+                out.append(rule)
+        return out
+
+    def ruleset(self, payer: Optional[str], procedure_code: Optional[str]) -> RuleSet:
+        slug = payer_slug(payer)
+        with self._lock:
+            layers = [(DEFAULT_TEMPLATE, self._file(DEFAULT_TEMPLATE))]
+            if slug != DEFAULT_TEMPLATE:
+                layers.append((slug, self._file(slug)))
+            if layers[0][1] is None:
+                raise ChecklistRuleError(f"No default checklist rules in {self.root}")
+            versions = tuple(loaded[0] for _, loaded in layers if loaded)
+            key = (slug, procedure_code or "", versions)
+            ruleset = self._rulesets.get(key)
+            if ruleset is None:
+                items: list = []
+                for _, loaded in layers:
+                    if loaded:
+                        rules = loaded[1]
+                        items = self._apply(items, rules)
+                        items = self._apply(items, rules.get("procedures", {}).get(procedure_code or "", {}))
+                for rule in items:
+                    for clause in rule.get("requires", []):
+                        for field in clause.split("|"):
+                            self._bits.setdefault(field.strip(), len(self._bits))
+                version = hashlib.sha256(json.dumps(items, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+                ruleset = RuleSet(items, self._bits, version)
+                self._rulesets = {k: v for k, v in self._rulesets.items() if k[:2] != key[:2]}
+                self._rulesets[key] = ruleset
+            return ruleset
+
+    def mask(self, fields: dict) -> int:
+        """Evidence bitmask: one bit per rule-referenced field whose value is truthy."""
+        mask = 0
+        for field, bit in self._bits.items():
+            if fields.get(field):
+                mask |= 1 << bit
+        return mask
+
+    def evaluate(self, payer: Optional[str], procedure_code: Optional[str], fields: dict) -> tuple:
+        ruleset = self.ruleset(payer, procedure_code)
+        return ruleset.evaluate(self.mask(fields))
+
+
+checklist_rules = ChecklistRegistry(settings.CHECKLIST_RULES_DIR, settings.CHECKLIST_RELOAD_SECONDS)
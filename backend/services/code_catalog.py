@@ -0,0 +1,384 @@
+"""
+Code Catalog — memory-mapped ICD-10-CM / CPT / HCPCS lookup, autocomplete and code validation.
+
+`python build_code_catalog.py` compiles the source code sets into one binary file (CODE_CATALOG_PATH)
+holding three sorted string tables; the API maps it read-only, so every worker process shares the
+same page-cache pages instead of holding its own copy, and nothing is parsed at startup.
+
+    codes    normalized code (upper case, no dot) -> "system\\tdisplay code\\tdescription", one entry
+             per code set holding the code (ICD-10 A01.00 and HCPCS A0100 share the key A0100)
+    deletes  each code with one character removed -> normalized code   (fuzzy: edit distance 1)
+    words    description word                     -> normalized code   (description autocomplete)
+
+File layout (little-endian): 8-byte magic, u32 table count, then per table a u64 offset to
+[u32 n][n x u32 entry offsets], followed by u64/u32 offset/length of a JSON metadata block. Entries are
+b"key\\0payload\\n", tables sorted by key bytes, so lookups are binary searches over the offset array.
+
+Fuzzy matching is the symmetric-delete scheme: a query and a code are within one edit (substitution,
+insertion, deletion, or an adjacent transposition) when one equals the other or a one-character
+deletion of it, or their one-character deletions meet.
+"""
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+from config import settings
+
+logger = logging.getLogger("priorauth.codes")
+
+MAGIC = b"PACODES1"
+TABLES = ("codes", "deletes", "words")
+DIAGNOSIS_SYSTEMS = ("ICD-10",)
+PROCEDURE_SYSTEMS = ("CPT", "HCPCS")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_PAYLOAD_RE = re.compile(r"\0([^\n]*)\n")
+_STOPWORDS = frozenset("of the and with without in for to or by on at as an due other than not".split())
+_CHECK_SECONDS = 2.0
+_WORD_CANDIDATES = 5000  # codes scanned for a description query before giving up
+_WORD_SET_MAX = 2000     # description words matching more codes than this are checked per candidate
+_WORD_CHUNK = 64
+
+
+class CatalogUnavailable(Exception):
+    pass
+
+
+def normalize_code(code: str) -> str:
+    return re.sub(r"[\s.]", "", code or "").upper()
+
+
+def display_code(system: str, code: str) -> str:
+    """ICD-10-CM codes are distributed without the dot; it goes after the third character."""
+    return f"{code[:3]}.{code[3:]}" if system == "ICD-10" and len(code) > 3 else code
+
+
+def procedure_systems(code: str) -> tuple:
+    """Code sets a procedure code can belong to by its format: CPT is five digits (or four digits
+    and F/T for Category II/III), HCPCS Level II a letter and four digits."""
+    key = normalize_code(code)
+    if re.fullmatch(r"\d{4}[0-9FT]", key):
+        return ("CPT",)
+    if re.fullmatch(r"[A-Z]\d{4}", key):
+        return ("HCPCS",)
+    return PROCEDURE_SYSTEMS
+
+
+def _deletes(code: str) -> set:
+    return {code[:i] + code[i + 1:] for i in range(len(code))} if len(code) > 1 else set()
+
+
+def description_words(text: str) -> list:
+    return [w for w in dict.fromkeys(_WORD_RE.findall(text.lower())) if len(w) > 1 and w not in _STOPWORDS]
+
+
+# ── Build ────────────────────────────────────────────────
+def build_catalog(entries: Iterable[tuple], path: str, sample: bool = False) -> dict:
+    """
+    Write the catalog for (system, code, description) entries to path (atomically; processes that
+    already mapped the old file keep reading it until they reopen). Later duplicates of a code within
+    one code set win; the same code in different sets is kept once per set. sample marks a catalog
+    built from the bundled sample set, which serves autocomplete but never rejects codes.
+    """
+    codes: dict = {}
+    for system, code, description in entries:
+        key = normalize_code(code)
+        if key:
+            codes[key, system] = " ".join(description.split())
+
+    code_rows, delete_rows, word_rows = [], set(), set()
+    systems: dict = {}
+    for (key, system), description in codes.items():
+        systems[system] = systems.get(system, 0) + 1
+        code_rows.append((key, f"{system}\t{display_code(system, key)}\t{description}"))
+        delete_rows.update((variant, key) for variant in _deletes(key))
+        word_rows.update((word, key) for word in description_words(description))
+
+    tables = [sorted(code_rows), sorted(delete_rows), sorted(word_rows)]
+    meta = {
+        "systems": systems, "built_at": datetime.now(timezone.utc).isoformat(), "entries": [len(t) for t in tables],
+        "sample": sample,
+    }
+
+    header_size = len(MAGIC) + 4 + 8 * len(tables) + 12
+    blob = bytearray()
+    table_offsets = []
+    for rows in tables:
+        encoded = [key.encode("utf-8") + b"\0" + payload.encode("utf-8") + b"\n" for key, payload in rows]
+        table_offsets.append(header_size + len(blob))
+        entry_offset = header_size + len(blob) + 4 + 4 * len(encoded)
+        offsets = []
+        for entry in encoded:
+            offsets.append(entry_offset)
+            entry_offset += len(entry)
+        blob += struct.pack(f"<I{len(offsets)}I", len(offsets), *offsets)
+        blob += b"".join(encoded)
+    meta_bytes = json.dumps(meta).encode("utf-8")
+    meta_offset = header_size + len(blob)
+    blob += meta_bytes
+    if header_size + len(blob) >= 2 ** 32:
+        raise ValueError("Code catalog exceeds 4 GiB")
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack(f"<I{len(tables)}QQI", len(tables), *table_offsets, meta_offset, len(meta_bytes)))
+        f.write(blob)
+    os.replace(tmp, path)
+    return meta
+
+
+# ── Read ─────────────────────────────────────────────────
+class _Table:
+    """Sorted key -> payload table inside the mapped file."""
+
+    def __init__(self, mm: mmap.mmap, offset: int):
+        self._mm = mm
+        self.size = struct.unpack_from("<I", mm, offset)[0]
+        # The offset array read as native u32s (the file is little-endian, as is every supported host).
+        self._offsets = memoryview(mm)[offset + 4:offset + 4 + 4 * self.size].cast("I")
+
+    def key(self, i: int) -> bytes:
+        start = self._offsets[i]
+        return self._mm[start:self._mm.find(b"\0", start)]
+
+    def entry(self, i: int) -> tuple:
+        start = self._offsets[i]
+        sep = self._mm.find(b"\0", start)
+        return self._mm[start:sep].decode("utf-8"), self._mm[sep + 1:self._mm.find(b"\n", sep)].decode("utf-8")
+
+    def lower_bound(self, needle: bytes) -> int:
+        # Keys end in b"\0", which sorts below any needle byte, so comparing the first len(needle)
+        # bytes at an entry orders its key against the needle without finding the terminator.
+        mm, offsets, width = self._mm, self._offsets, len(needle)
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = offsets[mid]
+            if mm[start:start + width] < needle:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def prefix_range(self, prefix: str) -> tuple:
+        """[lo, hi) index range of keys starting with prefix."""
+        needle = prefix.encode("utf-8")
+        lo = self.lower_bound(needle)
+        return lo, self.lower_bound(needle + b"\xff")
+
+    def payloads(self, lo: int, hi: int) -> list:
+        """Payloads of entries lo..hi-1, read as one contiguous slice."""
+        if lo >= hi:
+            return []
+        end = self._offsets[hi] if hi < self.size else self._mm.find(b"\n", self._offsets[hi - 1]) + 1
+        return _PAYLOAD_RE.findall(self._mm[self._offsets[lo]:end].decode("utf-8"))
+
+    def prefix(self, prefix: str, limit: int):
+        """Yield (key, payload) for keys starting with prefix, in key order."""
+        lo, hi = self.prefix_range(prefix)
+        for i in range(lo, min(hi, lo + limit)):
+            yield self.entry(i)
+
+    def get(self, key: str) -> Optional[str]:
+        """Payload of the first entry stored under exactly key."""
+        needle = key.encode("utf-8") + b"\0"
+        i = self.lower_bound(needle)
+        if i < self.size and self._mm[self._offsets[i]:self._offsets[i] + len(needle)] == needle:
+            return self.entry(i)[1]
+        return None
+
+    def get_all(self, key: str, limit: int = 1000) -> list:
+        """Payloads stored under exactly key."""
+        needle = key.encode("utf-8") + b"\0"
+        mm, offsets, width = self._mm, self._offsets, len(needle)
+        i = self.lower_bound(needle)
+        found = []
+        while i < self.size and len(found) < limit and mm[offsets[i]:offsets[i] + width] == needle:
+            found.append(self.entry(i)[1])
+            i += 1
+        return found
+
+
+class CodeCatalog:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mapped = None  # (stat key, mmap, tables, meta)
+        self._checked_at = 0.0
+
+    def _state(self):
+        now = time.monotonic()
+        mapped = self._mapped
+        if mapped is not None and now - self._checked_at < _CHECK_SECONDS:
+            return mapped
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                self._mapped, self._checked_at = None, now
+                return None
+            stat_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+            if self._mapped is None or self._mapped[0] != stat_key:
+                try:
+                    self._mapped = self._map(stat_key)
+                except (CatalogUnavailable, OSError, ValueError, struct.error) as e:
+                    logger.error(f"Keeping previous code catalog; cannot map {self.path}: {e}")
+            self._checked_at = now
+            return self._mapped
+
+    def _map(self, stat_key):
+        with open(self.path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if mm[:len(MAGIC)] != MAGIC:
+            mm.close()
+            raise CatalogUnavailable(f"{self.path} is not a code catalog")
+        n = struct.unpack_from("<I", mm, len(MAGIC))[0]
+        offsets = struct.unpack_from(f"<{n}QQI", mm, len(MAGIC) + 4)
+        tables = {name: _Table(mm, offset) for name, offset in zip(TABLES, offsets[:n])}
+        meta = json.loads(mm[offsets[n]:offsets[n] + offsets[n + 1]])
+        logger.info(f"Mapped code catalog {self.path}: {meta['systems']}")
+        return stat_key, mm, tables, meta
+
+    def _tables(self) -> dict:
+        state = self._state()
+        if state is None:
+            raise CatalogUnavailable("Code catalog not built; run `python build_code_catalog.py`")
+        return state[2]
+
+    @property
+    def available(self) -> bool:
+        return self._state() is not None
+
+    def info(self) -> dict:
+        state = self._state()
+        return {"available": state is not None, "path": self.path, **(state[3] if state else {})}
+
+    def has_system(self, system: str) -> bool:
+        state = self._state()
+        return bool(state and state[3]["systems"].get(system))
+
+    @staticmethod
+    def _result(payload: str, match: str) -> dict:
+        system, code, description = payload.split("\t", 2)
+        return {"code": code, "system": system, "description": description, "match": match}
+
+    def _entries(self, tables: dict, key: str, systems: Optional[tuple], match: str) -> list:
+        """Results for every code set holding the normalized code key (restricted to systems)."""
+        results = [self._result(payload, match) for payload in tables["codes"].get_all(key)]
+        return [r for r in results if systems is None or r["system"] in systems]
+
+    def lookup(self, code: str, systems: Optional[tuple] = None) -> Optional[dict]:
+        key = normalize_code(code)
+        results = self._entries(self._tables(), key, systems, "exact") if key else []
+        if "." in (code or ""):
+            # Only ICD-10 codes are written with a dot; prefer it when another set shares the key
+            results.sort(key=lambda r: r["system"] not in DIAGNOSIS_SYSTEMS)
+        return results[0] if results else None
+
+    def similar(self, code: str, systems: Optional[tuple] = None, limit: int = 5) -> list:
+        """Codes within one edit of code (typos, a missing/extra character, swapped neighbours)."""
+        key = normalize_code(code)
+        if not key:
+            return []
+        tables = self._tables()
+        candidates = set(tables["deletes"].get_all(key))          # query is a code minus one char
+        for variant in _deletes(key):
+            if tables["codes"].get(variant) is not None:
+                candidates.add(variant)                              # query is a code plus one char
+            candidates.update(tables["deletes"].get_all(variant))   # one substitution / transposition
+        candidates.discard(key)
+        results = []
+        for candidate in sorted(candidates):
+            results.extend(self._entries(tables, candidate, systems, "fuzzy"))
+            if len(results) >= limit:
+                break
+        return results[:limit]
+
+    def search(self, query: str, systems: Optional[tuple] = None, limit: int = 20) -> list:
+        """
+        Autocomplete: exact code, code prefix, then codes one edit away, then codes whose description
+        has words starting with every query word. Each result says which of these matched.
+        """
+        tables = self._tables()
+        results: dict = {}
+
+        def add(code_key: str, result: dict) -> bool:
+            entry_key = (result["system"], code_key)
+            if entry_key not in results and (systems is None or result["system"] in systems):
+                results[entry_key] = result
+            return len(results) >= limit
+
+        key = normalize_code(query)
+        if key and re.fullmatch(r"[A-Z0-9]{1,8}", key) and any(ch.isdigit() for ch in key):
+            for code_key, payload in tables["codes"].prefix(key, limit * 4):
+                if add(code_key, self._result(payload, "exact" if code_key == key else "prefix")):
+                    return list(results.values())
+            if len(key) >= 3:
+                for result in self.similar(key, systems, limit):
+                    if add(normalize_code(result["code"]), result):
+                        return list(results.values())
+
+        words = _WORD_RE.findall(query.lower())
+        if words and any(not w.isdigit() for w in words):
+            # Walk the codes of the query word with the fewest matches (a range size is two binary
+            # searches). Other words with small ranges are read whole and intersected; for common ones
+            # each candidate's own description is checked instead, so a query like "left knee" stops
+            # after the first `limit` hits rather than reading tens of thousands of rows.
+            ranges = sorted(((tables["words"].prefix_range(w), w) for w in dict.fromkeys(words)),
+                            key=lambda r: r[0][1] - r[0][0])
+            (lo, hi), _ = ranges[0]
+            required, pending = [], []
+            for (w_lo, w_hi), word in ranges[1:]:
+                if w_hi - w_lo <= _WORD_SET_MAX:
+                    required.append(set(tables["words"].payloads(w_lo, w_hi)))
+                else:
+                    pending.append(word)
+            seen = set()
+            for start in range(lo, min(hi, lo + _WORD_CANDIDATES), _WORD_CHUNK):
+                for code_key in tables["words"].payloads(start, min(hi, start + _WORD_CHUNK)):
+                    if code_key in seen or not all(code_key in codes for codes in required):
+                        continue
+                    seen.add(code_key)
+                    # The word table maps words to codes, not code sets: when several sets share a
+                    # code, each set's own description has to hold every query word
+                    payloads = tables["codes"].get_all(code_key)
+                    check = words if len(payloads) > 1 else pending
+                    for payload in payloads:
+                        described = description_words(payload.rsplit("\t", 1)[-1])
+                        if all(any(d.startswith(w) for d in described) for w in check):
+                            if add(code_key, self._result(payload, "description")):
+                                return list(results.values())
+        return list(results.values())
+
+    def validate(self, diagnosis_code: Optional[str] = None, procedure_code: Optional[str] = None) -> list:
+        """
+        Problems with submitted codes, as messages naming the closest catalog codes. A procedure code is
+        checked only against the code set its format belongs to (CPT or HCPCS), so a catalog without
+        the licensed CPT set still accepts CPT codes. Code sets that are not in the catalog (or a
+        catalog that is not built, or one built from the bundled sample) are not checked.
+        """
+        problems = []
+        state = self._state()
+        if state is None or state[3].get("sample"):
+            return problems
+        checks = (
+            (diagnosis_code, DIAGNOSIS_SYSTEMS, "diagnosis"),
+            (procedure_code, procedure_systems(procedure_code), "procedure"),
+        )
+        for code, systems, label in checks:
+            if not code or not any(self.has_system(s) for s in systems):
+                continue
+            if self.lookup(code, systems) is None:
+                close = [c["code"] for c in self.similar(code, systems, 3)]
+                hint = f"; did you mean {', '.join(close)}?" if close else ""
+                problems.append(f"Unknown {label} code '{code}'{hint}")
+        return problems
+
+
+code_catalog = CodeCatalog(settings.CODE_CATALOG_PATH)
@@ -0,0 +1,155 @@
+"""
+Code Matcher — compiled keyword → ICD-10/CPT suggestion engine for clinical notes.
+
+Keyword rules (the built-in DEFAULT_CODE_RULES plus, optionally, a JSON list in CODE_RULES_FILE with
+the same shape) are compiled once into a single regular expression: the keywords are folded into a
+character trie and emitted as nested, prefix-shared alternations, so each note position costs at most
+one walk down the trie however many rules there are, and word starts whose first character begins
+no keyword are rejected before the trie is entered. Matches are case-insensitive, must start and end
+on word boundaries ("pt" no longer matches inside "symptoms"), allow a plural "s"/"es", and treat any
+run of whitespace inside a multi-word keyword as one space.
+
+suggest() scans each note section once and returns codes ranked by score (matches × rule weight, ties
+broken by first occurrence), each with the spans that produced it. merge() combines suggest() results
+computed for single sections into the ranking for the whole note, so per-section results can be cached.
+"""
+import hashlib
+import json
+import logging
+import re
+from typing import Optional
+from config import settings
+
+logger = logging.getLogger("priorauth.codes")
+
+MAX_SPANS = 10  # spans reported per suggestion; the score still counts every match
+
+DEFAULT_CODE_RULES = [
+    {"keywords": ["knee", "meniscus", "acl", "ligament"], "code": "M23.611", "description": "Loose body in right knee", "type": "ICD-10"},
+    {"keywords": ["shoulder", "rotator", "impingement"], "code": "M75.111", "description": "Right rotator cuff tear", "type": "ICD-10"},
+    {"keywords": ["back", "lumbar", "spine", "disc"], "code": "M54.5", "description": "Low back pain", "type": "ICD-10"},
+    {"keywords": ["chest", "cardiac", "heart", "angina"], "code": "I25.10", "description": "Atherosclerotic heart disease", "type": "ICD-10"},
+    {"keywords": ["colon", "gastro", "gi", "abdominal"], "code": "K57.30", "description": "Diverticulosis of large intestine", "type": "ICD-10"},
+    {"keywords": ["mri", "imaging"], "code": "73721", "description": "MRI lower extremity without contrast", "type": "CPT"},
+    {"keywords": ["physical therapy", "pt", "rehabilitation"], "code": "97110", "description": "Therapeutic exercises", "type": "CPT"},
+    {"keywords": ["injection", "steroid"], "code": "20610", "description": "Arthrocentesis/injection major joint", "type": "CPT"},
+]
+FALLBACK_CODE = {"code": "99214", "description": "Office visit, established patient, moderate complexity", "type": "CPT"}
+
+
+def normalize_keyword(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _trie_regex(keywords: list) -> str:
+    """Regex source matching any keyword, built from a character trie (longest alternative first)."""
+    trie: dict = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        alternatives = [
+            (r"\s+" if ch == " " else re.escape(ch)) + emit(child)
+            for ch, child in sorted(node.items()) if ch
+        ]
+        if not alternatives:
+            return ""
+        body = alternatives[0] if len(alternatives) == 1 else f"(?:{'|'.join(alternatives)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+class CodeMatcher:
+    def __init__(self, rules: list):
+        self.version = hashlib.sha256(json.dumps(rules, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        self._codes: dict = {}     # code -> {"code", "description", "type"}
+        self._keywords: dict = {}  # normalized keyword -> [(code, weight)]
+        for rule in rules:
+            code = rule["code"]
+            self._codes.setdefault(code, {"code": code, "description": rule.get("description", ""), "type": rule.get("type", "")})
+            for keyword in rule["keywords"]:
+                key = normalize_keyword(keyword)
+                if key:
+                    self._keywords.setdefault(key, []).append((code, float(rule.get("weight", 1.0))))
+        # Trie branches are greedy and the optional plural suffix is tried before giving a character back,
+        # so the longest keyword that ends on a word boundary wins. The first-character lookahead lets
+        # the engine reject most word starts before entering the trie.
+        if self._keywords:
+            first_chars = "".join(re.escape(ch) for ch in sorted({key[0] for key in self._keywords}))
+            source = rf"\b(?=[{first_chars}])({_trie_regex(sorted(self._keywords))})(?:e?s)?\b"
+        else:
+            source = r"(?!)"
+        self._pattern = re.compile(source, re.IGNORECASE)
+
+    @property
+    def rule_count(self) -> int:
+        return len(self._keywords)
+
+    def matches(self, text: str):
+        """Yield (keyword, start, end) for every keyword occurrence in text."""
+        for m in self._pattern.finditer(text):
+            yield normalize_keyword(m.group(1)), m.start(), m.end()
+
+    def suggest(self, sections: dict) -> list:
+        """
+        Ranked suggestions for {section name: text}: [{code, description, type, score, matches}],
+        where matches holds up to MAX_SPANS {section, start, end, text} spans.
+        """
+        found: dict = {}
+        order = 0
+        for section, text in sections.items():
+            if not text:
+                continue
+            for keyword, start, end in self.matches(text):
+                for code, weight in self._keywords.get(keyword, ()):
+                    entry = found.get(code)
+                    if entry is None:
+                        entry = found[code] = {**self._codes[code], "score": 0.0, "matches": [], "_first": order}
+                    entry["score"] += weight
+                    if len(entry["matches"]) < MAX_SPANS:
+                        entry["matches"].append({"section": section, "start": start, "end": end, "text": text[start:end]})
+                order += 1
+        return self._rank(found)
+
+    @staticmethod
+    def _rank(found: dict) -> list:
+        ranked = sorted(found.values(), key=lambda e: (-e["score"], e["_first"]))
+        for entry in ranked:
+            del entry["_first"]
+            entry["score"] = round(entry["score"], 3)
+        return ranked
+
+    def merge(self, section_results: list) -> list:
+        """
+        Combine suggest() results for single sections, given in note order, into the ranking suggest()
+        returns for all of them at once: scores add up, spans are kept in note order, and ties go to the
+        code that occurs first.
+        """
+        found: dict = {}
+        for index, suggestions in enumerate(section_results):
+            for suggestion in suggestions:
+                entry = found.get(suggestion["code"])
+                first = (index, suggestion["matches"][0]["start"] if suggestion["matches"] else 0)
+                if entry is None:
+                    entry = found[suggestion["code"]] = {**suggestion, "score": 0.0, "matches": [], "_first": first}
+                entry["score"] += suggestion["score"]
+                entry["matches"].extend(suggestion["matches"][:MAX_SPANS - len(entry["matches"])])
+        return self._rank(found)
+
+
+def load_rules(path: Optional[str]) -> list:
+    rules = list(DEFAULT_CODE_RULES)
+    if path:
+        try:
+            with open(path, encoding="utf-8") as f:
+                rules.extend(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.error(f"Ignoring code rules file {path}: {e}")
+    return rules
+
+
+code_matcher = CodeMatcher(load_rules(settings.CODE_RULES_FILE))
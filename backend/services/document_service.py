@@ -1,69 +1,288 @@
 import os
+import io
+import glob
 import uuid
+import shutil
 import json
+import hashlib
+import zlib
+import zipfile
+import mimetypes
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import BinaryIO, Optional
 from config import settings
+from services.extraction_engine import ExtractionEngine, FieldSpec
 
 
-def save_file(file_bytes: bytes, original_filename: str, content_type: str) -> dict:
-    """Save uploaded file to local uploads directory."""
-    ext = os.path.splitext(original_filename)[1] or ".pdf"
-    unique_name = f"{uuid.uuid4().hex}{ext}"
-    file_path = os.path.join(settings.UPLOAD_DIR, unique_name)
-    with open(file_path, "wb") as f:
-        f.write(file_bytes)
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured size limit while streaming to disk."""
+
+
+# Raised opening or reading one ZIP member: encrypted (RuntimeError), unsupported compression
+# (NotImplementedError), corrupt deflate data (zlib.error), bad CRC (BadZipFile), truncated (EOFError)
+ZIP_MEMBER_ERRORS = (RuntimeError, NotImplementedError, zlib.error, zipfile.BadZipFile, EOFError)
+
+
+def blob_path(content_hash: str, ext: str) -> str:
+    """Content-addressed location of a stored file: uploads/<aa>/<sha256><ext>."""
+    return os.path.join(settings.UPLOAD_DIR, content_hash[:2], f"{content_hash}{ext}")
+
+
+def save_upload(
+    fileobj: BinaryIO,
+    original_filename: str,
+    content_type: str,
+    max_bytes: Optional[int] = None,
+) -> dict:
+    """
+    Stream an uploaded file into content-addressed storage in fixed-size chunks.
+    Size and SHA-256 are computed on the fly; memory per upload stays at one chunk.
+    An identical file that is already stored is reused instead of written again.
+    """
+    limit = settings.MAX_UPLOAD_MB * 1024 * 1024 if max_bytes is None else max_bytes
+    ext = os.path.splitext(original_filename)[1].lower() or ".pdf"
+    partial_path = os.path.join(settings.UPLOAD_DIR, f"{uuid.uuid4().hex}.part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(partial_path, "wb") as f:
+            while True:
+                chunk = fileobj.read(settings.UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if limit and size > limit:
+                    raise UploadTooLargeError(f"File exceeds the {limit // (1024 * 1024)} MB upload limit")
+                digest.update(chunk)
+                f.write(chunk)
+        content_hash = digest.hexdigest()
+        file_path = blob_path(content_hash, ext)
+        deduplicated = os.path.exists(file_path)
+        if deduplicated:
+            os.remove(partial_path)
+        else:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            os.replace(partial_path, file_path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
     return {
-        "filename": unique_name,
+        "filename": os.path.basename(file_path),
         "original_filename": original_filename,
         "file_path": file_path,
-        "file_size": len(file_bytes),
+        "file_size": size,
         "content_type": content_type,
+        "content_hash": content_hash,
+        "deduplicated": deduplicated,
     }
 
 
-def extract_text_from_pdf(file_path: str) -> str:
-    """Extract text from PDF using pdfplumber."""
+def is_zip(filename: str, content_type: str) -> bool:
+    return content_type in ("application/zip", "application/x-zip-compressed") or bool(
+        filename and filename.lower().endswith(".zip")
+    )
+
+
+def iter_batch_files(filename: str, content_type: str, fileobj: BinaryIO):
+    """
+    Yield (filename, content_type, open_stream) for one file of a bulk upload; open_stream() returns
+    a context manager over the file's stream. ZIP archives are expanded into their member files
+    (folders flattened, hidden/metadata entries skipped); members are streamed straight out of the
+    archive, never read into memory whole. Opening or reading a damaged member raises one of
+    ZIP_MEMBER_ERRORS, which only concerns that member; the archive can still be iterated.
+    """
+    if not is_zip(filename, content_type):
+        yield filename, content_type, lambda: nullcontext(fileobj)
+        return
+    with zipfile.ZipFile(fileobj) as archive:
+        for info in archive.infolist():
+            name = os.path.basename(info.filename)
+            if info.is_dir() or not name or name.startswith(".") or info.filename.startswith("__MACOSX/"):
+                continue
+            member_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            yield name, member_type, lambda info=info: archive.open(info)
+
+
+def save_file(file_bytes: bytes, original_filename: str, content_type: str) -> dict:
+    """Save in-memory file bytes to local uploads directory."""
+    return save_upload(io.BytesIO(file_bytes), original_filename, content_type)
+
+
+def is_pdf(filename: str, content_type: str) -> bool:
+    return content_type == "application/pdf" or bool(filename and filename.lower().endswith(".pdf"))
+
+
+def text_extractor_version() -> str:
+    """Identifies the raw-text extractor; cached page text is only reused for the same version."""
     try:
         import pdfplumber
-        text_parts = []
-        with pdfplumber.open(file_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(page_text)
-        return "\n\n".join(text_parts) if text_parts else "[No extractable text found in PDF]"
-    except Exception as e:
-        return f"[PDF extraction error: {str(e)}]"
-
-
-def extract_structured_data(text: str) -> dict:
+        return f"pdfplumber-{pdfplumber.__version__}"
+    except ImportError:
+        return "pdfplumber-unavailable"
+
+
+def _join_pages(page_texts: list) -> str:
+    text_parts = [t for t in page_texts if t]
+    return "\n\n".join(text_parts) if text_parts else "[No extractable text found in PDF]"
+
+
+def extract_text_from_pdf(file_path: str) -> str:
+    """Extract text from PDF using pdfplumber. Unreadable files raise, so they are never stored as text."""
+    import pdfplumber
+    with pdfplumber.open(file_path) as pdf:
+        return _join_pages([page.extract_text() for page in pdf.pages])
+
+
+# ── Page-parallel extraction ─────────────────────────────
+class PageCache:
+    """
+    Per-page extracted text on local disk, keyed by content hash and extractor version.
+    A re-extraction after a crash only redoes pages that never made it into the cache. Entries only
+    live while a document is being extracted: the queue discards them once the text is stored.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _hash_dir(self, content_hash: str) -> str:
+        return os.path.join(self.root, content_hash[:2], content_hash)
+
+    def _dir(self, content_hash: str) -> str:
+        return os.path.join(self._hash_dir(content_hash), text_extractor_version())
+
+    def get(self, content_hash: str, page_number: int) -> Optional[str]:
+        try:
+            with open(os.path.join(self._dir(content_hash), f"{page_number}.txt"), encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, content_hash: str, page_number: int, text: str):
+        directory = self._dir(content_hash)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{page_number}.txt")
+        partial_path = f"{path}.{uuid.uuid4().hex}.part"
+        with open(partial_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(partial_path, path)
+
+    def discard(self, content_hash: str):
+        """Drop every cached page of a file (all extractor versions)."""
+        shutil.rmtree(self._hash_dir(content_hash), ignore_errors=True)
+        try:
+            os.rmdir(os.path.dirname(self._hash_dir(content_hash)))
+        except OSError:
+            pass  # other files share the prefix directory
+
+    def prune_versions(self) -> int:
+        """Remove pages cached by other extractor versions (never reused); returns directories removed."""
+        current = text_extractor_version()
+        removed = 0
+        for version_dir in glob.glob(os.path.join(self.root, "*", "*", "*")):
+            if os.path.basename(version_dir) != current and os.path.isdir(version_dir):
+                shutil.rmtree(version_dir, ignore_errors=True)
+                try:
+                    os.removedirs(os.path.dirname(version_dir))  # hash and prefix directories left empty
+                except OSError:
+                    pass
+                removed += 1
+        return removed
+
+
+page_cache = PageCache(os.path.join(settings.UPLOAD_DIR, "page_cache"))
+
+
+def pdf_page_count(file_path: str) -> int:
+    import pdfplumber
+    with pdfplumber.open(file_path) as pdf:
+        return len(pdf.pages)
+
+
+def extract_page_range(file_path: str, start: int, stop: int, content_hash: Optional[str] = None) -> list:
+    """Extract pages [start, stop) in one worker; results are cached as soon as they exist."""
+    import pdfplumber
+    texts = []
+    with pdfplumber.open(file_path, pages=list(range(start + 1, stop + 1))) as pdf:
+        for offset, page in enumerate(pdf.pages):
+            text = page.extract_text() or ""
+            if content_hash:
+                page_cache.put(content_hash, start + offset, text)
+            texts.append(text)
+    return texts
+
+
+def _page_ranges(pages: list, pages_per_task: int) -> list:
+    """Group sorted page numbers into contiguous [start, stop) ranges of at most pages_per_task."""
+    ranges = []
+    for page in pages:
+        if ranges and ranges[-1][1] == page and page - ranges[-1][0] < pages_per_task:
+            ranges[-1][1] = page + 1
+        else:
+            ranges.append([page, page + 1])
+    return ranges
+
+
+def extract_text_parallel(file_path: str, executor, content_hash: Optional[str] = None,
+                          pages_per_task: Optional[int] = None) -> str:
+    """
+    Split a PDF into page ranges, extract them across an executor's workers and reassemble
+    the text in page order. Pages already in the page cache are not extracted again.
+    Parse errors, cancellation and a broken executor all raise; the caller decides what they mean.
+    """
+    pages_per_task = pages_per_task or settings.EXTRACTION_PAGES_PER_TASK
+    total = executor.submit(pdf_page_count, file_path).result()
+    texts = [page_cache.get(content_hash, n) if content_hash else None for n in range(total)]
+    missing = [n for n, text in enumerate(texts) if text is None]
+    futures = [
+        (start, executor.submit(extract_page_range, file_path, start, stop, content_hash))
+        for start, stop in _page_ranges(missing, pages_per_task)
+    ]
+    try:
+        for start, future in futures:
+            for offset, text in enumerate(future.result()):
+                texts[start + offset] = text
+    except BaseException:
+        for _, future in futures:
+            future.cancel()
+        raise
+    return _join_pages(texts)
+
+
+CLINICAL_FIELDS = (
+    FieldSpec("patient_name", ("patient:", "patient name:", "name:")),
+    FieldSpec("date_of_birth", ("dob:", "date of birth:", "birth date:")),
+    FieldSpec("diagnosis", ("diagnosis:", "dx:", "impression:", "assessment:")),
+    FieldSpec("medications", ("medications:", "meds:", "current medications:")),
+    FieldSpec("procedures", ("procedure:", "procedure requested:", "cpt:")),
+    FieldSpec("prior_therapy", ("prior therapy:", "conservative treatment:", "previous treatment:")),
+    FieldSpec("imaging_results", ("imaging:", "mri:", "ct:", "x-ray:", "radiology:")),
+    FieldSpec("lab_results", ("labs:", "lab results:", "blood work:")),
+    FieldSpec("allergies", ("allergies:", "allergy:")),
+    FieldSpec("insurance_id", ("insurance:", "member id:", "policy:", "subscriber:")),
+)
+
+_clinical_engine = ExtractionEngine(CLINICAL_FIELDS)
+
+
+@lru_cache(maxsize=1)
+def structured_extractor_version() -> str:
+    """Changes whenever CLINICAL_FIELDS does, so documents extracted with older prefixes can be found."""
+    digest = hashlib.sha256(repr(CLINICAL_FIELDS).encode()).hexdigest()[:12]
+    return f"fields-{digest}"
+
+
+@lru_cache(maxsize=32)
+def build_extraction_engine(extra_fields: tuple = ()) -> ExtractionEngine:
+    """Engine for the clinical fields plus e.g. payer-specific FieldSpecs, compiled once per field set."""
+    return ExtractionEngine(CLINICAL_FIELDS + extra_fields) if extra_fields else _clinical_engine
+
+
+def extract_structured_data(text: str, extra_fields: tuple = ()) -> dict:
     """
     Simulate structured data extraction from clinical text.
     In production, this would use NLP/AI to parse clinical information.
+    Each field takes the value after the first of its label prefixes found in the text.
     """
-    data = {
-        "patient_name": _find_pattern(text, ["patient:", "patient name:", "name:"]),
-        "date_of_birth": _find_pattern(text, ["dob:", "date of birth:", "birth date:"]),
-        "diagnosis": _find_pattern(text, ["diagnosis:", "dx:", "impression:", "assessment:"]),
-        "medications": _find_pattern(text, ["medications:", "meds:", "current medications:"]),
-        "procedures": _find_pattern(text, ["procedure:", "procedure requested:", "cpt:"]),
-        "prior_therapy": _find_pattern(text, ["prior therapy:", "conservative treatment:", "previous treatment:"]),
-        "imaging_results": _find_pattern(text, ["imaging:", "mri:", "ct:", "x-ray:", "radiology:"]),
-        "lab_results": _find_pattern(text, ["labs:", "lab results:", "blood work:"]),
-        "allergies": _find_pattern(text, ["allergies:", "allergy:"]),
-        "insurance_id": _find_pattern(text, ["insurance:", "member id:", "policy:", "subscriber:"]),
-    }
-    return {k: v for k, v in data.items() if v}
-
-
-def _find_pattern(text: str, prefixes: list) -> str:
-    """Simple pattern finder — looks for lines starting with given prefixes."""
-    text_lower = text.lower()
-    for prefix in prefixes:
-        idx = text_lower.find(prefix)
-        if idx != -1:
-            start = idx + len(prefix)
-            end = text_lower.find("\n", start)
-            if end == -1:
-                end = min(start + 200, len(text))
-            return text[start:end].strip()
-    return ""
+    return build_extraction_engine(extra_fields).extract(text)
@@ -0,0 +1,333 @@
+"""
+Extraction Queue — background PDF extraction off the upload request path.
+
+Uploads are persisted with extraction_status="pending" and return immediately. A dispatcher
+thread claims pending documents (at most EXTRACTION_QUEUE_DEPTH in flight), runs pdfplumber in a
+bounded process pool (EXTRACTION_WORKERS) and writes the text (to the compressed text store) and
+extracted_data back. Long
+PDFs are split into EXTRACTION_PAGES_PER_TASK page ranges that run across the pool in parallel.
+
+The documents table is the durable queue: rows still pending when the process stops are picked
+up again on the next start. Each claimed row records its owner (claimed_by, one id per queue
+instance) and a heartbeat (claimed_at) the owner renews while the extraction runs, so several API
+processes can share the table: a row is only reset to pending once its claim has gone unrenewed for
+EXTRACTION_LEASE_SECONDS (its owner crashed), and a clean shutdown hands its own rows back at once.
+
+Storage is content-addressed, so documents sharing a content_hash share one extraction: uploads of
+an already-extracted file copy its results, and identical files queued together are extracted once.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import update, or_
+from sqlalchemy.orm import Session
+from config import settings
+from database import SessionLocal
+from models import Document, ExtractionStatus
+from services.document_service import (
+    extract_text_from_pdf, extract_text_parallel, extract_structured_data,
+    text_extractor_version, structured_extractor_version, page_cache,
+)
+from services.text_store import store_text, text_key
+from services.search_service import index_document
+
+logger = logging.getLogger("priorauth.extraction")
+
+
+def run_extraction(file_path: str) -> tuple[str, dict]:
+    """Worker-process entry point: extract raw text and structured fields from one PDF."""
+    text = extract_text_from_pdf(file_path)
+    return text, extract_structured_data(text)
+
+
+def reuse_extractions(db: Session, docs: list) -> int:
+    """
+    Copy extraction results onto pending documents from already-extracted documents with the
+    same content hash. One lookup covers the whole batch; returns how many documents were filled.
+    """
+    hashes = {d.content_hash for d in docs if d.content_hash and d.extraction_status == ExtractionStatus.PENDING.value}
+    if not hashes:
+        return 0
+    sources = {}
+    rows = db.query(
+        Document.content_hash, Document.text_length, Document.text_preview, Document.extracted_data,
+        Document.extracted_at, Document.text_extractor_version, Document.data_extractor_version,
+    ).filter(
+        Document.content_hash.in_(hashes),
+        Document.extraction_status == ExtractionStatus.COMPLETED.value,
+    ).all()
+    for row in rows:
+        sources.setdefault(row.content_hash, row)
+    filled = 0
+    for doc in docs:
+        source = sources.get(doc.content_hash)
+        if source is None or doc.extraction_status != ExtractionStatus.PENDING.value:
+            continue
+        doc.text_length = source.text_length
+        doc.text_preview = source.text_preview
+        doc.extracted_data = source.extracted_data
+        doc.extracted_at = source.extracted_at
+        doc.text_extractor_version = source.text_extractor_version
+        doc.data_extractor_version = source.data_extractor_version
+        doc.extraction_status = ExtractionStatus.COMPLETED.value
+        filled += 1
+    return filled
+
+
+class ExtractionQueue:
+    def __init__(self, workers: int, depth: int, poll_seconds: float, lease_seconds: float,
+                 session_factory=SessionLocal):
+        self.workers = max(1, workers)
+        self.depth = max(1, depth)
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._last_heartbeat = 0.0
+        self._session_factory = session_factory
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._runners: Optional[ThreadPoolExecutor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._inflight: dict[int, Optional[str]] = {}  # doc id -> content hash
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._dispatcher is not None and self._dispatcher.is_alive()
+
+    def start(self):
+        """Start the worker pool and re-enqueue anything left over from a previous run."""
+        if self.running:
+            return
+        self._stopping.clear()
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._runners = ThreadPoolExecutor(max_workers=self.depth, thread_name_prefix="extraction")
+        self._recover()
+        pruned = page_cache.prune_versions()
+        if pruned:
+            logger.info(f"Removed {pruned} page cache director(ies) of older text extractor versions")
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="extraction-dispatcher", daemon=True)
+        self._dispatcher.start()
+        logger.info(f"Extraction queue started (workers={self.workers}, depth={self.depth})")
+
+    def stop(self):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._dispatcher:
+            self._dispatcher.join(timeout=10)
+            self._dispatcher = None
+        if self._runners:
+            self._runners.shutdown(wait=False, cancel_futures=True)
+            self._runners = None
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        released = self._release()
+        if released:
+            logger.info(f"Handed {released} in-flight document(s) back to the queue")
+
+    def notify(self):
+        """Wake the dispatcher after new pending documents were committed."""
+        self._wakeup.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            inflight = len(self._inflight)
+        return {"running": self.running, "workers": self.workers, "depth": self.depth, "in_flight": inflight}
+
+    # ── Internals ────────────────────────────────────────
+    def _requeue(self, condition) -> int:
+        """Reset "processing" rows matching condition to pending and drop their claim."""
+        db = self._session_factory()
+        try:
+            result = db.execute(
+                update(Document)
+                .where(Document.extraction_status == ExtractionStatus.PROCESSING.value, condition)
+                .values(extraction_status=ExtractionStatus.PENDING.value, claimed_by=None, claimed_at=None)
+            )
+            db.commit()
+            return result.rowcount or 0
+        finally:
+            db.close()
+
+    def _recover(self) -> int:
+        """Re-enqueue rows whose owner stopped renewing its claim (rows without a claim predate leases)."""
+        expired = datetime.now(timezone.utc) - timedelta(seconds=self.lease_seconds)
+        recovered = self._requeue(or_(Document.claimed_at.is_(None), Document.claimed_at < expired))
+        if recovered:
+            logger.info(f"Re-enqueued {recovered} document(s) whose extraction claim expired")
+        return recovered
+
+    def _release(self) -> int:
+        return self._requeue(Document.claimed_by == self.worker_id)
+
+    def _heartbeat(self):
+        """Renew the claim on every in-flight row, then take over rows whose claim expired."""
+        now = time.monotonic()
+        if now - self._last_heartbeat < self.lease_seconds / 3:
+            return
+        self._last_heartbeat = now
+        with self._lock:
+            doc_ids = list(self._inflight)
+        if doc_ids:
+            db = self._session_factory()
+            try:
+                db.execute(
+                    update(Document)
+                    .where(Document.id.in_(doc_ids), Document.claimed_by == self.worker_id)
+                    .values(claimed_at=datetime.now(timezone.utc))
+                )
+                db.commit()
+            finally:
+                db.close()
+        self._recover()
+
+    def _dispatch_loop(self):
+        while not self._stopping.is_set():
+            try:
+                self._heartbeat()
+                self._fill()
+            except Exception as e:
+                logger.error(f"Extraction dispatcher error: {e}")
+            self._wakeup.wait(self.poll_seconds)
+            self._wakeup.clear()
+
+    def _fill(self):
+        with self._lock:
+            free = self.depth - len(self._inflight)
+            inflight_hashes = {h for h in self._inflight.values() if h}
+        if free <= 0:
+            return
+        db = self._session_factory()
+        try:
+            query = db.query(Document.id, Document.file_path, Document.content_hash).filter(
+                Document.extraction_status == ExtractionStatus.PENDING.value
+            )
+            if inflight_hashes:
+                # Identical files already in flight are filled in when that extraction finishes
+                query = query.filter(or_(Document.content_hash.is_(None), Document.content_hash.notin_(inflight_hashes)))
+            claimed_hashes = set()
+            for doc_id, file_path, content_hash in query.order_by(Document.id).limit(free).all():
+                if content_hash and content_hash in claimed_hashes:
+                    continue
+                # Claim atomically so several API processes never extract the same row twice
+                claimed = db.execute(
+                    update(Document)
+                    .where(Document.id == doc_id, Document.extraction_status == ExtractionStatus.PENDING.value)
+                    .values(
+                        extraction_status=ExtractionStatus.PROCESSING.value,
+                        claimed_by=self.worker_id,
+                        claimed_at=datetime.now(timezone.utc),
+                    )
+                ).rowcount
+                db.commit()
+                if not claimed:
+                    continue
+                with self._lock:
+                    self._inflight[doc_id] = content_hash
+                claimed_hashes.add(content_hash)
+                self._runners.submit(self._process, doc_id, file_path, content_hash)
+        finally:
+            db.close()
+
+    def _process(self, doc_id: int, file_path: str, content_hash: Optional[str]):
+        try:
+            values = self._extract(doc_id, file_path, content_hash)
+            if values is not None:
+                self._store(doc_id, content_hash, values)
+        except Exception as e:
+            logger.error(f"Could not store extraction for document {doc_id}: {e}")
+        finally:
+            with self._lock:
+                self._inflight.pop(doc_id, None)
+            self._wakeup.set()
+
+    def _replace_pool(self, broken: ProcessPoolExecutor):
+        """Swap in a fresh process pool after a worker died; later extractions keep working."""
+        with self._lock:
+            if self._pool is not broken or self._stopping.is_set():
+                return
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        broken.shutdown(wait=False, cancel_futures=True)
+        logger.warning("Extraction worker process died; process pool restarted")
+
+    def _extract(self, doc_id: int, file_path: str, content_hash: Optional[str]) -> Optional[dict]:
+        pool = self._pool
+        try:
+            if settings.EXTRACTION_PAGES_PER_TASK > 0:
+                text = extract_text_parallel(file_path, pool, content_hash)
+                data = extract_structured_data(text)
+            else:
+                text, data = pool.submit(run_extraction, file_path).result()
+        except Exception as e:
+            if self._stopping.is_set():
+                return None  # left as "processing"; handed back by stop()
+            if isinstance(e, BrokenProcessPool):
+                self._replace_pool(pool)
+                e = RuntimeError(f"Extraction worker process crashed: {e}")
+            logger.error(f"Extraction failed for document {doc_id}: {e}")
+            return {
+                "extraction_status": ExtractionStatus.FAILED.value,
+                "extraction_error": str(e)[:1000],
+                "extracted_at": datetime.now(timezone.utc),
+            }
+        return {
+            "text": text,
+            "extracted_data": json.dumps(data) if data else None,
+            "extraction_status": ExtractionStatus.COMPLETED.value,
+            "extraction_error": None,
+            "extracted_at": datetime.now(timezone.utc),
+            "text_extractor_version": text_extractor_version(),
+            "data_extractor_version": structured_extractor_version(),
+        }
+
+    def _store(self, doc_id: int, content_hash: Optional[str], values: dict):
+        db = self._session_factory()
+        try:
+            text = values.pop("text", None)
+            if text is not None:
+                values.update(store_text(db, text_key(content_hash, doc_id), text))
+            # Only while we still own the claim: after a lease expiry another worker may have taken it
+            owned = db.execute(
+                update(Document)
+                .where(Document.id == doc_id, Document.claimed_by == self.worker_id)
+                .values(**values, claimed_by=None, claimed_at=None)
+            ).rowcount
+            if not owned:
+                db.rollback()
+                logger.warning(f"Discarded extraction of document {doc_id}: its claim was taken over")
+                return
+            doc_ids = [doc_id]
+            if content_hash and values["extraction_status"] == ExtractionStatus.COMPLETED.value:
+                duplicates = [row.id for row in db.query(Document.id).filter(
+                    Document.content_hash == content_hash,
+                    Document.extraction_status == ExtractionStatus.PENDING.value,
+                )]
+                if duplicates:
+                    db.execute(update(Document).where(Document.id.in_(duplicates)).values(**values))
+                doc_ids += duplicates
+            if text is not None:
+                for doc in db.query(Document.id, Document.original_filename).filter(Document.id.in_(doc_ids)):
+                    index_document(db, doc, text)
+            db.commit()
+        finally:
+            db.close()
+        if content_hash:
+            page_cache.discard(content_hash)  # result stored; cached pages were only for crash recovery
+
+
+extraction_queue = ExtractionQueue(
+    workers=settings.EXTRACTION_WORKERS,
+    depth=settings.EXTRACTION_QUEUE_DEPTH,
+    poll_seconds=settings.EXTRACTION_POLL_SECONDS,
+    lease_seconds=settings.EXTRACTION_LEASE_SECONDS,
+)
@@ -0,0 +1,93 @@
+"""
+HTTP caching helpers — ETag / Last-Modified validation and single byte-range parsing.
+
+API reads compute strong ETags from cheap version data (ids and updated_at stamps, fetched without
+the large text columns) before loading the full rows, so a matching If-None-Match is answered with
+a bare 304 without loading or serializing the body.
+"""
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response
+
+REVALIDATE = "private, no-cache"  # browsers may keep a copy but must revalidate it on every use
+
+
+def http_date(timestamp: float) -> str:
+    return formatdate(timestamp, usegmt=True)
+
+
+def _etag_list(header: str) -> list:
+    return [tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()]
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[float] = None) -> bool:
+    """
+    True when the client's cached copy is current. If-None-Match takes precedence over
+    If-Modified-Since, as in RFC 9110 §13.2.2.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = _etag_list(if_none_match)
+        return "*" in tags or etag.removeprefix("W/") in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def version_etag(*parts) -> str:
+    """Strong ETag over a resource's version data, e.g. ("pa", id, updated_at) or a page of (id, updated_at)."""
+    return '"' + hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Put the validators on the outgoing response; returns a bare 304 (carrying the same headers)
+    when the client's copy is current, otherwise None and the handler builds the body as usual.
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = REVALIDATE
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers=dict(response.headers))
+    return None
+
+
+def range_applies(request: Request, etag: str) -> bool:
+    """Honour Range unless an If-Range validator shows the client holds a different version."""
+    if_range = request.headers.get("if-range")
+    return if_range is None or if_range.strip() == etag
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """
+    Parse a single "bytes=" range into an inclusive (start, end). Returns None when the whole
+    file should be sent (no/unsupported/multi-range header, or an invalid one such as last < first,
+    which RFC 9110 says to ignore); raises RangeNotSatisfiable when the range lies outside the file.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if first == "":
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable()
+            start, end = max(0, size - suffix), size - 1
+        else:
+            start = int(first)
+            end = int(last) if last else size - 1
+            if end < start and last:
+                return None
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    return start, min(end, size - 1)
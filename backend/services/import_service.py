@@ -0,0 +1,288 @@
+"""
+Import Service — streaming bulk import of patients and clinical notes from CSV or NDJSON.
+
+Rows are read one at a time from a text stream (csv.DictReader, or one JSON object per line),
+validated with the API schemas (PatientCreate, ClinicalNoteImport) and collected into chunks of
+IMPORT_CHUNK_SIZE. Each chunk resolves its references in set-based queries (existing MRNs; note
+patients by id or MRN; providers), is written with one executemany INSERT (plus one for the notes'
+search index entries) and committed, so memory is bounded by the chunk size however large the file
+is. A bad row is reported with its line number and skipped; it never aborts the import. Streams
+should be opened with errors="surrogateescape": bytes that are not UTF-8 then only reject their own
+row. On a strictly decoded stream a decode error ends the import at that line; it is reported as a
+rejection, and the rows before it stay imported.
+
+Clinical note enrichment (section-level AI assist, services/note_service.py) is chosen per import:
+• none — notes are stored as given (full_note if the file has one), without AI output;
+• inline — each chunk is assisted, IMPORT_ENRICH_CHUNK_SIZE notes at a time, before it is inserted;
+• deferred — notes are inserted right away and assisted afterwards in a background thread, which
+  also adds them to the search index (so the import itself skips the full-text indexing).
+"""
+import asyncio
+import csv
+import json
+import logging
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Iterator, Optional, TextIO
+from pydantic import ValidationError
+from sqlalchemy import insert, or_
+from sqlalchemy.orm import Session
+from config import settings
+from database import SessionLocal
+from models import ClinicalNote, Patient, User
+from schemas import PatientCreate, ClinicalNoteImport
+from services.ai_service import NOTE_SECTIONS
+from services.note_service import assist_note
+from services.search_service import index_entries, note_entry
+
+logger = logging.getLogger("priorauth.imports")
+
+KINDS = ("patients", "notes")
+FORMATS = ("csv", "ndjson")
+ENRICH_MODES = ("none", "inline", "deferred")
+_SECTION_COLUMNS = tuple(getattr(ClinicalNote, name) for name in NOTE_SECTIONS)
+_NOT_UTF8_RE = re.compile("[\udc80-\udcff]")  # bytes smuggled through by errors="surrogateescape"
+_NOT_UTF8 = "Not valid UTF-8 text"
+_NOTE_COLUMNS = (
+    "patient_id", "provider_id", "note_type", *NOTE_SECTIONS, "full_note", "suggested_codes", "ai_suggestions",
+    "section_cache", "status", "created_at", "updated_at",
+)
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> str:
+    """csv or ndjson from the file extension, then the content type; CSV when neither says."""
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl", ".json")) or "json" in (content_type or ""):
+        return "ndjson"
+    return "csv"
+
+
+def iter_rows(stream: TextIO, fmt: str) -> Iterator[tuple]:
+    """(line number, row dict or None, parse error or None) for each record in stream."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield reader.line_num, None, f"Malformed CSV: {e}"
+                continue
+            except UnicodeDecodeError:
+                yield reader.line_num + 1, None, f"{_NOT_UTF8} at or after this line; import stopped"
+                return
+            if any(isinstance(v, str) and _NOT_UTF8_RE.search(v) for v in row.values()):
+                yield reader.line_num, None, _NOT_UTF8
+                continue
+            # CSV has no nulls: empty cells mean "not given" so schema defaults apply
+            yield reader.line_num, {k.strip(): v for k, v in row.items() if k and v not in (None, "")}, None
+    lines = iter(stream)
+    line_no = 0
+    while True:
+        try:
+            line = next(lines)
+        except StopIteration:
+            return
+        except UnicodeDecodeError:
+            yield line_no + 1, None, f"{_NOT_UTF8} at or after this line; import stopped"
+            return
+        line_no += 1
+        if not line.strip():
+            continue
+        if _NOT_UTF8_RE.search(line):
+            yield line_no, None, _NOT_UTF8
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_no, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, None, "Expected a JSON object"
+            continue
+        yield line_no, row, None
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()
+    )
+
+
+def _assist_all(items: list):
+    """Run note AI assist over [(note, patient_name)], IMPORT_ENRICH_CHUNK_SIZE notes concurrently."""
+    async def run():
+        size = settings.IMPORT_ENRICH_CHUNK_SIZE
+        for i in range(0, len(items), size):
+            await asyncio.gather(*(assist_note(note, name) for note, name in items[i:i + size]))
+    asyncio.run(run())
+
+
+# ── Chunk writers ────────────────────────────────────────
+def _write_patients(db: Session, chunk: list, user_id: int, enrich: str) -> tuple:
+    """Insert validated PatientCreate rows; MRNs already stored (or repeated in the file) are rejected."""
+    existing = {mrn for (mrn,) in db.query(Patient.mrn).filter(Patient.mrn.in_({p.mrn for _, p in chunk}))}
+    rows, rejected = [], []
+    for line, patient in chunk:
+        if patient.mrn in existing:
+            rejected.append((line, f"MRN '{patient.mrn}' already exists"))
+            continue
+        existing.add(patient.mrn)
+        rows.append(patient.model_dump())
+    if rows:
+        db.execute(insert(Patient), rows)
+    return len(rows), rejected, []
+
+
+def _write_notes(db: Session, chunk: list, user_id: int, enrich: str) -> tuple:
+    """Insert validated ClinicalNoteImport rows with their search entries; returns the new note ids."""
+    patient_ids = {n.patient_id for _, n in chunk if n.patient_id is not None}
+    mrns = {n.patient_mrn.strip() for _, n in chunk if n.patient_id is None}
+    names, by_mrn = {}, {}
+    for row in db.query(Patient.id, Patient.mrn, Patient.first_name, Patient.last_name).filter(
+        or_(Patient.id.in_(patient_ids), Patient.mrn.in_(mrns))
+    ):
+        names[row.id] = f"{row.first_name} {row.last_name}"
+        by_mrn[row.mrn] = row.id
+    provider_ids = {n.provider_id for _, n in chunk if n.provider_id is not None}
+    providers = {uid for (uid,) in db.query(User.id).filter(User.id.in_(provider_ids))} if provider_ids else set()
+
+    now = datetime.now(timezone.utc)
+    notes, rejected = [], []
+    for line, n in chunk:
+        patient_id = n.patient_id if n.patient_id is not None else by_mrn.get(n.patient_mrn.strip())
+        if patient_id not in names:
+            rejected.append((line, f"Patient {n.patient_id if n.patient_id is not None else repr(n.patient_mrn)} not found"))
+            continue
+        if n.provider_id is not None and n.provider_id not in providers:
+            rejected.append((line, f"Provider {n.provider_id} not found"))
+            continue
+        note = SimpleNamespace(
+            id=None, patient_id=patient_id, provider_id=n.provider_id or user_id, note_type=n.note_type,
+            subjective=n.subjective, objective=n.objective, assessment=n.assessment, plan=n.plan,
+            full_note=n.full_note, suggested_codes=None, ai_suggestions=None, section_cache=None,
+            status=n.status, created_at=n.created_at or now, updated_at=now,
+        )
+        notes.append((note, names[patient_id]))
+    if not notes:
+        return 0, rejected, []
+
+    if enrich == "inline":
+        _assist_all(notes)
+    rows = [{column: getattr(note, column) for column in _NOTE_COLUMNS} for note, _ in notes]
+    # RETURNING in parameter order would make SQLite insert row by row; returning the indexed columns
+    # instead lets each new row be indexed from what came back, in whatever order it arrives.
+    stored = db.execute(insert(ClinicalNote).returning(
+        ClinicalNote.id, ClinicalNote.patient_id, ClinicalNote.note_type, ClinicalNote.full_note, *_SECTION_COLUMNS,
+    ), rows).all()
+    if enrich != "deferred":  # deferred enrichment indexes the notes once their AI output is in
+        index_entries(db, "note", [(row.id, *note_entry(row, names[row.patient_id])) for row in stored])
+    return len(stored), rejected, [row.id for row in stored]
+
+
+_WRITERS = {"patients": (PatientCreate, _write_patients), "notes": (ClinicalNoteImport, _write_notes)}
+
+
+def import_rows(
+    db: Session, kind: str, stream: TextIO, fmt: str, user_id: int,
+    enrich: str = "none", chunk_size: Optional[int] = None, background: bool = True,
+) -> dict:
+    """
+    Import every row of stream; returns counts, the IMPORT_MAX_REJECTIONS_REPORTED rejections with the
+    lowest line numbers (in line order) and throughput. Deferred note enrichment starts in a background thread (or, with background=False,
+    runs before returning).
+    """
+    if kind not in KINDS:
+        raise ValueError(f"kind must be one of: {', '.join(KINDS)}")
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(FORMATS)}")
+    if enrich not in ENRICH_MODES:
+        raise ValueError(f"enrich must be one of: {', '.join(ENRICH_MODES)}")
+    schema, writer = _WRITERS[kind]
+    chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+    enrich = enrich if kind == "notes" else "none"
+    started = time.perf_counter()
+    result = {
+        "kind": kind, "format": fmt, "received": 0, "inserted": 0, "rejected": 0, "rejections": [],
+        "enrichment": enrich, "enrichment_queued": 0,
+    }
+    deferred: list = []
+
+    def reject(line: int, error: str):
+        result["rejected"] += 1
+        result["rejections"].append({"line": line, "error": error})
+
+    def trim_rejections():
+        # Write-stage rejections of a chunk arrive after the parse/validation ones of the same lines
+        result["rejections"].sort(key=lambda r: r["line"])
+        del result["rejections"][settings.IMPORT_MAX_REJECTIONS_REPORTED:]
+
+    def flush(chunk: list):
+        inserted, rejected, ids = writer(db, chunk, user_id, enrich)
+        db.commit()
+        result["inserted"] += inserted
+        for line, error in rejected:
+            reject(line, error)
+        trim_rejections()
+        if enrich == "deferred":
+            deferred.extend(ids)
+
+    chunk: list = []
+    for line, row, error in iter_rows(stream, fmt):
+        result["received"] += 1
+        if error:
+            reject(line, error)
+            continue
+        try:
+            chunk.append((line, schema.model_validate(row)))
+        except ValidationError as e:
+            reject(line, _validation_message(e))
+            continue
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            chunk = []
+    if chunk:
+        flush(chunk)
+    trim_rejections()
+
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    result["rows_per_second"] = round(result["received"] / result["seconds"], 1) if result["seconds"] else 0.0
+    logger.info(
+        f"Imported {result['inserted']}/{result['received']} {kind} ({result['rejected']} rejected) "
+        f"in {result['seconds']}s, enrichment={enrich}"
+    )
+    if deferred:
+        result["enrichment_queued"] = len(deferred)
+        if background:
+            threading.Thread(target=enrich_notes, args=(deferred,), name="note-enrichment", daemon=True).start()
+        else:
+            enrich_notes(deferred)
+    return result
+
+
+def enrich_notes(note_ids: list, session_factory=SessionLocal) -> int:
+    """AI-assist stored notes by id (deferred import enrichment), committing per chunk. Returns notes done."""
+    db = session_factory()
+    done = 0
+    try:
+        size = settings.IMPORT_ENRICH_CHUNK_SIZE
+        for i in range(0, len(note_ids), size):
+            batch = db.query(ClinicalNote, Patient.first_name, Patient.last_name).join(
+                Patient, Patient.id == ClinicalNote.patient_id,
+            ).filter(ClinicalNote.id.in_(note_ids[i:i + size])).all()
+            items = [(note, f"{first} {last}") for note, first, last in batch]
+            _assist_all(items)
+            index_entries(db, "note", [(note.id, *note_entry(note, name)) for note, name in items])
+            db.commit()
+            done += len(items)
+    except Exception:
+        logger.exception(f"Deferred note enrichment stopped after {done}/{len(note_ids)} notes")
+        db.rollback()
+    finally:
+        db.close()
+    logger.info(f"Deferred note enrichment finished: {done}/{len(note_ids)} notes")
+    return done
@@ -0,0 +1,299 @@
+"""
+LLM Provider — async generation layer in front of ai_service.
+
+Route handlers and batch jobs call `llm.generate(task, **inputs)` (async) or `llm.generate_sync(...)`
+(worker threads). Both run on one background event loop owned by the gateway, so the pooled HTTP
+client, its keep-alive connections and the concurrency semaphore are shared by every caller.
+
+Providers:
+• mock — calls the local ai_service functions in-process (default; no network).
+• http — POSTs {"task", "inputs"} to LLM_BASE_URL/v1/generate and expects {"output"}. A pooled
+  httpx.AsyncClient, a semaphore of LLM_MAX_CONCURRENCY in-flight requests, per-request timeouts,
+  retries with full-jitter backoff on timeouts/429/5xx, and optional hedging: when the first attempt
+  hasn't answered after LLM_HEDGE_AFTER_SECONDS a second identical request is raced against it.
+  `python llm_stub_server.py` serves this protocol locally with configurable latency.
+
+Streaming (`llm.stream`) yields {"type": "section", "name", "text"} events as the document is produced
+and ends with {"type": "result", "output"} — the same output `generate` returns, so the concatenated
+section texts always equal the stored document. Over http this is NDJSON from /v1/generate/stream;
+a failed stream is only retried if it broke before the first event.
+"""
+import asyncio
+import json
+import logging
+import random
+import re
+import threading
+from concurrent.futures import Future
+from typing import Optional
+import httpx
+from config import settings
+from services.ai_service import generate_pa_packet, generate_appeal_letter, generate_clinical_note, assist_note_section
+
+logger = logging.getLogger("priorauth.llm")
+
+LOCAL_TASKS = {
+    "pa_packet": generate_pa_packet,
+    "appeal_letter": generate_appeal_letter,
+    "clinical_note": generate_clinical_note,
+    "note_section": assist_note_section,
+}
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+_HEADING_RE = re.compile(r"^([^\n]+)\n[-=]{3,}$", re.MULTILINE)
+
+
+def document_text(task: str, output) -> str:
+    """The prose part of a task's output (packet text, letter, full note)."""
+    if task == "pa_packet":
+        return output["packet"]
+    if task == "clinical_note":
+        return output["full_note"]
+    return output
+
+
+def split_sections(text: str) -> list:
+    """[(name, text)] split at underlined headings; the slices concatenate back to text exactly."""
+    starts = [m.start() for m in _HEADING_RE.finditer(text)]
+    if not starts or starts[0] != 0:
+        starts.insert(0, 0)
+    sections = []
+    for i, start in enumerate(starts):
+        chunk = text[start:starts[i + 1] if i + 1 < len(starts) else len(text)]
+        m = _HEADING_RE.match(chunk)
+        name = re.sub(r"[^a-z0-9]+", "_", m.group(1).lower()).strip("_") if m else "header"
+        sections.append((name, chunk))
+    return sections
+
+
+def section_events(task: str, output) -> list:
+    events = [{"type": "section", "name": name, "text": chunk} for name, chunk in split_sections(document_text(task, output))]
+    return events + [{"type": "result", "output": output}]
+
+
+class LLMError(Exception):
+    """The provider could not produce a result (after retries)."""
+
+
+class MockProvider:
+    name = "mock"
+
+    async def generate(self, task: str, inputs: dict):
+        if task not in LOCAL_TASKS:
+            raise LLMError(f"Unknown task '{task}'")
+        return LOCAL_TASKS[task](**inputs)
+
+    async def stream(self, task: str, inputs: dict):
+        for event in section_events(task, await self.generate(task, inputs)):
+            yield event
+
+    async def aclose(self):
+        pass
+
+
+class HTTPProvider:
+    name = "http"
+
+    def __init__(
+        self, base_url: str, api_key: str = "", timeout: float = 30.0, max_concurrency: int = 8,
+        retries: int = 2, backoff_base: float = 0.25, backoff_max: float = 4.0, hedge_after: float = 0.0,
+    ):
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_after = hedge_after
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        self._client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers=headers,
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)),
+            limits=httpx.Limits(max_connections=max_concurrency * 2, max_keepalive_connections=max_concurrency),
+        )
+
+    async def _post(self, body: dict):
+        async with self._semaphore:
+            response = await self._client.post("/v1/generate", json=body)
+        if response.status_code in RETRYABLE_STATUS:
+            raise _Retryable(f"HTTP {response.status_code}", response.headers.get("retry-after"))
+        if response.status_code >= 400:
+            raise LLMError(f"Provider returned HTTP {response.status_code}: {response.text[:200]}")
+        try:
+            return response.json()["output"]
+        except (ValueError, KeyError, TypeError) as e:  # not JSON, or no "output"
+            raise LLMError(f"Provider returned an invalid response: {response.text[:200]}") from e
+
+    async def _hedged(self, body: dict):
+        """First successful response wins; a hedge is only sent if the primary is slow."""
+        primary = asyncio.create_task(self._post(body))
+        if not self.hedge_after:
+            return await primary
+        done, _ = await asyncio.wait({primary}, timeout=self.hedge_after)
+        if done:
+            return primary.result()
+        pending = {primary, asyncio.create_task(self._post(body))}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def generate(self, task: str, inputs: dict):
+        body = {"task": task, "inputs": inputs}
+        for attempt in range(self.retries + 1):
+            try:
+                return await self._hedged(body)
+            except (_Retryable, httpx.TimeoutException, httpx.TransportError) as e:
+                if attempt == self.retries:
+                    raise LLMError(f"{task} failed after {attempt + 1} attempts: {e}") from e
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                if isinstance(e, _Retryable) and e.retry_after:
+                    delay = max(delay, e.retry_after)
+                logger.warning(f"LLM {task} attempt {attempt + 1} failed ({e}); retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def stream(self, task: str, inputs: dict):
+        body = {"task": task, "inputs": inputs}
+        for attempt in range(self.retries + 1):
+            started = False
+            try:
+                async with self._semaphore:
+                    async with self._client.stream("POST", "/v1/generate/stream", json=body) as response:
+                        if response.status_code in RETRYABLE_STATUS:
+                            raise _Retryable(f"HTTP {response.status_code}", response.headers.get("retry-after"))
+                        if response.status_code >= 400:
+                            raise LLMError(f"Provider returned HTTP {response.status_code}")
+                        async for line in response.aiter_lines():
+                            if line.strip():
+                                started = True
+                                event = json.loads(line)
+                                yield event
+                                if event.get("type") == "result":
+                                    return
+                raise LLMError(f"{task} stream ended without a result")
+            except (_Retryable, httpx.TimeoutException, httpx.TransportError) as e:
+                if started or attempt == self.retries:
+                    raise LLMError(f"{task} stream failed: {e}") from e
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                logger.warning(f"LLM {task} stream attempt {attempt + 1} failed ({e}); retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+class _Retryable(Exception):
+    def __init__(self, message: str, retry_after: Optional[str] = None):
+        super().__init__(message)
+        try:
+            self.retry_after = min(float(retry_after), 30.0) if retry_after else None
+        except ValueError:
+            self.retry_after = None
+
+
+def build_provider():
+    if settings.LLM_PROVIDER == "mock":
+        return MockProvider()
+    if settings.LLM_PROVIDER == "http":
+        return HTTPProvider(
+            settings.LLM_BASE_URL, settings.LLM_API_KEY, timeout=settings.LLM_TIMEOUT_SECONDS,
+            max_concurrency=settings.LLM_MAX_CONCURRENCY, retries=settings.LLM_RETRIES,
+            hedge_after=settings.LLM_HEDGE_AFTER_SECONDS,
+        )
+    raise ValueError(f"Unknown LLM_PROVIDER '{settings.LLM_PROVIDER}'")
+
+
+class LLMGateway:
+    """Owns the provider and the event loop it runs on; started/stopped with the app."""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._provider = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> str:
+        """Identifies the model behind generations (part of generation fingerprints)."""
+        return f"{settings.LLM_PROVIDER}:{settings.LLM_MODEL}"
+
+    def start(self):
+        with self._lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=loop.run_forever, name="llm-loop", daemon=True)
+            self._thread.start()
+            self._provider = asyncio.run_coroutine_threadsafe(self._build(), loop).result()
+            self._loop = loop
+            logger.info(f"LLM provider started: {self._provider.name}")
+
+    @staticmethod
+    async def _build():
+        return build_provider()  # created on the loop so the client and semaphore bind to it
+
+    def stop(self):
+        with self._lock:
+            if self._loop is None:
+                return
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout=10)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=10)
+            self._loop.close()
+            self._loop = self._thread = self._provider = None
+
+    async def _shutdown(self):
+        """Cancel in-flight generations (their callers get CancelledError), then close the provider."""
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._provider.aclose()
+
+    def _submit(self, task: str, inputs: dict) -> Future:
+        if self._loop is None:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(self._provider.generate(task, inputs), self._loop)
+
+    async def generate(self, task: str, **inputs):
+        return await asyncio.wrap_future(self._submit(task, inputs))
+
+    def generate_sync(self, task: str, **inputs):
+        return self._submit(task, inputs).result()
+
+    async def stream(self, task: str, **inputs):
+        """Relay the provider's stream from the gateway loop to the caller's loop as events arrive."""
+        if self._loop is None:
+            self.start()
+        caller = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def pump():
+            try:
+                async for event in self._provider.stream(task, inputs):
+                    caller.call_soon_threadsafe(queue.put_nowait, ("event", event))
+            except Exception as e:
+                caller.call_soon_threadsafe(queue.put_nowait, ("error", e))
+            else:
+                caller.call_soon_threadsafe(queue.put_nowait, ("end", None))
+
+        pumping = asyncio.run_coroutine_threadsafe(pump(), self._loop)
+        try:
+            while True:
+                kind, value = await queue.get()
+                if kind == "error":
+                    raise value if isinstance(value, LLMError) else LLMError(str(value))
+                if kind == "end":
+                    return
+                yield value
+        finally:
+            pumping.cancel()  # client went away: stop the upstream request
+
+
+llm = LLMGateway()
@@ -0,0 +1,75 @@
+"""
+Note Service — section-level, memoized AI assist for clinical notes.
+
+Each SOAP section is assisted on its own (LLM task "note_section": improvement suggestions and code
+recommendations for that section's text). Results are stored in ClinicalNote.section_cache next to a
+hash of what produced them — the section text, note type, GENERATOR_VERSION, the LLM model and the
+code rule set. Re-assisting a note only sends the sections whose hash changed; the others reuse
+their cached result. The note-level output (full note, ranked codes across sections, suggestions in
+section order) is then reassembled locally, which needs no model call.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from services.ai_service import GENERATOR_VERSION, NOTE_SECTIONS, assemble_clinical_note
+from services.code_matcher import code_matcher
+from services.llm_provider import llm
+from services.packet_service import generation_cache
+
+logger = logging.getLogger("priorauth.notes")
+
+
+def section_hash(note_type: str, section: str, text: str) -> str:
+    canonical = json.dumps(
+        [GENERATOR_VERSION, llm.version, code_matcher.version, note_type, section, text], separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def load_section_cache(raw) -> dict:
+    """Stored per-section results; anything unreadable counts as not cached."""
+    try:
+        cache = json.loads(raw) if raw else {}
+    except json.JSONDecodeError:
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+async def assist_note(note, patient_name: str, force: bool = False) -> dict:
+    """
+    Refresh note.full_note, suggested_codes, ai_suggestions and section_cache in place, generating only
+    sections that changed since their cached result (all of them when force is set). Returns
+    {"generated": [...], "reused": [...]} section names.
+    """
+    cache = load_section_cache(note.section_cache)
+    sections = {name: getattr(note, name) or "" for name in NOTE_SECTIONS}
+    hashes = {name: section_hash(note.note_type, name, text) for name, text in sections.items()}
+    stale = [name for name in NOTE_SECTIONS if force or (cache.get(name) or {}).get("hash") != hashes[name]]
+
+    tasks = [
+        asyncio.create_task(llm.generate("note_section", note_type=note.note_type, section=name, text=sections[name]))
+        for name in stale
+    ]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        # One section failed (or the request went away): stop the others instead of letting them retry
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    for name, result in zip(stale, results):
+        cache[name] = {"hash": hashes[name], "suggestions": result["suggestions"], "codes": result["codes"]}
+    reused = [name for name in NOTE_SECTIONS if name not in stale]
+    generation_cache.record("note_section", "hits", len(reused))
+    if stale:
+        generation_cache.record("note_section", "forced" if force else "misses", len(stale))
+
+    output = assemble_clinical_note(note.note_type, patient_name, sections, cache)
+    note.full_note = output["full_note"]
+    note.suggested_codes = output["suggested_codes"]
+    note.ai_suggestions = output["ai_suggestions"]
+    note.section_cache = json.dumps({name: cache[name] for name in NOTE_SECTIONS})
+    logger.debug(f"Note {note.id or '(new)'} assist: generated {stale or 'nothing'}, reused {reused or 'nothing'}")
+    return {"generated": stale, "reused": reused}
@@ -0,0 +1,315 @@
+"""
+Packet Service — PA packet/appeal inputs, generation memoization, single and batch generation.
+
+Each generation's inputs (PA fields, merged document extracted_data, GENERATOR_VERSION, the LLM
+model and the payer template's content hash) are hashed into a fingerprint stored next to the
+output. A repeat request whose fingerprint matches the stored one returns the stored packet/letter
+without calling the generator, unless forced.
+
+Batch generation loads every input in set-based queries (PA + patient columns in one, all attached
+documents' extracted_data in another), sends generations through the LLM gateway from a thread
+pool, and writes results back with executemany UPDATEs committed per chunk. Per-PA failures are
+reported, not raised, so one bad request never aborts the batch.
+
+Checklist re-scoring re-evaluates every open PA's completeness checklist against the current rules
+(services/checklist.py) without regenerating packets: PAs are read in id-ordered chunks with their
+documents' extracted data, reduced to evidence masks, and only rows whose checklist or
+missing_evidence actually changed are written back (one executemany UPDATE per chunk).
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Iterable, Iterator, Optional
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from config import settings
+from models import PARequest, Patient, Document
+from services.ai_service import GENERATOR_VERSION
+from services.checklist import checklist_rules
+from services.llm_provider import llm
+from services.search_service import index_pa_request
+from services.status_service import RESOLVED_STATUSES
+from services.templates import templates
+
+logger = logging.getLogger("priorauth.packets")
+
+
+def merge_extracted_data(raw_values: Iterable[Optional[str]]) -> dict:
+    """Merge documents' extracted_data JSON in order; later documents win, unparseable ones are skipped."""
+    extracted = {}
+    for raw in raw_values:
+        if raw:
+            try:
+                extracted.update(json.loads(raw))
+            except json.JSONDecodeError:
+                pass
+    return extracted
+
+
+def packet_inputs(pa, patient_name: str, extracted: dict) -> dict:
+    """Keyword arguments for generate_pa_packet."""
+    return {
+        "patient_name": patient_name,
+        "diagnosis_code": pa.diagnosis_code,
+        "diagnosis_name": pa.diagnosis_name or "",
+        "procedure_code": pa.procedure_code,
+        "procedure_name": pa.procedure_name,
+        "payer_name": pa.payer_name,
+        "clinical_rationale": pa.clinical_rationale or "",
+        "extracted_data": extracted,
+    }
+
+
+def appeal_inputs(pa, patient_name: str) -> dict:
+    """Keyword arguments for generate_appeal_letter."""
+    return {
+        "patient_name": patient_name,
+        "reference_number": pa.reference_number,
+        "denial_reason": pa.denial_reason or "Not specified",
+        "denial_details": pa.denial_details or "",
+        "procedure_code": pa.procedure_code,
+        "procedure_name": pa.procedure_name,
+        "diagnosis_code": pa.diagnosis_code,
+        "diagnosis_name": pa.diagnosis_name or "",
+        "payer_name": pa.payer_name,
+        "clinical_rationale": pa.clinical_rationale or "",
+    }
+
+
+_TEMPLATE_TYPES = {"packet": "pa_packet", "appeal": "appeal_letter"}
+
+
+def input_fingerprint(kind: str, inputs: dict) -> str:
+    """
+    Deterministic SHA-256 over the generator inputs, generator/model versions, the payer's template
+    version and, for packets, the checklist rule set version (packets carry the scored checklist).
+    """
+    template_version = templates.version(_TEMPLATE_TYPES[kind], inputs.get("payer_name"))
+    checklist_version = (
+        checklist_rules.ruleset(inputs.get("payer_name"), inputs.get("procedure_code")).version if kind == "packet" else None
+    )
+    canonical = json.dumps(
+        [kind, GENERATOR_VERSION, llm.version, template_version, checklist_version, inputs],
+        sort_keys=True, separators=(",", ":"), default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def packet_updates(status: str, result: dict, fingerprint: Optional[str] = None) -> dict:
+    """Column values written after a packet is generated; drafts move to pending_review."""
+    values = {
+        "generated_packet": result["packet"],
+        "completeness_checklist": result["checklist"],
+        "missing_evidence": result["missing_evidence"],
+        "packet_fingerprint": fingerprint,
+    }
+    if status == "draft":
+        values["status"] = "pending_review"
+    return values
+
+
+class GenerationCacheStats:
+    """Process-local hit/miss counters for fingerprint-memoized generation."""
+
+    KINDS = ("packet", "appeal", "note_section")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {kind: {"hits": 0, "misses": 0, "forced": 0} for kind in self.KINDS}
+
+    def record(self, kind: str, outcome: str, n: int = 1):
+        with self._lock:
+            self._counts[kind][outcome] += n
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = {}
+            for kind, counts in self._counts.items():
+                lookups = counts["hits"] + counts["misses"]
+                out[kind] = {**counts, "hit_rate": round(counts["hits"] / lookups, 4) if lookups else None}
+            return out
+
+
+generation_cache = GenerationCacheStats()
+
+
+# ── Batch generation ─────────────────────────────────────
+def load_batch_inputs(db: Session, pa_ids: list) -> dict:
+    """{pa_id: row namespace} with patient_name and merged extracted data, in two queries."""
+    rows = db.query(
+        PARequest.id, PARequest.reference_number, PARequest.status, PARequest.diagnosis_code,
+        PARequest.diagnosis_name, PARequest.procedure_code, PARequest.procedure_name, PARequest.payer_name,
+        PARequest.clinical_rationale, PARequest.appeal_letter, PARequest.packet_fingerprint,
+        PARequest.generated_packet.isnot(None).label("has_packet"), Patient.first_name, Patient.last_name,
+    ).outerjoin(Patient, Patient.id == PARequest.patient_id).filter(PARequest.id.in_(pa_ids)).all()
+
+    raw_by_pa = {}
+    for pa_id, raw in db.query(Document.pa_request_id, Document.extracted_data).filter(
+        Document.pa_request_id.in_(pa_ids), Document.extracted_data.isnot(None)
+    ).order_by(Document.id):
+        raw_by_pa.setdefault(pa_id, []).append(raw)
+
+    inputs = {}
+    for row in rows:
+        item = SimpleNamespace(**row._asdict())
+        item.patient_name = f"{row.first_name} {row.last_name}" if row.first_name is not None else ""
+        item.extracted = merge_extracted_data(raw_by_pa.get(row.id, ()))
+        item.fingerprint = input_fingerprint("packet", packet_inputs(item, item.patient_name or "Unknown", item.extracted))
+        inputs[row.id] = item
+    return inputs
+
+
+def _generate(item) -> dict:
+    return llm.generate_sync("pa_packet", **packet_inputs(item, item.patient_name or "Unknown", item.extracted))
+
+
+def _write_chunk(db: Session, chunk: list):
+    """One executemany UPDATE plus search index refresh for a chunk of (item, values); one commit."""
+    now = datetime.now(timezone.utc)
+    db.execute(update(PARequest), [{"id": item.id, "updated_at": now, **values} for item, values in chunk])
+    for item, values in chunk:
+        vars(item).update(values)
+        index_pa_request(db, item, item.patient_name)
+    db.commit()
+
+
+def generate_packets_batch(
+    db: Session, pa_ids: list, force: bool = False, workers: Optional[int] = None, chunk_size: Optional[int] = None,
+) -> Iterator[dict]:
+    """
+    Generate packets for pa_ids, yielding NDJSON-ready progress events as results are committed.
+    PAs whose stored packet fingerprint still matches are reported as "cached" unless force is set.
+    """
+    workers = workers or settings.PACKET_BATCH_WORKERS
+    chunk_size = chunk_size or settings.PACKET_BATCH_CHUNK_SIZE
+    inputs = load_batch_inputs(db, pa_ids)
+    counts = {"total": len(pa_ids), "generated": 0, "cached": 0, "failed": 0}
+    yield {"event": "started", "total": counts["total"]}
+    for pa_id in pa_ids:
+        if pa_id not in inputs:
+            counts["failed"] += 1
+            yield {"event": "failed", "pa_id": pa_id, "error": "PA Request not found"}
+
+    todo = []
+    for item in inputs.values():
+        if not force and item.has_packet and item.packet_fingerprint == item.fingerprint:
+            generation_cache.record("packet", "hits")
+            counts["cached"] += 1
+            yield {"event": "cached", "pa_id": item.id, "reference_number": item.reference_number, "status": item.status}
+        else:
+            generation_cache.record("packet", "forced" if force else "misses")
+            todo.append(item)
+
+    pending: list = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="packets") as pool:
+        futures = {pool.submit(_generate, item): item for item in todo}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                pending.append((item, packet_updates(item.status, future.result(), item.fingerprint)))
+            except Exception as e:
+                logger.error(f"Packet generation failed for PA {item.id}: {e}")
+                counts["failed"] += 1
+                yield {"event": "failed", "pa_id": item.id, "reference_number": item.reference_number, "error": str(e)}
+                continue
+            if len(pending) >= chunk_size:
+                yield from _flush(db, pending, counts)
+                pending = []
+    if pending:
+        yield from _flush(db, pending, counts)
+    yield {"event": "done", **counts}
+
+
+def _flush(db: Session, chunk: list, counts: dict) -> Iterator[dict]:
+    """Commit one chunk and report it; a failed write fails only that chunk's PAs."""
+    try:
+        _write_chunk(db, chunk)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Packet batch write failed: {e}")
+        counts["failed"] += len(chunk)
+        for item, _ in chunk:
+            yield {"event": "failed", "pa_id": item.id, "reference_number": item.reference_number, "error": str(e)}
+    else:
+        counts["generated"] += len(chunk)
+        for item, _ in chunk:
+            yield {"event": "generated", "pa_id": item.id, "reference_number": item.reference_number, "status": item.status}
+    yield {"event": "progress", "done": counts["generated"] + counts["cached"] + counts["failed"], "total": counts["total"]}
+
+
+# ── Checklist re-scoring ─────────────────────────────────
+RESCORE_SAMPLE_IDS = 500
+
+
+def checklist_fields(row, extracted: dict) -> dict:
+    """Evidence fields the checklist rules see; PA columns win over same-named extracted keys."""
+    return {
+        **extracted,
+        "diagnosis_code": row.diagnosis_code,
+        "procedure_code": row.procedure_code,
+        "clinical_rationale": row.clinical_rationale,
+    }
+
+
+def rescore_checklists(db: Session, dry_run: bool = False, chunk_size: Optional[int] = None) -> dict:
+    """
+    Re-score the checklist of every open (unresolved) PA that already has one (PAs never generated
+    are left alone) against the current checklist rules. Returns counts, the
+    number of distinct (rule set, evidence) evaluations, and up to RESCORE_SAMPLE_IDS changed PA ids.
+    """
+    chunk_size = chunk_size or settings.CHECKLIST_RESCORE_CHUNK_SIZE
+    started = time.perf_counter()
+    rulesets: dict = {}
+    patterns: set = set()
+    counts = {"scanned": 0, "changed": 0}
+    changed_ids: list = []
+    last_id = 0
+    while True:
+        rows = db.query(
+            PARequest.id, PARequest.payer_name, PARequest.procedure_code, PARequest.diagnosis_code,
+            PARequest.clinical_rationale, PARequest.completeness_checklist, PARequest.missing_evidence,
+        ).filter(
+            PARequest.status.notin_(RESOLVED_STATUSES), PARequest.completeness_checklist.isnot(None),
+            PARequest.id > last_id,
+        ).order_by(PARequest.id).limit(chunk_size).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        raw_by_pa = {}
+        for pa_id, raw in db.query(Document.pa_request_id, Document.extracted_data).filter(
+            Document.pa_request_id.in_([row.id for row in rows]), Document.extracted_data.isnot(None)
+        ).order_by(Document.id):
+            raw_by_pa.setdefault(pa_id, []).append(raw)
+
+        now = datetime.now(timezone.utc)
+        updates = []
+        for row in rows:
+            key = (row.payer_name, row.procedure_code)
+            ruleset = rulesets.get(key)
+            if ruleset is None:
+                ruleset = rulesets[key] = checklist_rules.ruleset(*key)
+            mask = checklist_rules.mask(checklist_fields(row, merge_extracted_data(raw_by_pa.get(row.id, ()))))
+            patterns.add((ruleset.version, mask))
+            checklist, missing = ruleset.evaluate(mask)
+            if checklist != row.completeness_checklist or missing != row.missing_evidence:
+                updates.append({"id": row.id, "completeness_checklist": checklist, "missing_evidence": missing, "updated_at": now})
+        counts["scanned"] += len(rows)
+        counts["changed"] += len(updates)
+        changed_ids.extend(u["id"] for u in updates[:RESCORE_SAMPLE_IDS - len(changed_ids)])
+        if updates and not dry_run:
+            db.execute(update(PARequest), updates)
+            db.commit()
+
+    return {
+        **counts,
+        "dry_run": dry_run,
+        "evaluations": len(patterns),
+        "changed_ids": changed_ids,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
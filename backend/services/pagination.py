@@ -0,0 +1,51 @@
+"""
+Pagination — opaque keyset cursors over (created_at, id).
+
+A cursor encodes the sort key of the last row on a page; the next page is everything strictly
+after it in the list's order. With a composite index on the filter columns plus (created_at, id)
+each page is an index range scan, so page cost stays flat however deep the client reads —
+unlike OFFSET, which walks and discards every earlier row.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def keyset_page(query, model, cursor: Optional[str], limit: int, descending: bool = True) -> tuple[list, Optional[str]]:
+    """
+    Apply keyset pagination on (model.created_at, model.id) and run the query.
+    Returns the page of rows and the cursor for the next page (None on the last page).
+    """
+    key = tuple_(model.created_at, model.id)
+    if cursor:
+        after = tuple_(*decode_cursor(cursor))
+        query = query.filter(key < after if descending else key > after)
+    if descending:
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+    else:
+        query = query.order_by(model.created_at.asc(), model.id.asc())
+    rows = query.limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1].created_at, rows[-1].id)
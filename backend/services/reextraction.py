@@ -0,0 +1,266 @@
+"""
+Re-extraction — bring old documents up to the current extractor versions in the background.
+
+Each completed document records the text extractor (pdfplumber version) and structured extractor
+(CLINICAL_FIELDS fingerprint) that produced it. A re-extraction job walks outdated documents in id
+order, in throttled batches:
+
+• only the structured step is outdated → re-run extract_structured_data on the stored raw text
+  (no PDF parsing), once per content hash;
+• the text extractor is outdated → mark the document pending again so the extraction queue redoes
+  it (identical files are still extracted once).
+
+The job row stores a cursor (last_document_id) after every batch, so a job interrupted by a restart
+resumes where it stopped. A process only runs the job while it holds the row's claim (claimed_by,
+renewed in claimed_at every batch); when several API processes start, one claims it and the others
+leave it alone unless the claim goes unrenewed for REEXTRACTION_LEASE_SECONDS. A job created for
+other extractor versions than the running code's (an upgrade happened meanwhile) is never continued,
+since it would label rows with versions that did not produce them: it is cancelled and replaced by a
+job for the current versions.
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import update, or_
+from config import settings
+from database import SessionLocal
+from models import Document, ExtractionStatus, ReextractionJob
+from services.document_service import extract_structured_data, text_extractor_version, structured_extractor_version
+from services.extraction_queue import extraction_queue
+from services.text_store import load_text, text_key
+
+logger = logging.getLogger("priorauth.reextraction")
+
+
+def _outdated_filter(text_version: str, data_version: str):
+    return (
+        Document.extraction_status == ExtractionStatus.COMPLETED.value,
+        or_(
+            Document.text_extractor_version.is_(None),
+            Document.text_extractor_version != text_version,
+            Document.data_extractor_version.is_(None),
+            Document.data_extractor_version != data_version,
+        ),
+    )
+
+
+def _stale(job: ReextractionJob) -> bool:
+    """The job was created for other extractor versions than the ones this process runs."""
+    return (job.text_extractor_version, job.data_extractor_version) != (
+        text_extractor_version(), structured_extractor_version()
+    )
+
+
+class ReextractionRunner:
+    def __init__(self, lease_seconds: float, session_factory=SessionLocal):
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._session_factory = session_factory
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start_job(self, user_id: Optional[int] = None) -> int:
+        """Create a job for everything outdated right now (or return the one already running)."""
+        db = self._session_factory()
+        try:
+            active = db.query(ReextractionJob).filter(ReextractionJob.status == "running").first()
+            if active and _stale(active) and self._claim(db, active.id):
+                job_id = self._replace(db, db.get(ReextractionJob, active.id))
+            elif active:
+                job_id = active.id
+            else:
+                job_id = self._create(db, user_id)
+        finally:
+            db.close()
+        self._launch(job_id)
+        return job_id
+
+    def resume(self):
+        """Called at startup: continue a running job unless another process holds its claim."""
+        db = self._session_factory()
+        try:
+            active = db.query(ReextractionJob.id).filter(ReextractionJob.status == "running").first()
+        finally:
+            db.close()
+        if active:
+            logger.info(f"Resuming re-extraction job {active.id}")
+            self._launch(active.id)
+
+    def cancel(self, job_id: int) -> bool:
+        db = self._session_factory()
+        try:
+            cancelled = db.execute(
+                update(ReextractionJob)
+                .where(ReextractionJob.id == job_id, ReextractionJob.status == "running")
+                .values(status="cancelled", finished_at=datetime.now(timezone.utc))
+            ).rowcount
+            db.commit()
+            return bool(cancelled)
+        finally:
+            db.close()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+        db = self._session_factory()
+        try:  # hand the job back so the next process to start resumes it without waiting for the lease
+            db.execute(
+                update(ReextractionJob).where(ReextractionJob.claimed_by == self.worker_id)
+                .values(claimed_by=None, claimed_at=None)
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    # ── Internals ────────────────────────────────────────
+    def _create(self, db, user_id: Optional[int]) -> int:
+        text_version, data_version = text_extractor_version(), structured_extractor_version()
+        job = ReextractionJob(
+            text_extractor_version=text_version,
+            data_extractor_version=data_version,
+            total=db.query(Document.id).filter(*_outdated_filter(text_version, data_version)).count(),
+            started_by=user_id,
+            claimed_by=self.worker_id,
+            claimed_at=datetime.now(timezone.utc),
+        )
+        db.add(job)
+        db.commit()
+        return job.id
+
+    def _replace(self, db, job: ReextractionJob) -> int:
+        """Cancel a claimed job made for older extractor versions and start one for the current versions."""
+        job.status = "cancelled"
+        job.finished_at = datetime.now(timezone.utc)
+        job.claimed_by = job.claimed_at = None
+        job.error = "Extractor versions changed; continued by a new job"
+        new_id = self._create(db, job.started_by)
+        logger.info(f"Re-extraction job {job.id} was for older extractor versions; replaced by job {new_id}")
+        return new_id
+
+    def _claim(self, db, job_id: int) -> bool:
+        """Atomically take (or renew) the claim on a running job; False while another process holds it."""
+        now = datetime.now(timezone.utc)
+        claimed = db.execute(
+            update(ReextractionJob)
+            .where(
+                ReextractionJob.id == job_id,
+                ReextractionJob.status == "running",
+                or_(
+                    ReextractionJob.claimed_by.is_(None),
+                    ReextractionJob.claimed_by == self.worker_id,
+                    ReextractionJob.claimed_at < now - timedelta(seconds=self.lease_seconds),
+                ),
+            )
+            .values(claimed_by=self.worker_id, claimed_at=now)
+        ).rowcount
+        db.commit()
+        return bool(claimed)
+
+    def _launch(self, job_id: int):
+        with self._lock:
+            if self.running:
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, args=(job_id,), name="reextraction", daemon=True)
+            self._thread.start()
+
+    def _run(self, job_id: int):
+        while not self._stopping.is_set():
+            db = self._session_factory()
+            try:
+                if not self._claim(db, job_id):
+                    logger.info(f"Re-extraction job {job_id} is not running or is claimed by another process")
+                    return
+                job = db.get(ReextractionJob, job_id)
+                if _stale(job):
+                    job_id = self._replace(db, job)
+                    continue
+                if not self._run_batch(db, job):
+                    job.status = "completed"
+                    job.finished_at = datetime.now(timezone.utc)
+                    job.claimed_by = job.claimed_at = None
+                    db.commit()
+                    logger.info(f"Re-extraction job {job_id} completed: {job.processed} documents")
+                    return
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Re-extraction job {job_id} failed: {e}")
+                db.execute(
+                    update(ReextractionJob).where(ReextractionJob.id == job_id)
+                    .values(status="failed", error=str(e)[:1000], finished_at=datetime.now(timezone.utc),
+                            claimed_by=None, claimed_at=None)
+                )
+                db.commit()
+                return
+            finally:
+                db.close()
+            self._stopping.wait(settings.REEXTRACTION_PAUSE_SECONDS)
+
+    def _run_batch(self, db, job: ReextractionJob) -> bool:
+        """Process one batch past the job's cursor; False when nothing outdated is left."""
+        docs = db.query(
+            Document.id, Document.content_hash, Document.text_extractor_version
+        ).filter(
+            Document.id > job.last_document_id,
+            *_outdated_filter(job.text_extractor_version, job.data_extractor_version),
+        ).order_by(Document.id).limit(settings.REEXTRACTION_BATCH_SIZE).all()
+        if not docs:
+            return False
+
+        requeue_ids, restructure = [], {}
+        for doc in docs:
+            if doc.text_extractor_version == job.text_extractor_version:
+                restructure.setdefault(text_key(doc.content_hash, doc.id), []).append(doc.id)
+            else:
+                requeue_ids.append(doc.id)
+
+        for key, doc_ids in restructure.items():
+            text = load_text(db, key)
+            if text is None:
+                requeue_ids.extend(doc_ids)  # raw text was never stored; extract from the PDF again
+                continue
+            data = extract_structured_data(text)
+            db.execute(
+                update(Document).where(Document.id.in_(doc_ids)).values(
+                    extracted_data=json.dumps(data) if data else None,
+                    data_extractor_version=job.data_extractor_version,
+                )
+            )
+            job.restructured += len(doc_ids)
+
+        if requeue_ids:
+            db.execute(
+                update(Document).where(Document.id.in_(requeue_ids))
+                .values(extraction_status=ExtractionStatus.PENDING.value)
+            )
+            job.requeued += len(requeue_ids)
+
+        job.processed += len(docs)
+        job.last_document_id = docs[-1].id
+        db.commit()
+        if requeue_ids:
+            extraction_queue.notify()
+            # Don't outrun the extraction queue: wait while it still has a full backlog
+            while not self._stopping.is_set() and db.query(Document.id).filter(
+                Document.extraction_status.in_([ExtractionStatus.PENDING.value, ExtractionStatus.PROCESSING.value])
+            ).limit(extraction_queue.depth * 2).count() >= extraction_queue.depth * 2:
+                if not self._claim(db, job.id):  # keep the claim alive while waiting
+                    break
+                time.sleep(settings.REEXTRACTION_PAUSE_SECONDS)
+        return True
+
+
+reextraction_runner = ReextractionRunner(lease_seconds=settings.REEXTRACTION_LEASE_SECONDS)
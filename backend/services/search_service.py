@@ -0,0 +1,198 @@
+"""
+Search Service — full-text index over document text, clinical notes and PA packets/appeals.
+
+SQLite uses an FTS5 virtual table (porter-stemmed, BM25-ranked); PostgreSQL uses an equivalent
+table with a stored, weighted tsvector column and a GIN index. Entries are keyed by a rowid derived
+from (kind, id), so updates are a primary-key delete + insert in the caller's transaction and the
+index is maintained incrementally as documents finish extraction and notes/packets are saved.
+"""
+import re
+import logging
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from models import Document, ClinicalNote, PARequest, Patient, ExtractionStatus
+from services.text_store import load_text, text_key
+
+logger = logging.getLogger("priorauth.search")
+
+KIND_CODES = {"document": 1, "note": 2, "pa_request": 3}
+_KIND_SLOTS = 4
+SNIPPET_MARK = "**"
+SNIPPET_TOKENS = 16
+
+
+def _rowid(kind: str, ref_id: int) -> int:
+    return ref_id * _KIND_SLOTS + KIND_CODES[kind]
+
+
+def _dialect(bind) -> str:
+    return bind.dialect.name
+
+
+def ensure_search_index(engine):
+    """Create the search index table if it doesn't exist (create_all can't express either variant)."""
+    with engine.begin() as conn:
+        if _dialect(engine) == "postgresql":
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS search_index (
+                    rowid BIGINT PRIMARY KEY,
+                    kind VARCHAR(20) NOT NULL,
+                    ref_id INTEGER NOT NULL,
+                    title TEXT,
+                    body TEXT,
+                    tsv TSVECTOR GENERATED ALWAYS AS (
+                        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                        setweight(to_tsvector('english', coalesce(body, '')), 'B')
+                    ) STORED
+                )
+            """))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_search_index_tsv ON search_index USING GIN (tsv)"))
+        else:
+            conn.execute(text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+                "kind UNINDEXED, ref_id UNINDEXED, title, body, tokenize='porter unicode61')"
+            ))
+
+
+def index_entry(db: Session, kind: str, ref_id: int, title: str, body: str):
+    """Insert or replace one entry; committed with the caller's transaction."""
+    rowid = _rowid(kind, ref_id)
+    db.execute(text("DELETE FROM search_index WHERE rowid = :rowid"), {"rowid": rowid})
+    db.execute(
+        text("INSERT INTO search_index (rowid, kind, ref_id, title, body) VALUES (:rowid, :kind, :ref_id, :title, :body)"),
+        {"rowid": rowid, "kind": kind, "ref_id": ref_id, "title": title or "", "body": body or ""},
+    )
+
+
+def index_entries(db: Session, kind: str, entries: list):
+    """index_entry for many [(ref_id, title, body)] at once: one executemany DELETE and one INSERT."""
+    if not entries:
+        return
+    rows = [{"rowid": _rowid(kind, ref_id), "kind": kind, "ref_id": ref_id, "title": title or "", "body": body or ""}
+            for ref_id, title, body in entries]
+    db.execute(text("DELETE FROM search_index WHERE rowid = :rowid"), [{"rowid": row["rowid"]} for row in rows])
+    db.execute(text("INSERT INTO search_index (rowid, kind, ref_id, title, body) VALUES (:rowid, :kind, :ref_id, :title, :body)"), rows)
+
+
+def remove_entry(db: Session, kind: str, ref_id: int):
+    db.execute(text("DELETE FROM search_index WHERE rowid = :rowid"), {"rowid": _rowid(kind, ref_id)})
+
+
+# ── Per-entity indexing ──────────────────────────────────
+def index_document(db: Session, doc, extracted_text: str):
+    index_entry(db, "document", doc.id, doc.original_filename, extracted_text)
+
+
+def index_documents(db: Session, docs: list):
+    """Index completed documents, decompressing each distinct content hash's text once."""
+    texts = {}
+    for doc in docs:
+        if doc.extraction_status != ExtractionStatus.COMPLETED.value:
+            continue
+        key = text_key(doc.content_hash, doc.id)
+        if key not in texts:
+            texts[key] = load_text(db, key) or ""
+        index_document(db, doc, texts[key])
+
+
+def note_entry(note, patient_name: str = "") -> tuple:
+    """(title, body) a clinical note is indexed under."""
+    body = note.full_note or "\n".join(filter(None, [note.subjective, note.objective, note.assessment, note.plan]))
+    return f"{note.note_type} note — {patient_name}".strip(" —"), body
+
+
+def index_note(db: Session, note, patient_name: str = ""):
+    index_entry(db, "note", note.id, *note_entry(note, patient_name))
+
+
+def index_pa_request(db: Session, pa, patient_name: str = ""):
+    title = " ".join(filter(None, [pa.reference_number, patient_name, pa.procedure_name, pa.diagnosis_name]))
+    body = "\n\n".join(filter(None, [pa.clinical_rationale, pa.generated_packet, pa.appeal_letter]))
+    index_entry(db, "pa_request", pa.id, title, body)
+
+
+def rebuild_search_index(db: Session, batch_size: int = 500) -> dict:
+    """Re-index every completed document, note and PA request in id order, committing per batch."""
+    counts = {}
+    sources = [
+        ("document", db.query(Document).filter(Document.extraction_status == ExtractionStatus.COMPLETED.value)),
+        ("note", db.query(ClinicalNote, Patient).outerjoin(Patient, Patient.id == ClinicalNote.patient_id)),
+        ("pa_request", db.query(PARequest, Patient).outerjoin(Patient, Patient.id == PARequest.patient_id)),
+    ]
+    for kind, query in sources:
+        entity = query.column_descriptions[0]["entity"]
+        counts[kind] = 0
+        last_id = 0
+        while True:
+            batch = query.filter(entity.id > last_id).order_by(entity.id).limit(batch_size).all()
+            if not batch:
+                break
+            if kind == "document":
+                index_documents(db, batch)
+                last_id = batch[-1].id
+            else:
+                for obj, patient in batch:
+                    name = f"{patient.first_name} {patient.last_name}" if patient else ""
+                    (index_note if kind == "note" else index_pa_request)(db, obj, name)
+                last_id = batch[-1][0].id
+            db.commit()
+            counts[kind] += len(batch)
+    logger.info(f"Search index rebuilt: {counts}")
+    return counts
+
+
+# ── Query ────────────────────────────────────────────────
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _fts5_query(q: str) -> Optional[str]:
+    """All terms must match; the last term is a prefix so results follow the user's typing."""
+    tokens = _TOKEN_RE.findall(q.lower())
+    if not tokens:
+        return None
+    terms = [f'"{t}"' for t in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def search(db: Session, q: str, kind: Optional[str] = None, limit: int = 20, offset: int = 0) -> tuple[list, bool]:
+    """Ranked hits as dicts (kind, id, title, snippet, score) plus whether another page exists."""
+    if kind and kind not in KIND_CODES:
+        raise ValueError(f"kind must be one of: {', '.join(KIND_CODES)}")
+    params = {"limit": limit + 1, "offset": offset, "kind": kind}
+    kind_filter = "AND kind = :kind" if kind else ""
+    if _dialect(db.bind) == "postgresql":
+        if not _TOKEN_RE.search(q):
+            return [], False
+        params["q"] = q
+        rows = db.execute(text(f"""
+            SELECT kind, ref_id, title,
+                   ts_headline('english', body, query,
+                               'StartSel={SNIPPET_MARK}, StopSel={SNIPPET_MARK}, MaxWords={SNIPPET_TOKENS}, MinWords=6') AS snippet,
+                   ts_rank_cd(tsv, query) AS score
+            FROM search_index, websearch_to_tsquery('english', :q) AS query
+            WHERE tsv @@ query {kind_filter}
+            ORDER BY score DESC
+            LIMIT :limit OFFSET :offset
+        """), params).all()
+    else:
+        match = _fts5_query(q)
+        if not match:
+            return [], False
+        params["q"] = match
+        # bm25 is lower-is-better; title matches weigh 5x body matches
+        rows = db.execute(text(f"""
+            SELECT kind, ref_id, title,
+                   snippet(search_index, 3, '{SNIPPET_MARK}', '{SNIPPET_MARK}', '…', {SNIPPET_TOKENS}) AS snippet,
+                   -bm25(search_index, 0.0, 0.0, 5.0, 1.0) AS score
+            FROM search_index
+            WHERE search_index MATCH :q {kind_filter}
+            ORDER BY bm25(search_index, 0.0, 0.0, 5.0, 1.0)
+            LIMIT :limit OFFSET :offset
+        """), params).all()
+    hits = [
+        {"kind": r.kind, "id": int(r.ref_id), "title": r.title, "snippet": r.snippet, "score": round(float(r.score), 4)}
+        for r in rows[:limit]
+    ]
+    return hits, len(rows) > limit
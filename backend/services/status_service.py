@@ -0,0 +1,92 @@
+"""
+Status Service — PA status transitions, shared by the single PATCH and bulk payer decisions.
+
+A transition stamps submitted_at/resolved_at, computes turnaround_days from submission, and records
+a DenialRecord when a request is denied with a reason. Bulk transitions load every target in one
+SELECT, write all PA changes with one executemany UPDATE and all denial records with one executemany
+INSERT, and commit once.
+"""
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+from models import PARequest, DenialRecord
+
+RESOLVED_STATUSES = ("approved", "denied", "appeal_approved", "appeal_denied")
+
+
+def as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """SQLite hands back naive datetimes; treat them as the UTC they were stored as."""
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+def transition_values(new_status: str, submitted_at: Optional[datetime], now: datetime) -> dict:
+    """Timestamp/turnaround columns that accompany a move to new_status."""
+    values = {}
+    if new_status == "submitted":
+        values["submitted_at"] = now
+    if new_status in RESOLVED_STATUSES:
+        values["resolved_at"] = now
+        if submitted_at:
+            delta = now - as_utc(submitted_at)
+            values["turnaround_days"] = round(delta.total_seconds() / 86400, 1)
+    return values
+
+
+def denial_record(pa, denial_reason: str, turnaround_days: Optional[float]) -> dict:
+    return {
+        "pa_request_id": pa.id,
+        "denial_reason": denial_reason,
+        "denial_category": denial_reason,
+        "payer_name": pa.payer_name,
+        "procedure_code": pa.procedure_code,
+        "turnaround_days": turnaround_days,
+        "month": datetime.now().strftime("%Y-%m"),
+    }
+
+
+def apply_bulk_transitions(db: Session, items: list) -> list:
+    """
+    Apply [{pa_id, status, denial_reason?, denial_details?}] in one transaction.
+    Returns one result dict per item, in input order; unknown or repeated PA ids fail individually.
+    """
+    ids = [item["pa_id"] for item in items]
+    targets = {
+        row.id: row for row in db.query(
+            PARequest.id, PARequest.status, PARequest.submitted_at, PARequest.payer_name, PARequest.procedure_code,
+        ).filter(PARequest.id.in_(ids))
+    }
+    now = datetime.now(timezone.utc)
+    updates, denials, results, seen = [], [], [], set()
+    for item in items:
+        pa_id = item["pa_id"]
+        pa = targets.get(pa_id)
+        if pa is None:
+            results.append({"pa_id": pa_id, "ok": False, "error": "PA Request not found"})
+            continue
+        if pa_id in seen:
+            results.append({"pa_id": pa_id, "ok": False, "error": "Duplicate pa_id in batch"})
+            continue
+        seen.add(pa_id)
+
+        values = {"id": pa_id, "status": item["status"], "updated_at": now}
+        for key in ("denial_reason", "denial_details"):
+            if item.get(key) is not None:
+                values[key] = item[key]
+        values.update(transition_values(item["status"], pa.submitted_at, now))
+        updates.append(values)
+        if item["status"] == "denied" and item.get("denial_reason"):
+            denials.append(denial_record(pa, item["denial_reason"], values.get("turnaround_days")))
+        results.append({
+            "pa_id": pa_id, "ok": True, "previous_status": pa.status, "status": item["status"],
+            "turnaround_days": values.get("turnaround_days"),
+        })
+
+    if updates:
+        db.execute(update(PARequest), updates)
+    if denials:
+        db.execute(insert(DenialRecord), denials)
+    db.commit()
+    return results
@@ -0,0 +1,191 @@
+"""
+Templates — compiled, payer-specific text templates for packets, appeal letters and notes.
+
+Templates live in templates/<doc_type>/<payer>.txt (payer name lowercased, non-alphanumerics as
+"_"), falling back to templates/<doc_type>/default.txt. The syntax is deliberately small:
+
+    {{name}}                  value from the render context
+    {{name|fallback text}}    fallback when the value is empty
+    {{#name}}...{{/name}}     section rendered only when the value is truthy
+    {{^name}}...{{/name}}     section rendered only when the value is falsy
+
+Each template is compiled once into a Python function that joins literal chunks and context values
+in a single str.join, and cached per (doc_type, payer). Files are re-checked by mtime at most every
+TEMPLATE_RELOAD_SECONDS, so edits and new payer files take effect without a restart; a template
+that fails to compile keeps serving its previous version.
+"""
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from typing import Callable, Optional
+from config import settings
+
+logger = logging.getLogger("priorauth.templates")
+
+DEFAULT_TEMPLATE = "default"
+_TAG_RE = re.compile(r"\{\{\s*([#^/]?)\s*([A-Za-z_][A-Za-z0-9_]*)\s*(?:\|(.*?))?\}\}", re.DOTALL)
+
+
+class TemplateError(Exception):
+    pass
+
+
+def payer_slug(payer_name: Optional[str]) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", (payer_name or "").lower()).strip("_") or DEFAULT_TEMPLATE
+
+
+@lru_cache(maxsize=4)
+def _date_label(day: date) -> str:
+    return day.strftime("%B %d, %Y")
+
+
+def today_label() -> str:
+    """Render date ("January 05, 2026"), formatted once per day rather than once per render."""
+    return _date_label(date.today())
+
+
+def _text(value) -> str:
+    return "" if value is None else value if isinstance(value, str) else str(value)
+
+
+# ── Compilation ──────────────────────────────────────────
+def _parse(source: str, name: str) -> list:
+    """Tokens -> nested node list: str | ("var", key, fallback) | ("section", key, inverted, children)."""
+    root: list = []
+    stack = [(None, root)]
+    pos = 0
+    for m in _TAG_RE.finditer(source):
+        if m.start() > pos:
+            stack[-1][1].append(source[pos:m.start()])
+        sigil, key, fallback = m.groups()
+        if sigil in ("#", "^"):
+            children: list = []
+            stack[-1][1].append(("section", key, sigil == "^", children))
+            stack.append((key, children))
+        elif sigil == "/":
+            if stack[-1][0] != key:
+                raise TemplateError(f"{name}: unexpected {{{{/{key}}}}}")
+            stack.pop()
+        else:
+            stack[-1][1].append(("var", key, fallback))
+        pos = m.end()
+    if len(stack) > 1:
+        raise TemplateError(f"{name}: unclosed section '{stack[-1][0]}'")
+    if pos < len(source):
+        root.append(source[pos:])
+    return root
+
+
+def _expr(nodes: list, consts: list) -> str:
+    parts = []
+    for node in nodes:
+        if isinstance(node, str):
+            consts.append(node)
+            parts.append(f"_c[{len(consts) - 1}]")
+        elif node[0] == "var":
+            _, key, fallback = node
+            value = f"_t(ctx[{key!r}])"
+            if fallback is not None:
+                consts.append(fallback)
+                value = f"({value} or _c[{len(consts) - 1}])"
+            parts.append(value)
+        else:
+            _, key, inverted, children = node
+            cond = f"not ctx[{key!r}]" if inverted else f"ctx[{key!r}]"
+            parts.append(f"({_expr(children, consts)} if {cond} else '')")
+    if not parts:
+        return "''"
+    return parts[0] if len(parts) == 1 else f"''.join(({', '.join(parts)},))"
+
+
+def compile_template(source: str, name: str = "<template>") -> Callable[[dict], str]:
+    """Compile template source into render(ctx) -> str."""
+    consts: list = []
+    code = f"def render(ctx):\n    return {_expr(_parse(source, name), consts)}\n"
+    namespace = {"_c": tuple(consts), "_t": _text}
+    exec(compile(code, f"<template {name}>", "exec"), namespace)
+    return namespace["render"]
+
+
+@dataclass
+class CompiledTemplate:
+    path: str
+    mtime: float
+    version: str  # short content hash; part of generation fingerprints
+    _render: Callable[[dict], str]
+    checked_at: float = 0.0
+
+    def render(self, context: dict) -> str:
+        try:
+            return self._render(context)
+        except KeyError as e:
+            raise TemplateError(f"{self.path}: missing context value {e}") from None
+
+
+# ── Registry ─────────────────────────────────────────────
+class TemplateRegistry:
+    def __init__(self, root: str, reload_seconds: float = 2.0):
+        self.root = root
+        self.reload_seconds = reload_seconds
+        self._cache: dict = {}
+        self._lock = threading.Lock()
+
+    def _resolve(self, doc_type: str, payer: Optional[str]) -> str:
+        for name in (payer_slug(payer), DEFAULT_TEMPLATE):
+            path = os.path.join(self.root, doc_type, f"{name}.txt")
+            if os.path.isfile(path):
+                return path
+        raise TemplateError(f"No template for '{doc_type}' in {self.root}")
+
+    def _load(self, path: str) -> CompiledTemplate:
+        mtime = os.path.getmtime(path)
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+        return CompiledTemplate(
+            path=path, mtime=mtime, version=hashlib.sha256(source.encode("utf-8")).hexdigest()[:12],
+            _render=compile_template(source, os.path.relpath(path, self.root)), checked_at=time.monotonic(),
+        )
+
+    def get(self, doc_type: str, payer: Optional[str] = None) -> CompiledTemplate:
+        key = (doc_type, payer_slug(payer))
+        template = self._cache.get(key)
+        now = time.monotonic()
+        if template is not None and now - template.checked_at < self.reload_seconds:
+            return template
+        with self._lock:
+            template = self._cache.get(key)
+            if template is not None and now - template.checked_at < self.reload_seconds:
+                return template
+            path = self._resolve(doc_type, payer)
+            if template is None or template.path != path or os.path.getmtime(path) != template.mtime:
+                try:
+                    fresh = self._load(path)
+                except (OSError, TemplateError, SyntaxError) as e:
+                    if template is None:
+                        raise
+                    logger.error(f"Keeping previous template for {key}: {e}")
+                    if template.path == path:
+                        template.mtime = os.path.getmtime(path)  # don't retry until the file changes again
+                    fresh = template
+                else:
+                    if template is not None:
+                        logger.info(f"Reloaded template {fresh.path}")
+                template = fresh
+            template.checked_at = now
+            self._cache[key] = template
+            return template
+
+    def render(self, doc_type: str, payer: Optional[str], context: dict) -> str:
+        return self.get(doc_type, payer).render({"date": today_label(), **context})
+
+    def version(self, doc_type: str, payer: Optional[str] = None) -> str:
+        return self.get(doc_type, payer).version
+
+
+templates = TemplateRegistry(settings.TEMPLATE_DIR, settings.TEMPLATE_RELOAD_SECONDS)
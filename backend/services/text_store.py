@@ -0,0 +1,74 @@
+"""
+Text Store — extracted document text kept out of the documents table.
+
+Raw text can run to megabytes per document, so it is stored compressed in document_texts, keyed by
+content hash (identical uploads share one row); documents uploaded before content hashing are keyed
+by their id instead (see text_key). Document rows only carry text_length and a short
+text_preview; the full text is loaded on demand by the dedicated text endpoint.
+
+zstd is used when the optional `zstandard` package is installed, zlib otherwise; each row records
+its codec so both can be read back after the package is added or removed.
+"""
+import zlib
+from typing import Optional
+from sqlalchemy.orm import Session
+from models import DocumentText
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+PREVIEW_CHARS = 280
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 10
+
+
+def default_codec() -> str:
+    return "zstd" if zstandard else "zlib"
+
+
+def compress_text(text: str, codec: Optional[str] = None) -> tuple[str, bytes]:
+    codec = codec or default_codec()
+    raw = text.encode("utf-8")
+    if codec == "zstd":
+        return codec, zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    return "zlib", zlib.compress(raw, ZLIB_LEVEL)
+
+
+def decompress_text(codec: str, data: bytes) -> str:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Text was stored with zstd but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    return zlib.decompress(data).decode("utf-8")
+
+
+def text_key(content_hash: Optional[str], doc_id: int) -> str:
+    """document_texts key for a document: its content hash, or "doc:<id>" for legacy rows without one."""
+    return content_hash or f"doc:{doc_id}"
+
+
+def text_summary(text: Optional[str]) -> dict:
+    """Columns kept on the Document row in place of the full text."""
+    text = text or ""
+    preview = text[:PREVIEW_CHARS]
+    return {"text_length": len(text), "text_preview": preview.rstrip() + ("…" if len(text) > PREVIEW_CHARS else "")}
+
+
+def store_text(db: Session, key: str, text: str) -> dict:
+    """Upsert the compressed text under a text_key (caller commits); returns text_summary(text)."""
+    codec, data = compress_text(text)
+    row = db.get(DocumentText, key)
+    if row is None:
+        db.add(DocumentText(content_hash=key, codec=codec, compressed_text=data, text_length=len(text)))
+    else:
+        row.codec, row.compressed_text, row.text_length = codec, data, len(text)
+    return text_summary(text)
+
+
+def load_text(db: Session, key: Optional[str]) -> Optional[str]:
+    if not key:
+        return None
+    row = db.get(DocumentText, key)
+    return decompress_text(row.codec, row.compressed_text) if row else None
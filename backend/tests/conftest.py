@@ -0,0 +1,91 @@
+"""
+Shared fixtures. Settings are read from the environment at import time, so the temporary database,
+upload directory and code catalog path are set before any application module is imported.
+Run from backend/: python -m pytest
+"""
+import os
+import shutil
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timezone
+
+_TMP = tempfile.mkdtemp(prefix="priorauth-tests-")
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{_TMP}/test.db",
+    UPLOAD_DIR=os.path.join(_TMP, "uploads"),
+    CODE_CATALOG_PATH=os.path.join(_TMP, "code_catalog.bin"),  # not built: codes are not validated
+    LLM_PROVIDER="mock",
+    EXTRACTION_POLL_SECONDS="0.2",
+)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base, SessionLocal
+from models import Patient, PARequest
+from services.search_service import ensure_search_index
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_TMP, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def client():
+    import main
+    with TestClient(main.app) as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    r = client.post("/api/auth/register", json={
+        "email": "tests@clinic.com", "password": "password123", "full_name": "Test Admin", "role": "admin",
+    })
+    assert r.status_code == 200, r.text
+    return {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def isolated_session_factory(tmp_path):
+    """A session factory over its own empty database, for code that must not see the app's background workers."""
+    engine = create_engine(f"sqlite:///{tmp_path}/isolated.db", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
+    yield sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    engine.dispose()
+
+
+@pytest.fixture
+def make_pa(db):
+    """Insert a PA request (and a patient for it); keyword arguments override column values."""
+    def make(**values) -> PARequest:
+        suffix = uuid.uuid4().hex[:10]
+        patient = Patient(mrn=f"MRN-{suffix}", first_name="Test", last_name="Patient", date_of_birth="1970-01-01")
+        db.add(patient)
+        db.flush()
+        pa = PARequest(**{
+            "reference_number": f"PA-{suffix}",
+            "patient_id": patient.id,
+            "procedure_code": "27447",
+            "procedure_name": "Total knee arthroplasty",
+            "diagnosis_code": "M17.11",
+            "payer_name": "Aetna",
+            "created_at": datetime.now(timezone.utc),
+            **values,
+        })
+        db.add(pa)
+        db.commit()
+        db.refresh(pa)
+        return pa
+    return make
@@ -0,0 +1,88 @@
+"""Document download: byte ranges, If-Range and conditional requests."""
+import uuid
+import pytest
+
+CONTENT = b"".join(f"line {i:04d}\n".encode() for i in range(200))  # 2000 bytes
+
+
+@pytest.fixture
+def document(client, auth_headers):
+    # Unique content so the upload isn't deduplicated against another test's file
+    data = CONTENT + uuid.uuid4().hex.encode()
+    r = client.post("/api/documents/upload", files={"file": ("notes.txt", data, "text/plain")}, headers=auth_headers)
+    assert r.status_code == 200, r.text
+    return r.json()["id"], data
+
+
+def _download(client, headers, doc_id, **extra):
+    return client.get(f"/api/documents/{doc_id}/download", headers={**headers, **extra})
+
+
+def test_full_download_carries_validators(client, auth_headers, document):
+    doc_id, data = document
+    r = _download(client, auth_headers, doc_id)
+    assert r.status_code == 200
+    assert r.content == data
+    assert r.headers["accept-ranges"] == "bytes"
+    assert r.headers["etag"] and r.headers["last-modified"]
+
+
+@pytest.mark.parametrize("header, start, end", [
+    ("bytes=0-9", 0, 9),
+    ("bytes=100-", 100, None),
+    ("bytes=-16", -16, None),
+    ("bytes=1990-99999", 1990, None),  # clamped to the end of the file
+])
+def test_range_returns_partial_content(client, auth_headers, document, header, start, end):
+    doc_id, data = document
+    expected = data[start:] if end is None else data[start:end + 1]
+    r = _download(client, auth_headers, doc_id, Range=header)
+    assert r.status_code == 206
+    assert r.content == expected
+    first = start if start >= 0 else len(data) + start
+    assert r.headers["content-range"] == f"bytes {first}-{first + len(expected) - 1}/{len(data)}"
+    assert r.headers["content-length"] == str(len(expected))
+
+
+@pytest.mark.parametrize("header", ["bytes=5-2", "bytes=0-1,5-9", "items=0-9", "bytes=abc"])
+def test_invalid_or_unsupported_range_sends_whole_file(client, auth_headers, document, header):
+    doc_id, data = document
+    r = _download(client, auth_headers, doc_id, Range=header)
+    assert r.status_code == 200
+    assert r.content == data
+
+
+def test_range_past_end_is_not_satisfiable(client, auth_headers, document):
+    doc_id, data = document
+    r = _download(client, auth_headers, doc_id, Range=f"bytes={len(data)}-")
+    assert r.status_code == 416
+    assert r.headers["content-range"] == f"bytes */{len(data)}"
+
+
+def test_if_range_with_other_version_sends_whole_file(client, auth_headers, document):
+    doc_id, data = document
+    etag = _download(client, auth_headers, doc_id).headers["etag"]
+    assert _download(client, auth_headers, doc_id, Range="bytes=0-9", **{"If-Range": etag}).status_code == 206
+    r = _download(client, auth_headers, doc_id, Range="bytes=0-9", **{"If-Range": '"other-version"'})
+    assert r.status_code == 200
+    assert r.content == data
+
+
+def test_conditional_requests_return_304(client, auth_headers, document):
+    doc_id, _ = document
+    first = _download(client, auth_headers, doc_id)
+    etag, last_modified = first.headers["etag"], first.headers["last-modified"]
+
+    r = _download(client, auth_headers, doc_id, **{"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["etag"] == etag
+    assert _download(client, auth_headers, doc_id, **{"If-None-Match": '"stale", ' + etag}).status_code == 304
+    assert _download(client, auth_headers, doc_id, **{"If-Modified-Since": last_modified}).status_code == 304
+    # If-None-Match wins over If-Modified-Since
+    r = _download(client, auth_headers, doc_id, **{"If-None-Match": '"stale"', "If-Modified-Since": last_modified})
+    assert r.status_code == 200
+
+
+def test_missing_document_is_404(client, auth_headers):
+    assert _download(client, auth_headers, 987654321).status_code == 404
@@ -0,0 +1,117 @@
+"""Extraction queue claims: lease-based recovery, ownership checks on store, hand-back on stop."""
+from datetime import datetime, timedelta, timezone
+import pytest
+from models import Document, ExtractionStatus
+from services.extraction_queue import ExtractionQueue
+from services.text_store import load_text, text_key
+
+LEASE_SECONDS = 60
+
+
+@pytest.fixture
+def queue(isolated_session_factory):
+    # Not started: the tests drive the claim bookkeeping directly
+    return ExtractionQueue(workers=1, depth=1, poll_seconds=60, lease_seconds=LEASE_SECONDS,
+                           session_factory=isolated_session_factory)
+
+
+def _add(session_factory, **values) -> int:
+    db = session_factory()
+    try:
+        doc = Document(filename="f.pdf", original_filename="f.pdf", file_path="/nonexistent/f.pdf", **values)
+        db.add(doc)
+        db.commit()
+        return doc.id
+    finally:
+        db.close()
+
+
+def _get(session_factory, doc_id: int) -> Document:
+    db = session_factory()
+    try:
+        return db.get(Document, doc_id)
+    finally:
+        db.close()
+
+
+def test_recover_only_requeues_expired_and_unclaimed_rows(queue, isolated_session_factory):
+    now = datetime.now(timezone.utc)
+    processing = ExtractionStatus.PROCESSING.value
+    live = _add(isolated_session_factory, extraction_status=processing, claimed_by="other", claimed_at=now)
+    expired = _add(isolated_session_factory, extraction_status=processing, claimed_by="other",
+                   claimed_at=now - timedelta(seconds=LEASE_SECONDS * 2))
+    legacy = _add(isolated_session_factory, extraction_status=processing)
+    completed = _add(isolated_session_factory, extraction_status=ExtractionStatus.COMPLETED.value)
+
+    assert queue._recover() == 2
+
+    assert _get(isolated_session_factory, live).extraction_status == processing
+    assert _get(isolated_session_factory, live).claimed_by == "other"
+    for doc_id in (expired, legacy):
+        doc = _get(isolated_session_factory, doc_id)
+        assert doc.extraction_status == ExtractionStatus.PENDING.value
+        assert doc.claimed_by is None and doc.claimed_at is None
+    assert _get(isolated_session_factory, completed).extraction_status == ExtractionStatus.COMPLETED.value
+
+
+def test_store_writes_result_only_while_claim_is_owned(queue, isolated_session_factory):
+    now = datetime.now(timezone.utc)
+    processing = ExtractionStatus.PROCESSING.value
+    owned = _add(isolated_session_factory, extraction_status=processing, claimed_by=queue.worker_id, claimed_at=now)
+    taken = _add(isolated_session_factory, extraction_status=processing, claimed_by="other", claimed_at=now)
+    result = {"text": "Patient: Jane Doe", "extraction_status": ExtractionStatus.COMPLETED.value,
+              "extraction_error": None, "extracted_at": now}
+
+    queue._store(owned, None, dict(result))
+    queue._store(taken, None, dict(result))
+
+    doc = _get(isolated_session_factory, owned)
+    assert doc.extraction_status == ExtractionStatus.COMPLETED.value
+    assert doc.claimed_by is None and doc.text_length == len(result["text"])
+    db = isolated_session_factory()
+    try:
+        assert load_text(db, text_key(None, owned)) == result["text"]
+        assert load_text(db, text_key(None, taken)) is None
+    finally:
+        db.close()
+    doc = _get(isolated_session_factory, taken)
+    assert doc.extraction_status == processing and doc.claimed_by == "other"
+
+
+def test_store_fills_pending_duplicates_of_the_same_content(queue, isolated_session_factory):
+    now = datetime.now(timezone.utc)
+    content_hash = "ab" * 32
+    owned = _add(isolated_session_factory, content_hash=content_hash, extraction_status=ExtractionStatus.PROCESSING.value,
+                 claimed_by=queue.worker_id, claimed_at=now)
+    duplicate = _add(isolated_session_factory, content_hash=content_hash, extraction_status=ExtractionStatus.PENDING.value)
+
+    queue._store(owned, content_hash, {"text": "same file", "extraction_status": ExtractionStatus.COMPLETED.value,
+                                       "extraction_error": None, "extracted_at": now})
+
+    assert _get(isolated_session_factory, duplicate).extraction_status == ExtractionStatus.COMPLETED.value
+    assert _get(isolated_session_factory, duplicate).text_length == len("same file")
+
+
+def test_heartbeat_renews_in_flight_claims(queue, isolated_session_factory):
+    stale = datetime.now(timezone.utc) - timedelta(seconds=LEASE_SECONDS - 1)
+    doc_id = _add(isolated_session_factory, extraction_status=ExtractionStatus.PROCESSING.value,
+                  claimed_by=queue.worker_id, claimed_at=stale)
+    queue._inflight[doc_id] = None
+
+    queue._heartbeat()
+
+    renewed = _get(isolated_session_factory, doc_id).claimed_at.replace(tzinfo=timezone.utc)
+    assert renewed > stale + timedelta(seconds=1)
+    assert _get(isolated_session_factory, doc_id).extraction_status == ExtractionStatus.PROCESSING.value
+
+
+def test_release_hands_back_only_own_claims(queue, isolated_session_factory):
+    now = datetime.now(timezone.utc)
+    processing = ExtractionStatus.PROCESSING.value
+    mine = _add(isolated_session_factory, extraction_status=processing, claimed_by=queue.worker_id, claimed_at=now)
+    theirs = _add(isolated_session_factory, extraction_status=processing, claimed_by="other", claimed_at=now)
+
+    assert queue._release() == 1
+
+    assert _get(isolated_session_factory, mine).extraction_status == ExtractionStatus.PENDING.value
+    assert _get(isolated_session_factory, theirs).extraction_status == processing
@@ -0,0 +1,89 @@
+"""PA request list keyset paging and bulk status transitions."""
+import uuid
+from datetime import datetime, timedelta, timezone
+import pytest
+from models import DenialRecord, PARequest
+from services.pagination import NEXT_CURSOR_HEADER
+
+
+def _pages(client, headers, **params) -> list:
+    """Follow X-Next-Cursor to the end; returns the id list of every page."""
+    pages, cursor = [], None
+    while True:
+        query = {**params, **({"cursor": cursor} if cursor else {})}
+        r = client.get("/api/pa-requests/", params=query, headers=headers)
+        assert r.status_code == 200, r.text
+        pages.append([pa["id"] for pa in r.json()])
+        cursor = r.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("order", ["desc", "asc"])
+def test_cursor_paging_visits_every_row_once_in_order(client, auth_headers, make_pa, order):
+    payer = f"Paging Payer {uuid.uuid4().hex[:8]}"
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    # Several rows share a created_at, so the id tie-break decides their order across page boundaries
+    stamps = [base, base, base, base + timedelta(hours=1), base + timedelta(hours=2), base + timedelta(hours=2), base]
+    pas = [make_pa(payer_name=payer, created_at=stamp) for stamp in stamps]
+    expected = [pa.id for pa in sorted(pas, key=lambda pa: (pa.created_at, pa.id), reverse=order == "desc")]
+
+    pages = _pages(client, auth_headers, payer=payer, limit=3, order=order, view="summary")
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [pa_id for page in pages for pa_id in page] == expected
+
+
+def test_last_full_page_has_no_cursor(client, auth_headers, make_pa):
+    payer = f"Paging Payer {uuid.uuid4().hex[:8]}"
+    for _ in range(4):
+        make_pa(payer_name=payer)
+    assert [len(page) for page in _pages(client, auth_headers, payer=payer, limit=2)] == [2, 2]
+
+
+def test_invalid_cursor_is_rejected(client, auth_headers):
+    r = client.get("/api/pa-requests/", params={"cursor": "not-a-cursor"}, headers=auth_headers)
+    assert r.status_code == 400
+
+
+def test_bulk_transitions_with_mixed_columns(client, auth_headers, make_pa, db):
+    submitted_at = datetime.now(timezone.utc) - timedelta(days=2)
+    draft = make_pa(status="draft")
+    submitted = make_pa(status="submitted", submitted_at=submitted_at)
+    pending = make_pa(status="pending_review", denial_reason="earlier reason")
+    items = [
+        {"pa_id": draft.id, "status": "submitted"},  # submitted_at only
+        {"pa_id": submitted.id, "status": "denied", "denial_reason": "medical_necessity_not_met",
+         "denial_details": "Conservative therapy not documented"},  # resolution + turnaround + denial fields
+        {"pa_id": pending.id, "status": "approved"},  # resolution without a submission date
+        {"pa_id": 987654321, "status": "approved"},
+        {"pa_id": draft.id, "status": "approved"},
+    ]
+
+    r = client.post("/api/pa-requests/transitions", json={"items": items}, headers=auth_headers)
+
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert (body["applied"], body["failed"]) == (3, 2)
+    results = body["results"]
+    assert [result["pa_id"] for result in results] == [item["pa_id"] for item in items]
+    assert results[0]["previous_status"] == "draft" and results[0]["status"] == "submitted"
+    assert results[1]["turnaround_days"] == pytest.approx(2.0, abs=0.1)
+    assert results[3]["error"] == "PA Request not found"
+    assert results[4]["error"] == "Duplicate pa_id in batch"
+
+    db.expire_all()
+    draft, submitted, pending = (db.get(PARequest, pa.id) for pa in (draft, submitted, pending))
+    assert draft.status == "submitted" and draft.submitted_at is not None and draft.resolved_at is None
+    assert submitted.status == "denied" and submitted.resolved_at is not None
+    assert submitted.denial_reason == "medical_necessity_not_met"
+    assert submitted.denial_details == "Conservative therapy not documented"
+    assert pending.status == "approved" and pending.resolved_at is not None and pending.turnaround_days is None
+    assert pending.denial_reason == "earlier reason"  # columns an item doesn't carry are left alone
+    denials = db.query(DenialRecord).filter(DenialRecord.pa_request_id == submitted.id).all()
+    assert [d.denial_reason for d in denials] == ["medical_necessity_not_met"]
+
+
+def test_bulk_transitions_reject_empty_batch(client, auth_headers):
+    r = client.post("/api/pa-requests/transitions", json={"items": []}, headers=auth_headers)
+    assert r.status_code == 400
@@ -9,6 +9,8 @@ type FormErrors = Record<string, string>;
 
 export default function ClinicalNotesPage() {
     const [notes, setNotes] = useState<any[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [patients, setPatients] = useState<any[]>([]);
     const [loading, setLoading] = useState(true);
     const [showCreate, setShowCreate] = useState(false);
@@ -24,12 +26,21 @@ export default function ClinicalNotesPage() {
     const [form, setForm] = useState({ patient_id: '', note_type: 'SOAP', subjective: '', objective: '', assessment: '', plan: '' });
 
     const loadData = () => {
-        Promise.all([api.listNotes(), api.listPatients()])
-            .then(([n, p]) => { setNotes(n); setPatients(p); })
+        Promise.all([api.listNotesPage(), api.listPatients()])
+            .then(([page, p]) => { setNotes(page.items); setNextCursor(page.nextCursor); setPatients(p); })
             .catch(err => showToast(err.message || 'Failed to load notes', 'error'))
             .finally(() => setLoading(false));
     };
 
+    const loadMore = () => {
+        if (!nextCursor) return;
+        setLoadingMore(true);
+        api.listNotesPage(undefined, {}, nextCursor)
+            .then(page => { setNotes(prev => [...prev, ...page.items]); setNextCursor(page.nextCursor); })
+            .catch(err => showToast(err.message || 'Failed to load more notes', 'error'))
+            .finally(() => setLoadingMore(false));
+    };
+
     useEffect(() => { loadData(); }, []);
 
     // Close patient dropdown when clicking outside
@@ -146,6 +157,13 @@ export default function ClinicalNotesPage() {
                                     </table>
                                 </div>
                             )}
+                            {nextCursor && (
+                                <div className="card-body" style={{ textAlign: 'center' }}>
+                                    <button className="btn btn-sm btn-secondary" onClick={loadMore} disabled={loadingMore}>
+                                        {loadingMore ? 'Loading...' : 'Load more'}
+                                    </button>
+                                </div>
+                            )}
                         </div>
 
                         {/* Note detail */}
@@ -179,6 +197,7 @@ export default function ClinicalNotesPage() {
                                                     </span>
                                                     <span style={{ fontWeight: 700, color: 'var(--text)', fontSize: 14 }}>{c.code}</span>
                                                     <span style={{ fontSize: 13, color: 'var(--text-secondary)' }}>{c.description}</span>
+                                                    {c.matches?.length > 0 && <span style={{ fontSize: 12, color: 'var(--text-muted)' }}>matched: {Array.from(new Set(c.matches.map((m: any) => m.text.toLowerCase()))).join(', ')}</span>}
                                                 </div>
                                             ))}
                                         </div>
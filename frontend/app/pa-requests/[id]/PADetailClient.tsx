@@ -29,9 +29,13 @@ export default function PADetailClient() {
     const handleGenerate = async () => {
         setGenerating(true);
         try {
-            const res = await api.generatePacket(id);
-            setPA(res);
+            let text = '';
             setTab('packet');
+            const res = await api.streamPacket(id, (_, section) => {
+                text += section;
+                setPA((prev: any) => ({ ...prev, generated_packet: text }));
+            });
+            setPA(res);
             showToast('PA packet generated successfully', 'success');
         } catch (e: any) {
             showToast(e.message || 'Failed to generate packet', 'error');
@@ -42,9 +46,13 @@ export default function PADetailClient() {
     const handleAppeal = async () => {
         setAppealing(true);
         try {
-            const res = await api.generateAppeal(id);
-            setPA(res);
+            let text = '';
             setTab('appeal');
+            const res = await api.streamAppeal(id, (_, section) => {
+                text += section;
+                setPA((prev: any) => ({ ...prev, appeal_letter: text }));
+            });
+            setPA(res);
             showToast('Appeal letter generated successfully', 'success');
         } catch (e: any) {
             showToast(e.message || 'Failed to generate appeal', 'error');
@@ -9,6 +9,8 @@ type FormErrors = Record<string, string>;
 
 export default function PAWorkbench() {
     const [paRequests, setPARequests] = useState<any[]>([]);
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [patients, setPatients] = useState<any[]>([]);
     const [loading, setLoading] = useState(true);
     const [showCreate, setShowCreate] = useState(false);
@@ -18,6 +20,7 @@ export default function PAWorkbench() {
     const [creating, setCreating] = useState(false);
     const [filter, setFilter] = useState('');
     const [formErrors, setFormErrors] = useState<FormErrors>({});
+    const [codeOptions, setCodeOptions] = useState<Record<string, any[]>>({ diagnosis: [], procedure: [] });
     const [generatingId, setGeneratingId] = useState<number | null>(null);
     const [updatingId, setUpdatingId] = useState<number | null>(null);
     const [patientSearch, setPatientSearch] = useState('');
@@ -39,12 +42,21 @@ export default function PAWorkbench() {
     });
 
     const loadData = () => {
-        Promise.all([api.listPARequests(filter || undefined), api.listPatients()])
-            .then(([pas, pts]) => { setPARequests(pas); setPatients(pts); })
+        Promise.all([api.listPARequestsPage(filter || undefined, { view: 'summary' }), api.listPatients()])
+            .then(([page, pts]) => { setPARequests(page.items); setNextCursor(page.nextCursor); setPatients(pts); })
             .catch(err => showToast(err.message || 'Failed to load PA requests', 'error'))
             .finally(() => setLoading(false));
     };
 
+    const loadMore = () => {
+        if (!nextCursor) return;
+        setLoadingMore(true);
+        api.listPARequestsPage(filter || undefined, { view: 'summary' }, nextCursor)
+            .then(page => { setPARequests(prev => [...prev, ...page.items]); setNextCursor(page.nextCursor); })
+            .catch(err => showToast(err.message || 'Failed to load more PA requests', 'error'))
+            .finally(() => setLoadingMore(false));
+    };
+
     useEffect(() => { loadData(); }, [filter]);
 
     // Close patient dropdown when clicking outside
@@ -77,6 +89,17 @@ export default function PAWorkbench() {
         if (formErrors[field]) setFormErrors(p => { const next = { ...p }; delete next[field]; return next; });
     };
 
+    // Catalog autocomplete; silently unavailable until the code catalog is built.
+    const onCodeInput = (kind: 'diagnosis' | 'procedure', value: string) => {
+        const codeField = `${kind}_code`, nameField = `${kind}_name`;
+        const picked = codeOptions[kind].find((c: any) => c.code === value);
+        setForm((f: any) => ({ ...f, [codeField]: value, ...(picked && !f[nameField] ? { [nameField]: picked.description } : {}) }));
+        clearFieldError(codeField);
+        if (value.trim().length >= 2 && !picked) {
+            api.searchCodes(value.trim(), kind).then(res => setCodeOptions(o => ({ ...o, [kind]: res }))).catch(() => {});
+        }
+    };
+
     const handleCreate = async (e: React.FormEvent) => {
         e.preventDefault();
         if (!validateForm()) { showToast('Please fix the form errors', 'warning'); return; }
@@ -286,6 +309,13 @@ export default function PAWorkbench() {
                                 </tbody>
                             </table>
                         </div>
+                        {nextCursor && (
+                            <div className="card-body" style={{ textAlign: 'center' }}>
+                                <button className="btn btn-sm btn-secondary" onClick={loadMore} disabled={loadingMore}>
+                                    {loadingMore ? 'Loading...' : 'Load more'}
+                                </button>
+                            </div>
+                        )}
                     </div>
                 )}
             </div>
@@ -381,8 +411,11 @@ export default function PAWorkbench() {
                                     <div className="form-group">
                                         <label className="form-label">Procedure Code (CPT) <span className="form-required">*</span></label>
                                         <input className={`form-input ${formErrors.procedure_code ? 'form-input-error' : ''}`} value={form.procedure_code}
-                                            onChange={e => { setForm({ ...form, procedure_code: e.target.value }); clearFieldError('procedure_code'); }}
+                                            onChange={e => onCodeInput('procedure', e.target.value)} list="procedure-code-options"
                                             placeholder="e.g. 27447" required maxLength={20} />
+                                        <datalist id="procedure-code-options">
+                                            {codeOptions.procedure.map((c: any) => <option key={c.code} value={c.code}>{c.description}</option>)}
+                                        </datalist>
                                         {formErrors.procedure_code && <span className="form-error">{formErrors.procedure_code}</span>}
                                     </div>
                                     <div className="form-group">
@@ -395,8 +428,11 @@ export default function PAWorkbench() {
                                     <div className="form-group">
                                         <label className="form-label">Diagnosis Code (ICD-10) <span className="form-required">*</span></label>
                                         <input className={`form-input ${formErrors.diagnosis_code ? 'form-input-error' : ''}`} value={form.diagnosis_code}
-                                            onChange={e => { setForm({ ...form, diagnosis_code: e.target.value }); clearFieldError('diagnosis_code'); }}
+                                            onChange={e => onCodeInput('diagnosis', e.target.value)} list="diagnosis-code-options"
                                             placeholder="e.g. M17.11" required maxLength={20} />
+                                        <datalist id="diagnosis-code-options">
+                                            {codeOptions.diagnosis.map((c: any) => <option key={c.code} value={c.code}>{c.description}</option>)}
+                                        </datalist>
                                         {formErrors.diagnosis_code && <span className="form-error">{formErrors.diagnosis_code}</span>}
                                     </div>
                                     <div className="form-group">
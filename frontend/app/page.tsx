@@ -8,7 +8,9 @@ import { LoadingState, EmptyState } from '@/components/LoadingState';
 export default function DashboardPage() {
     const [analytics, setAnalytics] = useState<any>(null);
     const [recentPAs, setRecentPAs] = useState<any[]>([]);
+    const [paCounts, setPACounts] = useState<any>(null);
     const [notes, setNotes] = useState<any[]>([]);
+    const [noteCount, setNoteCount] = useState<number | null>(null);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState<string | null>(null);
     const { showToast } = useToast();
@@ -18,18 +20,23 @@ export default function DashboardPage() {
     useEffect(() => {
         const promises: Promise<any>[] = [
             api.analytics().catch(() => null),
-            api.listPARequests().catch(() => []),
+            api.listPARequests(undefined, { view: 'summary' }).catch(() => []),
+            api.countPARequests().catch(() => null),
         ];
-        // Also load clinical notes for providers 
+        // Also load clinical notes for providers (their own; admins see everyone's)
         if (role === 'provider' || role === 'admin') {
-            promises.push(api.listNotes().catch(() => []));
+            const mine: Record<string, string> = role === 'provider' && user?.id ? { provider_id: String(user.id) } : {};
+            promises.push(api.listNotes('summary', mine).catch(() => []));
+            promises.push(api.countNotes(mine).catch(() => null));
         }
 
         Promise.all(promises)
-            .then(([a, pas, nts]) => {
+            .then(([a, pas, counts, nts, ntCounts]) => {
                 setAnalytics(a);
                 setRecentPAs(pas || []);
+                setPACounts(counts);
                 if (nts) setNotes(nts);
+                if (ntCounts) setNoteCount(ntCounts.total);
             })
             .catch(err => {
                 const msg = err.message || 'Failed to load dashboard data';
@@ -45,6 +52,13 @@ export default function DashboardPage() {
     const submittedPAs = recentPAs.filter(pa => pa.status === 'submitted');
     const approvedPAs = recentPAs.filter(pa => pa.status === 'approved');
     const deniedPAs = recentPAs.filter(pa => ['denied', 'appeal_denied'].includes(pa.status));
+    // The PA list is one page of the most recent requests; KPI totals come from the counts endpoint
+    const countOf = (statuses: string[], page: any[]) =>
+        paCounts ? statuses.reduce((n, s) => n + (paCounts.by_status[s] || 0), 0) : page.length;
+    const pendingCount = countOf(['draft', 'pending_review'], pendingPAs);
+    const submittedCount = countOf(['submitted'], submittedPAs);
+    const approvedCount = countOf(['approved'], approvedPAs);
+    const deniedCount = countOf(['denied', 'appeal_denied'], deniedPAs);
 
     const greeting = () => {
         const hour = new Date().getHours();
@@ -99,22 +113,22 @@ export default function DashboardPage() {
                         <>
                             <div className="kpi-card">
                                 <div className="kpi-label">My Queue</div>
-                                <div className="kpi-value" style={{ color: 'var(--warning)' }}>{pendingPAs.length}</div>
+                                <div className="kpi-value" style={{ color: 'var(--warning)' }}>{pendingCount}</div>
                                 <div className="kpi-change">Pending review</div>
                             </div>
                             <div className="kpi-card">
                                 <div className="kpi-label">Submitted</div>
-                                <div className="kpi-value" style={{ color: 'var(--info)' }}>{submittedPAs.length}</div>
+                                <div className="kpi-value" style={{ color: 'var(--info)' }}>{submittedCount}</div>
                                 <div className="kpi-change">Awaiting decision</div>
                             </div>
                             <div className="kpi-card">
                                 <div className="kpi-label">Approved</div>
-                                <div className="kpi-value" style={{ color: 'var(--success)' }}>{approvedPAs.length}</div>
+                                <div className="kpi-value" style={{ color: 'var(--success)' }}>{approvedCount}</div>
                                 <div className="kpi-change positive">{analytics?.approval_rate?.toFixed(1) || 0}% rate</div>
                             </div>
                             <div className="kpi-card">
                                 <div className="kpi-label">Denied</div>
-                                <div className="kpi-value" style={{ color: 'var(--danger)' }}>{deniedPAs.length}</div>
+                                <div className="kpi-value" style={{ color: 'var(--danger)' }}>{deniedCount}</div>
                                 <div className="kpi-change negative">{analytics?.denial_rate?.toFixed(1) || 0}% rate</div>
                             </div>
                         </>
@@ -123,23 +137,23 @@ export default function DashboardPage() {
                         <>
                             <div className="kpi-card">
                                 <div className="kpi-label">Active PA Requests</div>
-                                <div className="kpi-value">{recentPAs.length}</div>
+                                <div className="kpi-value">{paCounts?.total ?? recentPAs.length}</div>
                                 <div className="kpi-change">Total requests</div>
                             </div>
                             <div className="kpi-card">
                                 <div className="kpi-label">Needs Attention</div>
-                                <div className="kpi-value" style={{ color: 'var(--warning)' }}>{pendingPAs.length}</div>
+                                <div className="kpi-value" style={{ color: 'var(--warning)' }}>{pendingCount}</div>
                                 <div className="kpi-change">Review & sign off</div>
                             </div>
                             <div className="kpi-card">
                                 <div className="kpi-label">Clinical Notes</div>
-                                <div className="kpi-value" style={{ color: 'var(--info)' }}>{notes.length}</div>
+                                <div className="kpi-value" style={{ color: 'var(--info)' }}>{noteCount ?? notes.length}</div>
                                 <div className="kpi-change">Documentation</div>
                             </div>
                             <div className="kpi-card">
                                 <div className="kpi-label">Approval Rate</div>
                                 <div className="kpi-value" style={{ color: 'var(--success)' }}>{analytics?.approval_rate?.toFixed(1) || 0}%</div>
-                                <div className="kpi-change positive">{approvedPAs.length} approved</div>
+                                <div className="kpi-change positive">{approvedCount} approved</div>
                             </div>
                         </>
                     )}
@@ -315,19 +329,19 @@ export default function DashboardPage() {
                             <div className="card-body">
                                 <div style={{ display: 'grid', gridTemplateColumns: '1fr 1fr', gap: 12 }}>
                                     <div style={{ padding: 16, background: 'var(--bg-input)', borderRadius: 8, textAlign: 'center' }}>
-                                        <div style={{ fontSize: 28, fontWeight: 700, color: 'var(--warning)' }}>{pendingPAs.length}</div>
+                                        <div style={{ fontSize: 28, fontWeight: 700, color: 'var(--warning)' }}>{pendingCount}</div>
                                         <div style={{ fontSize: 12, color: 'var(--text-muted)', marginTop: 4 }}>In Queue</div>
                                     </div>
                                     <div style={{ padding: 16, background: 'var(--bg-input)', borderRadius: 8, textAlign: 'center' }}>
-                                        <div style={{ fontSize: 28, fontWeight: 700, color: 'var(--info)' }}>{submittedPAs.length}</div>
+                                        <div style={{ fontSize: 28, fontWeight: 700, color: 'var(--info)' }}>{submittedCount}</div>
                                         <div style={{ fontSize: 12, color: 'var(--text-muted)', marginTop: 4 }}>Submitted</div>
                                     </div>
                                     <div style={{ padding: 16, background: 'var(--bg-input)', borderRadius: 8, textAlign: 'center' }}>
-                                        <div style={{ fontSize: 28, fontWeight: 700, color: 'var(--success)' }}>{approvedPAs.length}</div>
+                                        <div style={{ fontSize: 28, fontWeight: 700, color: 'var(--success)' }}>{approvedCount}</div>
                                         <div style={{ fontSize: 12, color: 'var(--text-muted)', marginTop: 4 }}>Approved</div>
                                     </div>
                                     <div style={{ padding: 16, background: 'var(--bg-input)', borderRadius: 8, textAlign: 'center' }}>
-                                        <div style={{ fontSize: 28, fontWeight: 700, color: 'var(--danger)' }}>{deniedPAs.length}</div>
+                                        <div style={{ fontSize: 28, fontWeight: 700, color: 'var(--danger)' }}>{deniedCount}</div>
                                         <div style={{ fontSize: 12, color: 'var(--text-muted)', marginTop: 4 }}>Denied</div>
                                     </div>
                                 </div>
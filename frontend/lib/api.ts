@@ -24,7 +24,7 @@ export function getUser(): any {
     return u ? JSON.parse(u) : null;
 }
 
-async function request(path: string, options: RequestInit = {}) {
+async function send(path: string, options: RequestInit = {}) {
     const token = getToken();
     const headers: any = { ...(options.headers || {}) };
     if (token) headers['Authorization'] = `Bearer ${token}`;
@@ -42,7 +42,50 @@ async function request(path: string, options: RequestInit = {}) {
         const err = await res.json().catch(() => ({ detail: 'Request failed' }));
         throw new Error(err.detail || 'Request failed');
     }
-    return res.json();
+    return res;
+}
+
+async function request(path: string, options: RequestInit = {}) {
+    return (await send(path, options)).json();
+}
+
+// One page of a keyset-paginated list; nextCursor (from X-Next-Cursor) is null on the last page.
+async function requestPage(path: string): Promise<{ items: any[]; nextCursor: string | null }> {
+    const res = await send(path);
+    return { items: await res.json(), nextCursor: res.headers.get('X-Next-Cursor') };
+}
+
+// POST an SSE endpoint and hand each event to onEvent; resolves with the "done" payload.
+async function streamEvents(path: string, onEvent: (event: string, data: any) => void) {
+    const token = getToken();
+    const res = await fetch(`${API_BASE}${path}`, {
+        method: 'POST',
+        headers: token ? { Authorization: `Bearer ${token}` } : {},
+    });
+    if (!res.ok || !res.body) {
+        const err = await res.json().catch(() => ({ detail: 'Request failed' }));
+        throw new Error(err.detail || 'Request failed');
+    }
+    const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+    let buffer = '';
+    let done: any = null;
+    while (true) {
+        const { value, done: finished } = await reader.read();
+        if (finished) break;
+        buffer += value;
+        let sep;
+        while ((sep = buffer.indexOf('\n\n')) >= 0) {
+            const block = buffer.slice(0, sep);
+            buffer = buffer.slice(sep + 2);
+            const event = block.match(/^event: (.*)$/m)?.[1] || 'message';
+            const data = JSON.parse(block.match(/^data: (.*)$/m)?.[1] || '{}');
+            if (event === 'error') throw new Error(data.detail || 'Generation failed');
+            if (event === 'done') done = data;
+            onEvent(event, data);
+        }
+    }
+    if (!done) throw new Error('Generation stream ended early');
+    return done;
 }
 
 export const api = {
@@ -63,19 +106,48 @@ export const api = {
     listDocuments: (paRequestId?: number) =>
         request(`/documents/${paRequestId ? `?pa_request_id=${paRequestId}` : ''}`),
     getDocument: (id: number) => request(`/documents/${id}`),
+    getDocumentStatus: (id: number) => request(`/documents/${id}/status`),
+    downloadDocument: async (id: number) => {
+        const token = getToken();
+        const res = await fetch(`${API_BASE}/documents/${id}/download`, {
+            headers: token ? { Authorization: `Bearer ${token}` } : {},
+        });
+        if (!res.ok) throw new Error('Download failed');
+        return res.blob();
+    },
 
     // PA Requests
     createPARequest: (data: any) =>
         request('/pa-requests/', { method: 'POST', body: JSON.stringify(data) }),
-    listPARequests: (status?: string) =>
-        request(`/pa-requests/${status ? `?status=${status}` : ''}`, { redirect: 'follow' as RequestRedirect }),
+    listPARequests: (status?: string, params: Record<string, string> = {}) => {
+        const qs = new URLSearchParams({ ...params, ...(status ? { status } : {}) }).toString();
+        return request(`/pa-requests/${qs ? `?${qs}` : ''}`, { redirect: 'follow' as RequestRedirect });
+    },
+    // Paged variant: pass the previous page's nextCursor to continue ("Load more")
+    listPARequestsPage: (status?: string, params: Record<string, string> = {}, cursor?: string | null) =>
+        requestPage(`/pa-requests/?${new URLSearchParams({ ...params, ...(status ? { status } : {}), ...(cursor ? { cursor } : {}) })}`),
+    countPARequests: (params: Record<string, string> = {}) =>
+        request(`/pa-requests/counts?${new URLSearchParams(params)}`),
     getPARequest: (id: number) => request(`/pa-requests/${id}`),
     updatePARequest: (id: number, data: any) =>
         request(`/pa-requests/${id}`, { method: 'PATCH', body: JSON.stringify(data) }),
-    generatePacket: (id: number) =>
-        request(`/pa-requests/${id}/generate-packet`, { method: 'POST' }),
-    generateAppeal: (id: number) =>
-        request(`/pa-requests/${id}/generate-appeal`, { method: 'POST' }),
+    generatePacket: (id: number, force = false) =>
+        request(`/pa-requests/${id}/generate-packet${force ? '?force=true' : ''}`, { method: 'POST' }),
+    generateAppeal: (id: number, force = false) =>
+        request(`/pa-requests/${id}/generate-appeal${force ? '?force=true' : ''}`, { method: 'POST' }),
+    // Streaming variants: onSection receives each section's text as it is produced; resolves with the saved PA.
+    streamPacket: async (id: number, onSection: (name: string, text: string) => void, force = false) =>
+        (await streamEvents(`/pa-requests/${id}/generate-packet/stream${force ? '?force=true' : ''}`,
+            (event, data) => event === 'section' && onSection(data.name, data.text))).pa,
+    streamAppeal: async (id: number, onSection: (name: string, text: string) => void, force = false) =>
+        (await streamEvents(`/pa-requests/${id}/generate-appeal/stream${force ? '?force=true' : ''}`,
+            (event, data) => event === 'section' && onSection(data.name, data.text))).pa,
+
+    // Code catalog (503 until the catalog is built)
+    searchCodes: (q: string, system?: 'diagnosis' | 'procedure', limit = 10) =>
+        request(`/codes/search?${new URLSearchParams({ q, limit: String(limit), ...(system ? { system } : {}) })}`),
+    lookupCode: (code: string, system?: 'diagnosis' | 'procedure') =>
+        request(`/codes/${encodeURIComponent(code)}${system ? `?system=${system}` : ''}`),
 
     // Patients
     createPatient: (data: any) =>
@@ -87,10 +159,17 @@ export const api = {
     // Clinical Notes
     createNote: (data: any) =>
         request('/clinical-notes/', { method: 'POST', body: JSON.stringify(data) }),
-    listNotes: () => request('/clinical-notes/'),
+    listNotes: (view?: 'full' | 'summary', params: Record<string, string> = {}) => {
+        const qs = new URLSearchParams({ ...params, ...(view ? { view } : {}) }).toString();
+        return request(`/clinical-notes/${qs ? `?${qs}` : ''}`);
+    },
+    listNotesPage: (view?: 'full' | 'summary', params: Record<string, string> = {}, cursor?: string | null) =>
+        requestPage(`/clinical-notes/?${new URLSearchParams({ ...params, ...(view ? { view } : {}), ...(cursor ? { cursor } : {}) })}`),
+    countNotes: (params: Record<string, string> = {}) =>
+        request(`/clinical-notes/counts?${new URLSearchParams(params)}`),
     getNote: (id: number) => request(`/clinical-notes/${id}`),
-    updateNote: (id: number, data: any) =>
-        request(`/clinical-notes/${id}`, { method: 'PATCH', body: JSON.stringify(data) }),
+    updateNote: (id: number, data: any, assist = false) =>
+        request(`/clinical-notes/${id}${assist ? '?assist=true' : ''}`, { method: 'PATCH', body: JSON.stringify(data) }),
     aiAssist: (id: number) =>
         request(`/clinical-notes/${id}/ai-assist`, { method: 'POST' }),
 